@@ -0,0 +1,302 @@
+# Batch runner for the workshop agents
+# Run hundreds of weather / League queries concurrently, with resumable JSONL output
+
+"""
+Non-interactive plan -> fetch -> analyze for many queries at once.
+
+run_weather_agent and run_league_agent answer one typed query at a time. For
+evaluations and precomputed recaps this runs a whole file of queries on a
+thread pool, using the same step functions as the CLIs, and writes one JSON
+line per query with the answer and per-step timings.
+
+Concurrency is bounded twice: --workers queries are in flight at once, and
+inside them at most --bedrock-concurrency model calls and --api-concurrency
+Riot / NWS requests run at the same time (see concurrency.py). Cache and
+cassette hits don't take a slot.
+
+Every finished query is appended to the output file immediately. A rerun
+with the same output file skips queries that already succeeded and retries
+the ones that failed, so an interrupted batch resumes where it stopped.
+
+Input: one query per line (blank lines and "#" comments skipped), or JSON
+lines with {"id": ..., "query": ...}. Without an explicit id a query's id is
+a hash of its text, so reordering or appending to the file keeps resuming.
+
+Usage:
+    python batch_agent.py weather --input locations.txt --output weather.jsonl
+    cat queries.txt | python batch_agent.py league --output league.jsonl --workers 16
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from bedrock_calls import bedrock_limit, cache_stats
+from gazetteer import format_gazetteer_stats
+from league_agent_example import build_player_profile, generate_riot_api_strategy, process_league_data
+from league_query_planner import format_planner_stats, strategy_intents
+from nws_client import fetch_text, nws_limit, resolve_forecast_url
+from riot_agent_client import account_url, fetch_json, fetch_player_data, normalize_platform, riot_limit
+from weather_agent_cli import generate_weather_api_calls, process_weather_response
+
+DEFAULT_WORKERS = 8
+DEFAULT_BEDROCK_CONCURRENCY = 4
+DEFAULT_API_CONCURRENCY = 8
+
+
+class StepFailed(Exception):
+    """A pipeline step returned (False, message)."""
+
+    def __init__(self, step, message):
+        super().__init__(message)
+        self.step = step
+
+
+class _ThreadRoutedOutput(io.TextIOBase):
+    """
+    sys.stdout replacement for the batch run: what a worker prints goes into that
+    query's log instead of interleaving on the terminal; the main thread prints normally.
+    """
+
+    def __init__(self, terminal):
+        self.terminal = terminal
+        self.local = threading.local()
+
+    def capture(self):
+        self.local.buffer = io.StringIO()
+
+    def release(self):
+        buffer = getattr(self.local, "buffer", None)
+        self.local.buffer = None
+        return buffer.getvalue() if buffer else ""
+
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        return (buffer or self.terminal).write(text)
+
+    def flush(self):
+        self.terminal.flush()
+
+
+def read_queries(stream):
+    """
+    Parse batch input into (id, query) pairs.
+
+    Args:
+        stream: File object with one query (or JSON object) per line
+
+    Returns:
+        list: [(query_id, query)] in input order, duplicate texts given distinct ids
+    """
+    queries = []
+    seen = {}
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            item = json.loads(line)
+            query = item["query"]
+            query_id = str(item.get("id") or "")
+        else:
+            query, query_id = line, ""
+        if not query_id:
+            digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:12]
+            seen[digest] = seen.get(digest, 0) + 1
+            query_id = digest if seen[digest] == 1 else f"{digest}-{seen[digest]}"
+        queries.append((query_id, query))
+    return queries
+
+
+def load_finished(output_path):
+    """Ids whose latest record in an existing output file succeeded."""
+    finished = {}
+    if not os.path.exists(output_path):
+        return set()
+    with open(output_path, "r", encoding="utf-8") as output_file:
+        for line in output_file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by a crash - that query runs again
+            finished[record["id"]] = record.get("status") == "ok"
+    return {query_id for query_id, ok in finished.items() if ok}
+
+
+def _timed(timings, step, func, *args, **kwargs):
+    started = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        timings[f"{step}_ms"] = round(timings.get(f"{step}_ms", 0) + (time.perf_counter() - started) * 1000, 1)
+
+
+def _check(step, result):
+    """Unpack a (success, value, ...) tuple, raising StepFailed on failure."""
+    if not result[0]:
+        raise StepFailed(step, result[1])
+    return result[1:] if len(result) > 2 else result[1]
+
+
+def weather_pipeline(location, timings):
+    """Points URL (gazetteer or AI) -> forecast URL -> forecast -> AI summary."""
+    api_calls = _check("plan", _timed(timings, "plan", generate_weather_api_calls, location))
+    points_url = api_calls[0]
+    forecast_url, from_cache = _check("fetch", _timed(timings, "fetch", resolve_forecast_url, points_url))
+    forecast = _check("fetch", _timed(timings, "fetch", fetch_text, forecast_url))
+    summary = _check("analyze", _timed(timings, "analyze", process_weather_response, forecast, location))
+    return {"plan": {"points_url": points_url, "forecast_url": forecast_url, "points_cached": from_cache},
+            "result": summary}
+
+
+def league_pipeline(query, timings, headers):
+    """Strategy (rules or AI) -> PUUID -> concurrent player data -> AI insights."""
+    strategy = _check("plan", _timed(timings, "plan", generate_riot_api_strategy, query))
+    if not (strategy.get("player_name") and strategy.get("tag_line")):
+        raise StepFailed("plan", "Could not extract player name and tag from query")
+
+    platform = normalize_platform(strategy.get("platform"))
+    account = _check("fetch", _timed(timings, "fetch", fetch_json,
+                                     account_url(strategy["player_name"], strategy["tag_line"], platform), headers))
+    intents = strategy_intents(strategy) or ["mastery"]
+    results = _timed(timings, "fetch", fetch_player_data, account["puuid"], intents, platform, headers)
+    profile = build_player_profile(account["puuid"], results)
+    if len(profile) == 1:
+        raise StepFailed("fetch", "; ".join(str(results[intent]["error"]) for intent in intents if intent in results))
+    timings["fetch_serial_ms"] = results["serial_ms"]
+
+    insights = _check("analyze", _timed(timings, "analyze", process_league_data, profile, query, "player_profile"))
+    plan = {key: strategy.get(key) for key in ("player_name", "tag_line", "planner")}
+    plan.update(platform=platform, intents=intents)
+    return {"plan": plan,
+            "fetched": {intent: results[intent]["success"] for intent in intents if intent in results},
+            "result": insights}
+
+
+def run_query(agent, query_id, query, pipeline, output, keep_log):
+    """Run one query's pipeline on a worker thread and build its output record."""
+    timings = {}
+    record = {"id": query_id, "query": query, "agent": agent}
+    output.capture()
+    started = time.perf_counter()
+    try:
+        record.update(pipeline(query, timings))
+        record["status"] = "ok"
+    except StepFailed as e:
+        record.update(status="error", failed_step=e.step, error=str(e))
+    except Exception as e:  # one bad query shouldn't stop the batch
+        record.update(status="error", failed_step="unexpected", error=f"{type(e).__name__}: {str(e)}")
+    record["timings"] = {**timings, "total_ms": round((time.perf_counter() - started) * 1000, 1)}
+    record["finished_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    log = output.release()
+    if keep_log:
+        record["log"] = log
+    return record
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0
+
+
+def print_summary(records, elapsed, limits):
+    """Totals, latency percentiles per step, throughput and how busy each limit was."""
+    ok = [record for record in records if record["status"] == "ok"]
+    print("\n" + "=" * 60)
+    print(f"📦 {len(records)} queries in {elapsed:.1f} s ({len(records) / elapsed if elapsed else 0:.2f}/s): "
+          f"{len(ok)} ok, {len(records) - len(ok)} failed")
+    for step in ("plan_ms", "fetch_ms", "analyze_ms", "total_ms"):
+        values = [record["timings"][step] for record in ok if step in record["timings"]]
+        if values:
+            print(f"   {step[:-3]:<8} p50 {statistics.median(values):>8,.0f} ms   p95 {_percentile(values, 0.95):>8,.0f} ms")
+    for limit in limits:
+        print(f"   {limit.format_stats()}")
+    print(f"   bedrock cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+          f"{cache_stats['bypassed']} uncached calls")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many weather or League agent queries concurrently")
+    parser.add_argument("agent", choices=("weather", "league"))
+    parser.add_argument("--input", default="-", help="Query file (default: stdin)")
+    parser.add_argument("--output", required=True, help="JSONL results file (appended to; also the checkpoint)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Queries in flight at once")
+    parser.add_argument("--bedrock-concurrency", type=int, default=DEFAULT_BEDROCK_CONCURRENCY,
+                        help="Bedrock calls in flight at once")
+    parser.add_argument("--api-concurrency", type=int, default=DEFAULT_API_CONCURRENCY,
+                        help="Riot / NWS requests in flight at once")
+    parser.add_argument("--fresh", action="store_true", help="Ignore earlier results in --output and start over")
+    parser.add_argument("--log", action="store_true", help="Keep each query's console output in its record")
+    args = parser.parse_args()
+
+    if args.input == "-":
+        queries = read_queries(sys.stdin)
+    else:
+        with open(args.input, "r", encoding="utf-8") as input_file:
+            queries = read_queries(input_file)
+
+    if args.fresh and os.path.exists(args.output):
+        os.remove(args.output)
+    finished = load_finished(args.output)
+    pending = [(query_id, query) for query_id, query in queries if query_id not in finished]
+    print(f"📋 {len(queries)} queries, {len(queries) - len(pending)} already done, {len(pending)} to run")
+    if not pending:
+        return
+
+    bedrock_limit.set(args.bedrock_concurrency)
+    if args.agent == "weather":
+        api_limit = nws_limit
+        pipeline = weather_pipeline
+    else:
+        riot_api_key = os.getenv("RIOT_API_KEY")
+        if not riot_api_key:
+            print("❌ RIOT_API_KEY not found in environment variables!")
+            sys.exit(1)
+        headers = {"X-Riot-Token": riot_api_key}
+        api_limit = riot_limit
+
+        def pipeline(query, timings):
+            return league_pipeline(query, timings, headers)
+
+    api_limit.set(args.api_concurrency)
+
+    terminal = sys.stdout
+    output = _ThreadRoutedOutput(terminal)
+    sys.stdout = output
+    records = []
+    started = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=max(1, args.workers), thread_name_prefix="batch")
+    try:
+        with open(args.output, "a", encoding="utf-8") as output_file:
+            futures = [executor.submit(run_query, args.agent, query_id, query, pipeline, output, args.log)
+                       for query_id, query in pending]
+            for done, future in enumerate(as_completed(futures), start=1):
+                record = future.result()
+                output_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output_file.flush()  # the checkpoint: this query won't run again
+                records.append(record)
+                status = "✅" if record["status"] == "ok" else f"❌ {record['failed_step']}: {record['error'][:80]}"
+                print(f"[{done}/{len(pending)}] {record['timings']['total_ms'] / 1000:6.1f} s  "
+                      f"{record['query'][:40]:<40} {status}")
+    except KeyboardInterrupt:
+        print("\n⏹️ Interrupted - finished queries are saved, rerun the same command to resume")
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        executor.shutdown(wait=True)
+        sys.stdout = terminal
+
+    print_summary(records, time.perf_counter() - started, (bedrock_limit, api_limit))
+    print(f"   {format_gazetteer_stats() if args.agent == 'weather' else format_planner_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,485 @@
+# Shared Bedrock model-call layer for the workshop agents
+# One cached bedrock-runtime client + an on-disk response cache
+
+"""
+Model calls shared by league_agent_example.py and weather_agent_cli.py.
+
+Every call_claude_sonnet used to build a new bedrock-runtime client (credential
+lookup, endpoint resolution, a fresh TLS connection) and sent the same planning
+prompt back to the model every time. This module keeps:
+
+1. One boto3 client per region, reused for every call (boto3 clients are thread-safe)
+2. An on-disk response cache keyed by a hash of (model, messages, inferenceConfig)
+   - entries expire after BEDROCK_CACHE_TTL_SECONDS (default 24 hours)
+   - the oldest entries are evicted once the cache grows past BEDROCK_CACHE_MAX_MB (default 50)
+   - only deterministic calls (temperature 0) are cached unless told otherwise,
+     because a temperature 0.7 answer is supposed to vary
+
+Streaming (converse_stream_text) prints tokens as they arrive and reports
+time-to-first-token and tokens/sec, falling back to the blocking converse call
+when streaming is unavailable.
+
+Prompt caching: the agents send their fixed instructions as a `system` prefix
+built by system_blocks(), which ends in a Bedrock cachePoint. Bedrock then
+reuses the processed prefix on repeat calls within ~5 minutes (fewer billed
+input tokens, faster first token). Bedrock only caches a prefix once it
+reaches the model's minimum (1,024 tokens for Claude Sonnet 4) - shorter
+prefixes are sent normally and report 0 cached tokens, which is why every
+agent call shares the one prefix in agent_instructions.py. Per-call cache
+reads and writes come back in usage and are printed and totalled here.
+
+Environment variables:
+    BEDROCK_CACHE=auto|always|off   (default auto: cache temperature 0 calls only)
+    BEDROCK_CACHE_DIR               (default ~/.cache/rift-rewind-agents/bedrock)
+    BEDROCK_CACHE_TTL_SECONDS, BEDROCK_CACHE_MAX_MB
+    BEDROCK_PROMPT_CACHE=1|0        (default 1: add cachePoint checkpoints to system prefixes)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import boto3
+
+from cassette import cassette_fetch, bedrock_key, get_cassette
+from concurrency import ConcurrencyLimit
+
+DEFAULT_MODEL_ID = "us.anthropic.claude-sonnet-4-20250514-v1:0"  # Claude 4.0 Sonnet
+DEFAULT_REGION = os.getenv("AWS_REGION", "us-west-2")
+DEFAULT_MAX_TOKENS = 2000
+
+CACHE_MODE = os.getenv("BEDROCK_CACHE", "auto").lower()
+CACHE_DIR = os.path.expanduser(os.getenv("BEDROCK_CACHE_DIR", "~/.cache/rift-rewind-agents/bedrock"))
+CACHE_TTL_SECONDS = int(os.getenv("BEDROCK_CACHE_TTL_SECONDS", "86400"))
+CACHE_MAX_BYTES = int(float(os.getenv("BEDROCK_CACHE_MAX_MB", "50")) * 1024 * 1024)
+PROMPT_CACHE = os.getenv("BEDROCK_PROMPT_CACHE", "1") != "0"
+
+_clients = {}  # region -> bedrock-runtime client
+_clients_lock = threading.Lock()
+
+# Counters for the current process - handy when comparing runs
+cache_stats = {"hits": 0, "misses": 0, "bypassed": 0}
+bedrock_limit = ConcurrencyLimit("bedrock")  # capped by batch_agent.py, unlimited otherwise
+prompt_cache_stats = {"calls": 0, "input_tokens": 0, "cache_read_tokens": 0, "cache_write_tokens": 0}
+# Guards cache_stats and prompt_cache_stats - batch_agent.py workers update them concurrently
+_stats_lock = threading.Lock()
+
+
+def get_bedrock_client(region=DEFAULT_REGION):
+    """
+    Get the shared bedrock-runtime client for a region, creating it on first use.
+
+    Args:
+        region (str): AWS region
+
+    Returns:
+        botocore client: Reused for every call in this process
+    """
+    with _clients_lock:
+        if region not in _clients:
+            _clients[region] = boto3.client(service_name="bedrock-runtime", region_name=region)
+        return _clients[region]
+
+
+def set_bedrock_client(client, region=DEFAULT_REGION):
+    """
+    Use a given client for a region instead of creating one - e.g. a stub that
+    implements converse / converse_stream, for exercising the agents offline.
+
+    Args:
+        client: Object with the bedrock-runtime converse (and converse_stream) methods
+        region (str): AWS region it stands in for
+    """
+    with _clients_lock:
+        _clients[region] = client
+
+
+def system_blocks(text, cache_point=None, suffix=None):
+    """
+    Converse `system` content for a static instruction prefix.
+
+    Args:
+        text (str): Instructions that are identical on every call
+        cache_point (bool or None): Append a prompt-cache checkpoint; None applies BEDROCK_PROMPT_CACHE
+        suffix (str): Per-call system text after the checkpoint (not cached)
+
+    Returns:
+        list: [{"text": ...}, {"cachePoint": {"type": "default"}}, {"text": suffix}]
+    """
+    blocks = [{"text": text}]
+    if PROMPT_CACHE if cache_point is None else cache_point:
+        blocks.append({"cachePoint": {"type": "default"}})
+    if suffix:
+        blocks.append({"text": suffix})
+    return blocks
+
+
+def prompt_cache_usage(usage):
+    """
+    Pull the prompt-cache numbers out of a Converse usage block.
+
+    Args:
+        usage (dict): Converse usage (inputTokens, cacheReadInputTokens, cacheWriteInputTokens...)
+
+    Returns:
+        dict: input_tokens (not from cache), cache_read_tokens, cache_write_tokens
+    """
+    return {
+        "input_tokens": usage.get("inputTokens", 0),
+        "cache_read_tokens": usage.get("cacheReadInputTokens", 0),
+        "cache_write_tokens": usage.get("cacheWriteInputTokens", 0),
+    }
+
+
+def _record_prompt_cache_usage(usage):
+    cache_usage = prompt_cache_usage(usage)
+    with _stats_lock:
+        prompt_cache_stats["calls"] += 1
+        for field, tokens in cache_usage.items():
+            prompt_cache_stats[field] += tokens
+    return cache_usage
+
+
+def _count_cache(outcome):
+    """Count a response cache "hits", "misses" or "bypassed" outcome."""
+    with _stats_lock:
+        cache_stats[outcome] += 1
+
+
+def format_prompt_cache_usage(cache_usage):
+    """One-line per-call prompt cache report for the CLIs."""
+    return (f"🧊 Prompt cache: {cache_usage['cache_read_tokens']:,} tokens read, "
+            f"{cache_usage['cache_write_tokens']:,} written, {cache_usage['input_tokens']:,} uncached input tokens")
+
+
+def format_prompt_cache_stats():
+    """Totals for this process: share of input tokens served from the prompt cache."""
+    with _stats_lock:
+        stats = dict(prompt_cache_stats)
+    read = stats["cache_read_tokens"]
+    total = read + stats["cache_write_tokens"] + stats["input_tokens"]
+    share = f"{read / total:.0%}" if total else "n/a"
+    return (f"🧊 Prompt cache: {stats['calls']} model calls, {read:,} of {total:,} input tokens "
+            f"read from cache ({share})")
+
+
+def _has_cache_point(extra):
+    return any("cachePoint" in block for block in extra.get("system", []))
+
+
+def inference_config(temperature=0.7, max_tokens=DEFAULT_MAX_TOKENS, top_p=0.9):
+    """
+    Build a Converse inferenceConfig.
+
+    Args:
+        temperature (float): 0 for repeatable answers (planning/extraction), higher for prose
+        max_tokens (int): Maximum length of the response
+        top_p (float): Nucleus sampling cutoff
+
+    Returns:
+        dict: inferenceConfig for converse / converse_stream
+    """
+    return {"maxTokens": max_tokens, "temperature": temperature, "topP": top_p}
+
+
+def should_cache(config, use_cache=None):
+    """
+    Decide whether a call may be answered from (and stored in) the response cache.
+
+    Never while a cassette is active: a cache hit would return before the cassette
+    sees the call, so a record run would miss it and a clean-machine replay fail.
+
+    Args:
+        config (dict): The call's inferenceConfig
+        use_cache (bool or None): Explicit override; None applies BEDROCK_CACHE
+
+    Returns:
+        bool: True if the response cache applies
+    """
+    if get_cassette() is not None:
+        return False
+    if use_cache is not None:
+        return use_cache
+    if CACHE_MODE == "off":
+        return False
+    if CACHE_MODE == "always":
+        return True
+    # Bedrock's default temperature for Claude is 1.0, so a missing value is not deterministic either
+    return config.get("temperature", 1.0) == 0
+
+
+def cache_key(model_id, messages, config, **extra):
+    """Hash of everything that changes the answer: model, messages, inferenceConfig (+ system prompt etc.)."""
+    request = {"modelId": model_id, "messages": messages, "inferenceConfig": config, **extra}
+    return hashlib.sha256(json.dumps(request, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _cache_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def read_cached_response(key):
+    """
+    Read a cached response, ignoring missing, corrupt or expired entries.
+
+    Args:
+        key (str): cache_key() of the request
+
+    Returns:
+        dict or None: The cached Converse response
+    """
+    path = _cache_path(key)
+    try:
+        with open(path, "r", encoding="utf-8") as cache_file:
+            entry = json.load(cache_file)
+        if time.time() - entry["created_at"] > CACHE_TTL_SECONDS:
+            os.remove(path)
+            return None
+        os.utime(path)  # mark as recently used so eviction keeps it
+        return entry["response"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_cached_response(key, model_id, response):
+    """
+    Store a response atomically, then evict the least recently used entries past the size limit.
+
+    Args:
+        key (str): cache_key() of the request
+        model_id (str): Model that produced the response (kept for inspection)
+        response (dict): JSON-serializable Converse response
+    """
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = _cache_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as cache_file:
+            json.dump({"created_at": time.time(), "model_id": model_id, "response": response}, cache_file)
+        os.replace(tmp_path, path)
+        evict_cache()
+    except OSError as e:
+        print(f"⚠️ Could not write Bedrock cache entry: {str(e)}")
+
+
+def evict_cache(max_bytes=CACHE_MAX_BYTES):
+    """
+    Delete expired entries, then the least recently used ones until the cache fits in max_bytes.
+
+    Args:
+        max_bytes (int): Size budget for the cache directory
+
+    Returns:
+        int: Number of entries removed
+    """
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    removed = 0
+    total = sum(size for _, size, _ in entries)
+    now = time.time()
+    for mtime, size, path in sorted(entries):
+        # mtime is refreshed on every hit, so an entry untouched for the TTL is expired too
+        if total <= max_bytes and now - mtime <= CACHE_TTL_SECONDS:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def converse(messages, model_id=DEFAULT_MODEL_ID, config=None, region=DEFAULT_REGION, use_cache=None, **extra):
+    """
+    Call Bedrock Converse through the shared client, the response cache and the cassette.
+
+    Args:
+        messages (list): Converse messages
+        model_id (str): Bedrock model id
+        config (dict): inferenceConfig (see inference_config())
+        region (str): AWS region
+        use_cache (bool or None): Force the response cache on/off; None applies BEDROCK_CACHE
+        **extra: Other Converse arguments (system, toolConfig...) - part of the cache key
+
+    Returns:
+        dict: {"output", "usage", "cached"} - the JSON-serializable parts of the response
+    """
+    config = config or inference_config()
+    caching = should_cache(config, use_cache)
+    key = cache_key(model_id, messages, config, **extra) if caching else None
+
+    if caching:
+        cached = read_cached_response(key)
+        if cached is not None:
+            _count_cache("hits")
+            return {**cached, "cached": True}
+        _count_cache("misses")
+    else:
+        _count_cache("bypassed")
+
+    def call_bedrock():
+        with bedrock_limit.slot():
+            response = get_bedrock_client(region).converse(
+                modelId=model_id, messages=messages, inferenceConfig=config, **extra
+            )
+        # Only the JSON-serializable parts are kept (no ResponseMetadata)
+        return {"output": response["output"], "usage": response.get("usage", {})}
+
+    response = cassette_fetch(bedrock_key(model_id, messages, config, **extra), call_bedrock)
+    if caching:
+        write_cached_response(key, model_id, response)
+    _record_prompt_cache_usage(response.get("usage", {}))
+    return {**response, "cached": False}
+
+
+def converse_text(prompt, temperature=0.7, max_tokens=DEFAULT_MAX_TOKENS, use_cache=None, **kwargs):
+    """
+    Send a single user prompt and return Claude's text - what call_claude_sonnet needs.
+    When the call has a cached system prefix, its prompt-cache usage is printed.
+
+    Args:
+        prompt (str): The user prompt
+        temperature (float): 0 makes the call repeatable (and cacheable by default)
+        max_tokens (int): Maximum length of the response
+        use_cache (bool or None): Force the response cache on/off
+        **kwargs: Passed to converse() - e.g. system=system_blocks(INSTRUCTIONS)
+
+    Returns:
+        tuple: (success: bool, text or error message: str)
+    """
+    messages = [{"role": "user", "content": [{"text": prompt}]}]
+    try:
+        response = converse(
+            messages, config=inference_config(temperature, max_tokens), use_cache=use_cache, **kwargs
+        )
+        if _has_cache_point(kwargs) and not response["cached"]:
+            print(format_prompt_cache_usage(prompt_cache_usage(response.get("usage", {}))))
+        return True, response["output"]["message"]["content"][0]["text"]
+    except Exception as e:
+        return False, f"Error calling Claude: {str(e)}"
+
+
+def _print_text(text):
+    print(text, end="", flush=True)
+
+
+def converse_stream_text(prompt, temperature=0.7, max_tokens=DEFAULT_MAX_TOKENS, use_cache=None,
+                         on_text=_print_text, region=DEFAULT_REGION, model_id=DEFAULT_MODEL_ID, **extra):
+    """
+    Stream Claude's answer with converse_stream, handing each text chunk to on_text as it arrives.
+
+    Falls back to the blocking converse call (same cache and cassette as converse_text) when
+    the response is cached, a cassette is active, or the stream can't be opened - the whole
+    text is then passed to on_text at once.
+
+    Args:
+        prompt (str): The user prompt
+        temperature (float): Creativity level
+        max_tokens (int): Maximum length of the response
+        use_cache (bool or None): Force the response cache on/off
+        on_text (callable): Called with every text chunk (default: print without newline)
+        region (str): AWS region
+        model_id (str): Bedrock model id
+        **extra: Other Converse arguments (system, toolConfig...)
+
+    Returns:
+        tuple: (success: bool, text or error message: str, stats: dict) where stats has
+        streamed, time_to_first_token_ms, total_ms, output_tokens and tokens_per_second
+        (generation rate after the first token; end-to-end rate for the blocking fallback),
+        plus input_tokens, cache_read_tokens and cache_write_tokens
+    """
+    messages = [{"role": "user", "content": [{"text": prompt}]}]
+    config = inference_config(temperature, max_tokens)
+    started = time.perf_counter()
+    caching = should_cache(config, use_cache)
+    key = cache_key(model_id, messages, config, **extra) if caching else None
+
+    # Cached answers and cassette runs don't stream - they go through the blocking path
+    # (caching is always False while a cassette is active, see should_cache)
+    if get_cassette() is None and not (caching and os.path.exists(_cache_path(key))):
+        chunks = []
+        first_token_at = None
+        usage = {}
+        try:
+            # The slot is held until the stream is consumed - the model is busy until then
+            with bedrock_limit.slot():
+                stream = get_bedrock_client(region).converse_stream(
+                    modelId=model_id, messages=messages, inferenceConfig=config, **extra
+                )["stream"]
+                for event in stream:
+                    delta = event.get("contentBlockDelta", {}).get("delta", {}).get("text")
+                    if delta:
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                        chunks.append(delta)
+                        on_text(delta)
+                    elif "metadata" in event:
+                        usage = event["metadata"].get("usage", {})
+            text = "".join(chunks)
+            _record_prompt_cache_usage(usage)
+            if caching:
+                _count_cache("misses")
+                write_cached_response(key, model_id, {
+                    "output": {"message": {"role": "assistant", "content": [{"text": text}]}},
+                    "usage": usage,
+                })
+            else:
+                _count_cache("bypassed")
+            return True, text, _stream_stats(True, started, first_token_at, usage, text)
+        except Exception as e:
+            if chunks:
+                # Part of the answer is already on screen - don't print it twice
+                return False, f"Stream interrupted: {str(e)}", _stream_stats(True, started, first_token_at, usage, "".join(chunks))
+            print(f"⚠️ Streaming unavailable ({type(e).__name__}), using the blocking call")
+
+    try:
+        response = converse(messages, model_id=model_id, config=config, region=region, use_cache=use_cache, **extra)
+    except Exception as e:
+        return False, f"Error calling Claude: {str(e)}", _stream_stats(False, started, None, {}, "")
+    text = response["output"]["message"]["content"][0]["text"]
+    first_token_at = time.perf_counter()
+    on_text(text)
+    return True, text, _stream_stats(False, started, first_token_at, response.get("usage", {}), text)
+
+
+def _stream_stats(streamed, started, first_token_at, usage, text):
+    finished = time.perf_counter()
+    first_token_at = first_token_at or finished
+    output_tokens = usage.get("outputTokens")
+    if output_tokens is None:
+        # Rough 4 characters per token when Bedrock didn't report usage
+        output_tokens = max(1, len(text) // 4) if text else 0
+    # Streaming: generation rate after the first token. Blocking: everything arrives at once,
+    # so only the end-to-end rate is meaningful
+    generation_seconds = (finished - first_token_at) if streamed else (finished - started)
+    return {
+        "streamed": streamed,
+        "time_to_first_token_ms": round((first_token_at - started) * 1000),
+        "total_ms": round((finished - started) * 1000),
+        "output_tokens": output_tokens,
+        "tokens_per_second": round(output_tokens / generation_seconds, 1) if generation_seconds > 0 else None,
+        **prompt_cache_usage(usage),
+    }
+
+
+def format_stream_stats(stats):
+    """One-line summary of converse_stream_text stats for the CLIs."""
+    rate = f"{stats['tokens_per_second']} tokens/s" if stats["tokens_per_second"] else "n/a tokens/s"
+    mode = "streamed" if stats["streamed"] else "blocking"
+    line = (f"⏱️ {mode}: first token {stats['time_to_first_token_ms']} ms · "
+            f"{stats['output_tokens']} tokens in {stats['total_ms'] / 1000:.1f} s · {rate}")
+    if stats.get("cache_read_tokens") or stats.get("cache_write_tokens"):
+        line += f" · {stats['cache_read_tokens']:,} prompt tokens from cache"
+    return line
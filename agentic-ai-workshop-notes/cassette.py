@@ -0,0 +1,178 @@
+# Record/Replay Cassettes for the workshop agents
+# Capture Riot API, NWS and Bedrock responses once, then replay them offline
+
+"""
+Record/replay layer for the agent CLIs (league_agent_example.py, weather_agent_cli.py).
+
+Profiling the agents against live Riot, NWS and Bedrock endpoints is slow,
+rate-limited and non-deterministic. With a cassette, every response is captured
+to a gzip-compressed JSON file once and replayed afterwards - either with the
+latency it was recorded with, or instantly.
+
+Configure it with environment variables (nothing changes when they are unset):
+    CASSETTE_MODE=record    CASSETTE_PATH=cassettes/league.json.gz   python league_agent_example.py
+    CASSETTE_MODE=replay    CASSETTE_PATH=cassettes/league.json.gz   python league_agent_example.py
+    CASSETTE_TIMING=zero    # replay without the recorded latency (default: original)
+
+Identical requests replay in the order they were recorded, so a recorded
+conversation replays turn by turn even though Bedrock itself is not deterministic.
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+CASSETTE_MODES = ("record", "replay")
+CASSETTE_TIMINGS = ("original", "zero")
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+class Cassette:
+    """
+    Recorded request -> response interactions backed by a .json.gz file.
+
+    Args:
+        path (str): Cassette file
+        mode (str): "record" or "replay"
+        timing (str): "original" sleeps for the recorded latency on replay, "zero" doesn't
+    """
+
+    def __init__(self, path, mode="replay", timing="original"):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}' - use one of {CASSETTE_MODES}")
+        if timing not in CASSETTE_TIMINGS:
+            raise ValueError(f"Unknown cassette timing '{timing}' - use one of {CASSETTE_TIMINGS}")
+        self.path = path
+        self.mode = mode
+        self.timing = timing
+        self.lock = threading.Lock()
+        self.interactions = {}  # key -> list of recordings, in recorded order
+        self.play_counts = {}  # key -> how many recordings have been replayed
+
+        if mode == "replay":
+            with gzip.open(path, "rt", encoding="utf-8") as cassette_file:
+                for interaction in json.load(cassette_file)["interactions"]:
+                    self.interactions.setdefault(interaction["key"], []).append(interaction)
+        else:
+            # Written once when the agent exits - the CLIs are interactive loops
+            atexit.register(self.save)
+
+    def save(self):
+        """Write the recorded interactions to the cassette file (record mode only)."""
+        if self.mode != "record":
+            return
+        with self.lock:
+            interactions = [i for recordings in self.interactions.values() for i in recordings]
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as cassette_file:
+            json.dump({"version": 1, "interactions": interactions}, cassette_file, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        print(f"💾 Cassette saved: {len(interactions)} interactions to {self.path}")
+
+    def fetch(self, key, perform):
+        """
+        Replay the recorded response for a request, or perform it and record the response.
+
+        Args:
+            key (str): Request identity - must never contain secrets such as API keys
+            perform (callable): Makes the real request, returns a JSON-serializable response
+
+        Returns:
+            The live or recorded response
+        """
+        if self.mode == "replay":
+            with self.lock:
+                recordings = self.interactions.get(key)
+                if not recordings:
+                    raise CassetteMiss(f"No recorded interaction for {key} in {self.path}")
+                position = self.play_counts.get(key, 0)
+                self.play_counts[key] = position + 1
+            # Once a request's recordings run out, keep serving the last one
+            interaction = recordings[min(position, len(recordings) - 1)]
+            if self.timing == "original":
+                time.sleep(interaction["elapsed_ms"] / 1000.0)
+            return interaction["response"]
+
+        started = time.perf_counter()
+        response = perform()
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        with self.lock:
+            self.interactions.setdefault(key, []).append(
+                {"key": key, "response": response, "elapsed_ms": elapsed_ms}
+            )
+        return response
+
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette():
+    """
+    The cassette configured through CASSETTE_MODE / CASSETTE_PATH / CASSETTE_TIMING.
+
+    Created once even when the batch runner's worker threads ask for it at the same time.
+
+    Returns:
+        Cassette or None: None when record/replay is switched off
+    """
+    global _cassette
+    if _cassette is not None:
+        return _cassette
+    mode = os.getenv("CASSETTE_MODE", "").lower()
+    if mode not in CASSETTE_MODES:
+        return None
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette(
+                os.environ["CASSETTE_PATH"], mode, os.getenv("CASSETTE_TIMING", "original").lower()
+            )
+        return _cassette
+
+
+def cassette_fetch(key, perform):
+    """
+    Run `perform` through the configured cassette, or directly when there is none.
+
+    Args:
+        key (str): Request identity (see bedrock_key / http_key)
+        perform (callable): Makes the real request, returns a JSON-serializable response
+
+    Returns:
+        The live or recorded response
+    """
+    cassette = get_cassette()
+    if cassette is None:
+        return perform()
+    return cassette.fetch(key, perform)
+
+
+def http_key(method, url):
+    """Cassette key for an HTTP request - headers (and the API keys in them) are left out."""
+    return f"{method} {url}"
+
+
+def bedrock_key(model_id, messages, inference_config, **extra):
+    """
+    Cassette key for a Bedrock call: a hash of the model, prompt and inference settings.
+
+    Args:
+        model_id (str): Bedrock model id
+        messages (list): Converse messages
+        inference_config (dict): Converse inferenceConfig
+        **extra: Any other request fields that change the answer (system prompt, tools...)
+
+    Returns:
+        str: "bedrock <model_id> <sha256>"
+    """
+    request = {"modelId": model_id, "messages": messages, "inferenceConfig": inference_config, **extra}
+    digest = hashlib.sha256(json.dumps(request, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"bedrock {model_id} {digest}"
@@ -0,0 +1,69 @@
+# Concurrency limits shared by the workshop agents
+# Cap how many Bedrock / Riot / NWS requests are in flight at once across threads
+
+"""
+Per-service request caps for batch runs (batch_agent.py).
+
+Each client module owns one ConcurrencyLimit and wraps the real network call
+(not the cache or cassette lookup) in `with limit.slot():`. Limits are off
+until set() is called, so the interactive CLIs behave exactly as before; the
+batch runner sets them from --bedrock-concurrency / --api-concurrency so that
+32 queries in flight don't become 32 simultaneous model calls (Bedrock
+throttles on requests per minute) or 100 Riot calls (the API key's rate limit).
+
+Usage:
+    bedrock_limit = ConcurrencyLimit("bedrock")
+    with bedrock_limit.slot():
+        client.converse(...)
+"""
+
+import contextlib
+import threading
+import time
+
+
+class ConcurrencyLimit:
+    """A cap on concurrent calls, unlimited until set() is called."""
+
+    def __init__(self, name):
+        self.name = name
+        self.max_concurrent = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "waited_ms": 0.0, "in_flight": 0, "peak": 0}
+
+    def set(self, max_concurrent):
+        """
+        Set the cap (None or 0 removes it). Call before starting worker threads.
+
+        Args:
+            max_concurrent (int or None): Maximum calls in flight at once
+        """
+        self.max_concurrent = max_concurrent or None
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+
+    @contextlib.contextmanager
+    def slot(self):
+        """Hold one slot for the duration of the block, waiting if all are taken."""
+        slots = self._slots
+        started = time.perf_counter()
+        if slots is not None:
+            slots.acquire()
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["waited_ms"] += (time.perf_counter() - started) * 1000
+            self.stats["in_flight"] += 1
+            self.stats["peak"] = max(self.stats["peak"], self.stats["in_flight"])
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stats["in_flight"] -= 1
+            if slots is not None:
+                slots.release()
+
+    def format_stats(self):
+        """One-line summary: calls, peak concurrency and total time spent waiting for a slot."""
+        limit = self.max_concurrent or "unlimited"
+        return (f"{self.name}: {self.stats['calls']} calls, peak {self.stats['peak']} in flight (limit {limit}), "
+                f"{self.stats['waited_ms'] / 1000:.1f} s waiting for a slot")
@@ -0,0 +1,264 @@
+# Offline US gazetteer for the weather agent
+# Resolve city / ZIP / state input to coordinates without asking the model
+
+"""
+Local location lookup for weather_agent_cli.py.
+
+Step 1 of the weather agent used to send every location to Claude just to get
+back "https://api.weather.gov/points/LAT,LON" - a full model round trip for
+"Seattle" or "98101". This module answers those from a bundled table
+(data/us_gazetteer.json: state centers, major cities, downtown ZIP centroids,
+common nicknames) in microseconds, and only reports a miss for input it can't
+place or that matches more than one place ("Springfield", "Kansas City"), so the
+agent falls back to the model for exactly those.
+
+Lookups, in order:
+1. "lat,lon" typed directly
+2. 5-digit ZIP or ZIP+4
+3. Exact normalized name: "St. Louis, MO" == "saint louis mo" == "Saint Louis Missouri"
+4. Unique prefix: "seatt" -> Seattle, WA ("san" is ambiguous and falls through)
+
+The bundled table is a curated subset. For full coverage point these at the
+Census Bureau Gazetteer files (tab-separated, https://www.census.gov/geographies/reference-files/time-series/geo/gazetteer-files.html):
+    GAZETTEER_ZCTA_FILE    e.g. 2023_Gaz_zcta_national.txt   (every ZIP code tabulation area)
+    GAZETTEER_PLACES_FILE  e.g. 2023_Gaz_place_national.txt  (every incorporated place / CDP)
+    GAZETTEER_FILE         replaces the bundled JSON table
+"""
+
+import bisect
+import csv
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+
+GAZETTEER_FILE = os.getenv(
+    "GAZETTEER_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "us_gazetteer.json")
+)
+ZCTA_FILE = os.getenv("GAZETTEER_ZCTA_FILE")
+PLACES_FILE = os.getenv("GAZETTEER_PLACES_FILE")
+MIN_PREFIX_LENGTH = 4  # shorter prefixes match too many places to be useful
+DOMINANT_POPULATION_RATIO = 5  # "Portland" -> Portland, OR only if it's 5x any other Portland
+
+COORDINATES_PATTERN = re.compile(r"^\s*(-?\d{1,2}(?:\.\d+)?)\s*,\s*(-?\d{1,3}(?:\.\d+)?)\s*$")
+ZIP_PATTERN = re.compile(r"^\s*(\d{5})(?:-\d{4})?\s*$")
+ABBREVIATIONS = {"st": "saint", "ste": "sainte", "ft": "fort", "mt": "mount", "pt": "point"}
+COUNTRY_SUFFIXES = ("united states", "usa", "us")
+PLACE_SUFFIXES = re.compile(r"\s+(city and borough|city|town|village|borough|CDP|municipality)$")
+
+_index = None  # built on first lookup
+_index_lock = threading.Lock()
+
+# Reported by format_gazetteer_stats(); llm_ms holds the model planner times for the fallbacks
+gazetteer_stats = {"lookups": 0, "hits": 0, "ambiguous": 0, "misses": 0, "lookup_ms": 0.0, "llm_ms": []}
+_stats_lock = threading.Lock()  # batch_agent.py workers update the stats concurrently
+
+
+def normalize(text):
+    """
+    Normalize a place name for lookup.
+
+    Lowercases, strips accents and punctuation, collapses whitespace, expands a
+    leading St./Ft./Mt. and drops a trailing country ("Seattle, WA, USA").
+
+    Args:
+        text (str): User input or gazetteer name
+
+    Returns:
+        str: e.g. "St. Louis, MO" -> "saint louis mo"
+    """
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+    text = re.sub(r"[^a-z0-9\s]", " ", text.replace(".", "").replace("'", ""))
+    words = text.split()
+    if len(words) > 1 and words[0] in ABBREVIATIONS:
+        words[0] = ABBREVIATIONS[words[0]]
+    normalized = " ".join(words)
+    for suffix in COUNTRY_SUFFIXES:
+        if normalized.endswith(" " + suffix):
+            normalized = normalized[: -len(suffix) - 1]
+            break
+    return normalized
+
+
+def _place(name, state, lat, lon, kind, population=0):
+    if kind == "zip":
+        label = f"ZIP {name} ({state})" if state else f"ZIP {name}"
+    else:
+        label = f"{name}, {state}" if state and kind == "city" else name
+    return {"label": label, "state": state, "lat": float(lat), "lon": float(lon), "kind": kind,
+            "population": int(population)}
+
+
+def _add(names, key, place):
+    candidates = names.setdefault(key, [])
+    if all(existing["label"] != place["label"] for existing in candidates):
+        candidates.append(place)
+
+
+def _read_census_rows(path):
+    # Census gazetteer files are tab-separated with padded header names
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as census_file:
+        reader = csv.reader(census_file, delimiter="\t")
+        header = [column.strip() for column in next(reader)]
+        for row in reader:
+            yield dict(zip(header, (value.strip() for value in row)))
+
+
+def _build_index():
+    with open(GAZETTEER_FILE, "r", encoding="utf-8") as gazetteer_file:
+        data = json.load(gazetteer_file)
+
+    names = {}  # normalized key -> [place, ...]
+    zips = {}
+    state_names = {abbr: name for abbr, name, _, _ in data["states"]}
+    cities = {}  # (city, state) -> place, for aliases
+
+    for abbr, name, lat, lon in data["states"]:
+        place = _place(name, abbr, lat, lon, "state")
+        _add(names, normalize(name), place)
+        _add(names, abbr.lower(), place)
+
+    def add_city(name, state, lat, lon, population=0):
+        place = _place(name, state, lat, lon, "city", population)
+        cities[(name, state)] = place
+        _add(names, normalize(name), place)
+        _add(names, normalize(f"{name} {state}"), place)
+        if state in state_names:
+            _add(names, normalize(f"{name} {state_names[state]}"), place)
+
+    for name, state, lat, lon, population in data["cities"]:
+        add_city(name, state, lat, lon, population)
+    for code, label, lat, lon in data["zips"]:
+        zips[code] = _place(code, label, lat, lon, "zip")
+    for alias, name, state in data.get("aliases", []):
+        _add(names, normalize(alias), cities[(name, state)])
+
+    if PLACES_FILE:
+        for row in _read_census_rows(PLACES_FILE):
+            name = PLACE_SUFFIXES.sub("", row["NAME"])
+            if (name, row["USPS"]) not in cities:
+                add_city(name, row["USPS"], row["INTPTLAT"], row["INTPTLONG"])
+    if ZCTA_FILE:
+        for row in _read_census_rows(ZCTA_FILE):
+            zips.setdefault(row["GEOID"], _place(row["GEOID"], "", row["INTPTLAT"], row["INTPTLONG"], "zip"))
+
+    return {"names": names, "keys": sorted(names), "zips": zips}
+
+
+def get_index():
+    """Load the gazetteer on first use (a few ms for the bundled table)."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = _build_index()
+        return _index
+
+
+def _pick(candidates):
+    """One place, or None when the candidates are genuinely different places."""
+    if len(candidates) == 1:
+        return candidates[0]
+    if any(place["kind"] == "state" for place in candidates):
+        return None  # "Washington", "New York": the state or the city?
+    ranked = sorted(candidates, key=lambda place: place["population"], reverse=True)
+    if ranked[0]["population"] >= DOMINANT_POPULATION_RATIO * max(ranked[1]["population"], 1):
+        return ranked[0]
+    return None
+
+
+def _prefix_candidates(index, key):
+    keys = index["keys"]
+    candidates = []
+    position = bisect.bisect_left(keys, key)
+    while position < len(keys) and keys[position].startswith(key):
+        for place in index["names"][keys[position]]:
+            if all(existing["label"] != place["label"] for existing in candidates):
+                candidates.append(place)
+        position += 1
+    return candidates
+
+
+def lookup(location):
+    """
+    Resolve a location to coordinates from the local gazetteer.
+
+    Args:
+        location (str): What the user typed - city, "City, ST", ZIP, state or "lat,lon"
+
+    Returns:
+        tuple: (place: dict or None, method: str) - place has label, lat, lon and kind;
+            method is "coordinates", "zip", "exact", "prefix", "ambiguous" or "miss"
+    """
+    started = time.perf_counter()
+    place, method = _lookup(location)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    outcome = "hits" if place else "ambiguous" if method == "ambiguous" else "misses"
+    with _stats_lock:
+        gazetteer_stats["lookups"] += 1
+        gazetteer_stats["lookup_ms"] += elapsed_ms
+        gazetteer_stats[outcome] += 1
+    return place, method
+
+
+def _lookup(location):
+    match = COORDINATES_PATTERN.match(location)
+    if match:
+        lat, lon = float(match.group(1)), float(match.group(2))
+        if -90 <= lat <= 90 and -180 <= lon <= 180:
+            return _place(f"{lat},{lon}", "", lat, lon, "coordinates"), "coordinates"
+
+    index = get_index()
+    match = ZIP_PATTERN.match(location)
+    if match:
+        place = index["zips"].get(match.group(1))
+        return (place, "zip") if place else (None, "miss")
+
+    key = normalize(location)
+    if not key:
+        return None, "miss"
+    candidates = index["names"].get(key)
+    if candidates:
+        place = _pick(candidates)
+        return (place, "exact") if place else (None, "ambiguous")
+
+    if len(key) >= MIN_PREFIX_LENGTH:
+        candidates = _prefix_candidates(index, key)
+        if candidates:
+            place = _pick(candidates)
+            return (place, "prefix") if place else (None, "ambiguous")
+    return None, "miss"
+
+
+def points_url(place):
+    """NWS Points API URL for a place (NWS accepts at most 4 decimals)."""
+    return f"https://api.weather.gov/points/{place['lat']:.4f},{place['lon']:.4f}"
+
+
+def record_llm_fallback(elapsed_ms):
+    """Remember how long a model planning call took, to estimate what the hits saved."""
+    with _stats_lock:
+        gazetteer_stats["llm_ms"].append(elapsed_ms)
+
+
+def format_gazetteer_stats():
+    """
+    One-line hit rate and latency summary for the CLIs.
+
+    Latency saved is hits x the average model planning time measured for the
+    fallbacks in this session, so it only appears once at least one fallback ran.
+    """
+    with _stats_lock:
+        stats = {**gazetteer_stats, "llm_ms": list(gazetteer_stats["llm_ms"])}
+    lookups = stats["lookups"]
+    if not lookups:
+        return "📍 Gazetteer: no lookups yet"
+    hits = stats["hits"]
+    line = (f"📍 Gazetteer: {hits}/{lookups} locations resolved locally ({hits / lookups:.0%}), "
+            f"{stats['ambiguous']} ambiguous, {stats['misses']} unknown, "
+            f"avg lookup {stats['lookup_ms'] / lookups:.2f} ms")
+    if stats["llm_ms"]:
+        average_llm_ms = sum(stats["llm_ms"]) / len(stats["llm_ms"])
+        line += f"; ~{hits * average_llm_ms / 1000:.1f} s of AI planning saved (avg {average_llm_ms:.0f} ms/call)"
+    return line
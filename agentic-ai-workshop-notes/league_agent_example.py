@@ -1,86 +1,71 @@
 # League of Legends Agentic AI Agent
 # Adapted from the weather workshop pattern by Claude 4.0 Sonnet
 
-import boto3
 import json
-import requests
 import os
+import time
 from dotenv import load_dotenv
+from bedrock_calls import (
+    converse_text, converse_stream_text, format_stream_stats, format_prompt_cache_stats,
+)
+from agent_instructions import agent_system
+from league_query_planner import plan_query, record_llm_plan, format_planner_stats, strategy_intents
+from riot_agent_client import account_url, fetch_json, fetch_player_data, normalize_platform
+from payload_minimizer import minimize_payload, format_minimize_stats
 
 # Load environment variables
 load_dotenv()
 
+# Print insights token by token as Claude writes them (AGENT_STREAM=0 to wait for the full text)
+STREAM_RESPONSES = os.getenv("AGENT_STREAM", "1") != "0"
+TOP_MASTERY_CHAMPIONS = 5  # the analysis only needs the player's best champions
 
-def call_claude_sonnet(prompt):
+def call_claude_sonnet(prompt, temperature=0.7, use_cache=None, system=None):
     """
     Send prompt to Claude 4.0 Sonnet - the AI brain of our agent.
+    Uses the shared Bedrock client and response cache in bedrock_calls.py
+    (temperature 0 calls are answered from the cache when the same prompt repeats).
+    Fixed instructions go in system (see agent_instructions.agent_system()) so Bedrock can cache them.
     """
-    bedrock = boto3.client(
-        service_name="bedrock-runtime", region_name=os.getenv("AWS_REGION", "us-west-2")
-    )
-
-    try:
-        response = bedrock.converse(
-            modelId="us.anthropic.claude-sonnet-4-20250514-v1:0",
-            messages=[{"role": "user", "content": [{"text": prompt}]}],
-            inferenceConfig={"maxTokens": 2000, "temperature": 0.7, "topP": 0.9},
-        )
-        return True, response["output"]["message"]["content"][0]["text"]
-    except Exception as e:
-        return False, f"Error calling Claude: {str(e)}"
+    extra = {"system": system} if system else {}
+    return converse_text(prompt, temperature=temperature, use_cache=use_cache, **extra)
 
 
 def execute_riot_api_call(url, headers):
     """
     Execute Riot Games API call - our agent's action in the real world.
+    Uses the pooled session in riot_agent_client.py and goes through the
+    record/replay cassette when CASSETTE_MODE is set.
     """
-    try:
-        response = requests.get(url, headers=headers, timeout=30)
-        if response.status_code == 200:
-            return True, response.json()
-        else:
-            return False, f"API call failed: {response.status_code} - {response.text}"
-    except Exception as e:
-        return False, f"Error executing API call: {str(e)}"
+    return fetch_json(url, headers)
 
 
 def generate_riot_api_strategy(player_query):
     """
     Use Claude to plan the Riot API call sequence based on user query.
     This demonstrates AI autonomy - deciding what APIs to call.
+    Queries with a Riot ID and a clear intent ("mastery for Faker#KR1") are planned
+    by the rule-based planner in league_query_planner.py without a model call.
     """
-    prompt = f"""
-You are an expert at the Riot Games API for League of Legends.
-
-User Query: "{player_query}"
-
-Based on this query, determine the API call sequence needed. The typical flow is:
-1. Get PUUID: /riot/account/v1/accounts/by-riot-id/{{gameName}}/{{tagLine}}
-2. Get Summoner: /lol/summoner/v4/summoners/by-puuid/{{puuid}}
-3. Get specific data based on query:
-   - Champion Mastery: /lol/champion-mastery/v4/champion-masteries/by-puuid/{{puuid}}
-   - Match History: /lol/match/v5/matches/by-puuid/{{puuid}}/ids
-   - Ranked Stats: /lol/league/v4/entries/by-summoner/{{summonerId}}
-
-Extract the player name and tag from the query (format: "PlayerName#TAG").
-If no specific player mentioned, ask for clarification.
-
-Return a JSON response with:
-{{
-    "player_name": "extracted_name",
-    "tag_line": "extracted_tag", 
-    "api_sequence": ["step1", "step2", "step3"],
-    "data_focus": "what_data_to_highlight"
-}}
-"""
+    strategy = plan_query(player_query)
+    if strategy:
+        print(f"🧭 Planned without AI: {strategy['player_name']}#{strategy['tag_line']} -> {', '.join(strategy['intents'])}")
+        return True, strategy
+
+    # The instructions are a fixed (prompt-cached) system prefix; only the query varies
+    prompt = f'User Query: "{player_query}"'
 
     print(f"🧠 AI is analyzing query and planning API strategy...")
-    success, response = call_claude_sonnet(prompt)
+    # Temperature 0: the plan for a query should be the same every time, so it can be cached
+    started = time.perf_counter()
+    success, response = call_claude_sonnet(prompt, temperature=0, system=agent_system("league_strategy"))
+    record_llm_plan((time.perf_counter() - started) * 1000)
 
     if success:
         try:
             # Parse Claude's JSON response
             strategy = json.loads(response.strip())
+            strategy["planner"] = "llm"
             return True, strategy
         except json.JSONDecodeError:
             return False, f"AI returned invalid JSON: {response}"
@@ -88,33 +73,69 @@ Return a JSON response with:
         return False, response
 
 
-def process_league_data(raw_data, query, data_type):
+def process_league_data(raw_data, query, data_type, stream=False):
     """
     Use Claude to convert raw Riot API data into human-readable insights.
     This demonstrates AI processing and analysis capabilities.
+    With stream=True the insights are printed as they are generated, followed by
+    time-to-first-token and tokens/sec.
     """
-    prompt = f"""
-You are a League of Legends data analyst. Convert this raw Riot API data into helpful insights.
+    # Only the fields the analysis uses, as compact JSON (was json.dumps(indent=2) of everything)
+    api_data, payload_stats = minimize_payload(raw_data, data_type)
+    print(format_minimize_stats(payload_stats))
 
-Original Query: "{query}"
+    prompt = f"""Original Query: "{query}"
 Data Type: {data_type}
-Raw API Data: {json.dumps(raw_data, indent=2)}
-
-Create a clear, engaging summary that:
-1. Answers the user's original question
-2. Highlights key statistics and achievements
-3. Provides actionable insights or recommendations
-4. Uses League terminology appropriately
-5. Formats the response to be easy to read
-
-Focus on being helpful and informative for a League player.
+API Data: {api_data}
 """
 
     print(f"📊 AI is analyzing League data and creating insights...")
-    success, response = call_claude_sonnet(prompt)
+    system = agent_system("league_analysis")
+    if not stream:
+        return call_claude_sonnet(prompt, system=system)
+
+    print("=" * 60)
+    success, response, stats = converse_stream_text(prompt, system=system)
+    print()
+    print("=" * 60)
+    print(format_stream_stats(stats))
     return success, response
 
 
+def build_player_profile(puuid, results):
+    """
+    Combine the fetched data sets into the single payload the analysis prompt gets.
+
+    Args:
+        puuid (str): Player PUUID (used to pick the player's line out of each match)
+        results (dict): fetch_player_data() results
+
+    Returns:
+        dict: {"puuid", and "champion_mastery" / "ranked" / "recent_matches" for each successful fetch}
+    """
+    profile = {"puuid": puuid}
+    sections = {"mastery": "champion_mastery", "ranked": "ranked", "matches": "recent_matches"}
+    for intent, section in sections.items():
+        result = results.get(intent)
+        if result and result["success"]:
+            profile[section] = result["data"][:TOP_MASTERY_CHAMPIONS] if intent == "mastery" else result["data"]
+    return profile
+
+
+def print_fetch_results(results, intents):
+    """Show what each fetch returned and how long the parallel fetch took versus one at a time."""
+    labels = {"mastery": "champions", "ranked": "ranked queues", "matches": "matches"}
+    for intent in intents:
+        result = results.get(intent)
+        if result is None:
+            continue
+        if result["success"]:
+            print(f"✅ {intent}: {len(result['data'])} {labels[intent]} ({result['ms']:.0f} ms)")
+        else:
+            print(f"❌ {intent}: {result['error']}")
+    print(f"⚡ Fetched in {results['wall_ms']:,.0f} ms (one call at a time: ~{results['serial_ms']:,.0f} ms)")
+
+
 def run_league_agent():
     """
     Main agentic AI workflow for League of Legends queries.
@@ -134,6 +155,8 @@ def run_league_agent():
         query = input("\n🔍 Enter your League query (or 'quit' to exit): ").strip()
 
         if query.lower() in ["quit", "exit", "q"]:
+            print(format_planner_stats())
+            print(format_prompt_cache_stats())
             print("👋 Thanks for using the League AI Agent!")
             break
 
@@ -153,54 +176,50 @@ def run_league_agent():
             continue
 
         print(f"✅ Strategy: {strategy['api_sequence']}")
+        print(format_planner_stats())
 
         # Step 2: Execute API calls based on strategy
         print("\nStep 2: 🔗 Riot API Execution")
 
-        # Example: Get PUUID first
-        if strategy.get("player_name") and strategy.get("tag_line"):
-            puuid_url = f"https://americas.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{strategy['player_name']}/{strategy['tag_line']}"
-            print(
-                f"Fetching PUUID for {strategy['player_name']}#{strategy['tag_line']}..."
-            )
-
-            success, puuid_data = execute_riot_api_call(puuid_url, headers)
-            if not success:
-                print(f"❌ Failed to get PUUID: {puuid_data}")
-                continue
-
-            puuid = puuid_data["puuid"]
-            print(f"✅ Got PUUID: {puuid[:8]}...")
-
-            # Step 3: Get additional data based on strategy
-            print("\nStep 3: 📊 Fetching Player Data")
-            if "champion-mastery" in str(strategy["api_sequence"]):
-                mastery_url = f"https://na1.api.riotgames.com/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}"
-                success, mastery_data = execute_riot_api_call(mastery_url, headers)
-
-                if success:
-                    print(
-                        f"✅ Retrieved mastery data for {len(mastery_data)} champions"
-                    )
-
-                    # Step 4: AI Analysis
-                    print("\nStep 4: 🤖 AI Analysis")
-                    success, insights = process_league_data(
-                        mastery_data[:5], query, "champion_mastery"
-                    )
-
-                    if success:
-                        print("\nStep 5: 💬 Player Insights")
-                        print("=" * 60)
-                        print(insights)
-                        print("=" * 60)
-                    else:
-                        print(f"❌ Failed to analyze data: {insights}")
-                else:
-                    print(f"❌ Failed to get mastery data: {mastery_data}")
-        else:
+        if not (strategy.get("player_name") and strategy.get("tag_line")):
             print("❌ Could not extract player name and tag from query")
             print("💡 Try: 'Show champion mastery for PlayerName#TAG'")
+            continue
+
+        # Get PUUID first, from the account cluster for the player's platform
+        platform = normalize_platform(strategy.get("platform"))
+        print(f"Fetching PUUID for {strategy['player_name']}#{strategy['tag_line']} ({platform})...")
+        puuid_url = account_url(strategy["player_name"], strategy["tag_line"], platform)
+        success, puuid_data = execute_riot_api_call(puuid_url, headers)
+        if not success:
+            print(f"❌ Failed to get PUUID: {puuid_data}")
+            continue
+
+        puuid = puuid_data["puuid"]
+        print(f"✅ Got PUUID: {puuid[:8]}...")
+
+        # Step 3: Every data set the strategy asks for, fetched at the same time
+        intents = strategy_intents(strategy) or ["mastery"]
+        print(f"\nStep 3: 📊 Fetching Player Data ({', '.join(intents)})")
+        results = fetch_player_data(puuid, intents, platform, headers)
+        print_fetch_results(results, intents)
+
+        profile = build_player_profile(puuid, results)
+        if len(profile) == 1:  # only the puuid - every fetch failed
+            print("❌ No player data could be retrieved")
+            continue
+
+        # Step 4: AI Analysis of everything in one prompt
+        print("\nStep 4: 🤖 AI Analysis")
+        success, insights = process_league_data(profile, query, "player_profile", stream=STREAM_RESPONSES)
+
+        if not success:
+            print(f"❌ Failed to analyze data: {insights}")
+        elif not STREAM_RESPONSES:  # streamed insights are already on screen
+            print("\nStep 5: 💬 Player Insights")
+            print("=" * 60)
+            print(insights)
+            print("=" * 60)
 
 
 if __name__ == "__main__":
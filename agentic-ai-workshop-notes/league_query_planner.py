@@ -0,0 +1,257 @@
+# Rule-based planner for the League agent
+# Riot ID parsing + keyword intents, so most queries never need a planning model call
+
+"""
+Deterministic fast path for generate_riot_api_strategy in league_agent_example.py.
+
+"Show champion mastery for Faker#KR1" doesn't need a model to find the Riot ID
+or to decide that the mastery endpoint is the one to call - a regex and a
+keyword table do it in microseconds. plan_query() returns the same strategy
+dict the model is asked for (player_name, tag_line, api_sequence, data_focus)
+plus "intents" and "platform", or None when the query has no Riot ID or no
+recognizable intent - only then does the agent spend a model call planning.
+
+Intents:
+    mastery  - champion mastery (mains, best champions, mastery points)
+    matches  - match history (recent games, KDA, last played)
+    ranked   - ranked entries (tier, division, LP, win rate)
+"profile" / "stats" / "tell me about" style queries with no specific intent ask for all three.
+
+Usage:
+    strategy = plan_query("what rank is Faker#KR1 on kr")
+    print(format_planner_stats())
+"""
+
+import re
+import threading
+import time
+
+# Riot IDs: game name 3-16 characters (letters, digits, spaces, most unicode), tag line 3-5 alphanumerics
+QUOTED_RIOT_ID_PATTERN = re.compile(r"""["']([^"'#\n]{3,16}?)\s*#\s*([0-9A-Za-z]{3,5})["']""")
+TAG_PATTERN = re.compile(r"#\s*([0-9A-Za-z]{3,5})\b")
+MAX_GAME_NAME_LENGTH = 16
+
+# Words that end an unquoted game name when reading backwards from the '#'
+NAME_STOP_WORDS = {
+    "for", "of", "about", "show", "get", "give", "me", "find", "check", "fetch", "tell", "what", "whats",
+    "what's", "how", "is", "are", "does", "did", "has", "player", "summoner", "account", "the", "my",
+    "and", "from", "with", "to", "at", "please", "lookup", "look", "up", "vs", "versus",
+}
+
+INTENT_KEYWORDS = {
+    # "... champ" keywords also match "champs", "champion" and "champions" (see _keyword_pattern)
+    "mastery": ("mastery", "masteries", "mastered", "main", "mains", "champion pool", "champ pool",
+                "best champ", "top champ", "favorite champ", "favourite champ", "most played champ", "one trick",
+                "otp"),
+    "matches": ("match", "matches", "game history", "recent games", "last game", "last games", "history",
+                "played recently", "kda", "recent performance", "how did", "last played"),
+    "ranked": ("rank", "ranked", "tier", "division", "lp", "league points", "elo", "solo queue", "soloq",
+               "solo/duo", "flex", "climb", "promo", "win rate", "winrate", "wins", "losses"),
+}
+OVERVIEW_KEYWORDS = ("profile", "overview", "stats", "statistics", "everything", "summary", "summarize",
+                     "about", "all data", "full report", "look up", "lookup")
+INTENT_ORDER = ("mastery", "matches", "ranked")
+
+
+def _keyword_pattern(keywords):
+    # Whole words only: "main" should not match "remaining", "lp" should not match "help"
+    alternatives = (re.sub(r"champ$", "champ(?:ion)?s?", re.escape(keyword)) for keyword in keywords)
+    return re.compile(r"(?<![a-z])(?:" + "|".join(alternatives) + r")(?![a-z])")
+
+
+INTENT_PATTERNS = {intent: _keyword_pattern(keywords) for intent, keywords in INTENT_KEYWORDS.items()}
+OVERVIEW_PATTERN = _keyword_pattern(OVERVIEW_KEYWORDS)
+# Every word of every keyword phrase ("points" from "league points") - none belongs in an unquoted game name
+KEYWORD_WORDS = {word for keywords in (*INTENT_KEYWORDS.values(), OVERVIEW_KEYWORDS)
+                 for keyword in keywords for word in keyword.split()}
+
+# Endpoint templates per intent - the same strings the planning prompt lists
+ACCOUNT_ENDPOINT = "/riot/account/v1/accounts/by-riot-id/{gameName}/{tagLine}"
+INTENT_ENDPOINTS = {
+    "mastery": "/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}",
+    "matches": "/lol/match/v5/matches/by-puuid/{puuid}/ids",
+    "ranked": "/lol/league/v4/entries/by-puuid/{puuid}",
+}
+INTENT_FOCUS = {
+    "mastery": "top champions by mastery points",
+    "matches": "recent match results and performance",
+    "ranked": "ranked tier, division, LP and win rate",
+}
+
+# "on euw", "in kr", "(na)", or a platform id like "euw1"
+REGION_ALIASES = {
+    "na": "na1", "euw": "euw1", "eune": "eun1", "kr": "kr", "jp": "jp1", "br": "br1", "lan": "la1", "las": "la2",
+    "oce": "oc1", "tr": "tr1", "ru": "ru", "me": "me1", "sg": "sg2", "tw": "tw2", "vn": "vn2",
+}
+PLATFORM_IDS = {"na1", "euw1", "eun1", "kr", "jp1", "br1", "la1", "la2", "oc1", "tr1", "ru", "me1", "sg2", "tw2",
+                "vn2"}
+REGION_PATTERN = re.compile(
+    r"(?:\b(?:on|in|from|server|region)\s+|\()(" + "|".join(sorted(REGION_ALIASES, key=len, reverse=True))
+    + r")\b\)?|\b(" + "|".join(sorted(PLATFORM_IDS, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+
+# Reported by format_planner_stats()
+planner_stats = {"queries": 0, "rules": 0, "llm": 0, "rules_ms": 0.0, "llm_ms": 0.0}
+_stats_lock = threading.Lock()  # batch_agent.py workers update the stats concurrently
+
+
+def parse_riot_id(query):
+    """
+    Find a Riot ID ("GameName#TAG") in a free-text query.
+
+    Quoted IDs may contain spaces anywhere ('"Hide on bush#KR1"'); unquoted
+    game names are read backwards from the '#' until a filler word such as
+    "for" or "of", so "mastery for Hide on bush#KR1" still finds the full name.
+    An unquoted multi-word name that contains a word of an intent or overview
+    keyword ("ranked stats Faker#KR1", "mastery points Faker#KR1") is
+    ambiguous, so no Riot ID is returned and the model plans the query instead.
+
+    Args:
+        query (str): The user's query
+
+    Returns:
+        tuple or None: (game_name, tag_line), or None if the query has no Riot ID
+    """
+    found = _find_riot_id(query)
+    return found[:2] if found else None
+
+
+def _find_riot_id(query):
+    """(game_name, tag_line, start, end) of the Riot ID in the query, or None."""
+    match = QUOTED_RIOT_ID_PATTERN.search(query)
+    if match:
+        return match.group(1).strip(), match.group(2), match.start(), match.end()
+
+    match = TAG_PATTERN.search(query)
+    if not match:
+        return None
+    kept = []
+    for word in reversed(list(re.finditer(r"\S+", query[:match.start()]))):
+        name = " ".join([word.group()] + [kept_word.group() for kept_word in kept])
+        if word.group().lower() in NAME_STOP_WORDS or len(name) > MAX_GAME_NAME_LENGTH:
+            break
+        kept.insert(0, word)
+    if not kept:
+        return None
+    name = " ".join(word.group() for word in kept)
+    if len(name) < 3:
+        return None
+    if len(kept) > 1 and any(word.group().lower() in KEYWORD_WORDS for word in kept):
+        return None
+    return name, match.group(1), kept[0].start(), match.end()
+
+
+def _without_riot_id(query):
+    """The query with the Riot ID cut out, so a game name like "Rank1#NA1" isn't read as an intent."""
+    found = _find_riot_id(query)
+    return query[:found[2]] + " " + query[found[3]:] if found else query
+
+
+def classify_intents(query):
+    """
+    Decide which player data a query asks for.
+
+    Args:
+        query (str): The user's query (the Riot ID may be left in)
+
+    Returns:
+        list: Intents in INTENT_ORDER, e.g. ["mastery", "ranked"]; empty when undecided
+    """
+    text = _without_riot_id(query).lower()
+    intents = [intent for intent in INTENT_ORDER if INTENT_PATTERNS[intent].search(text)]
+    if not intents and OVERVIEW_PATTERN.search(text):
+        return list(INTENT_ORDER)
+    return intents
+
+
+def parse_platform(query):
+    """Platform routing value mentioned in the query ("on euw" -> "euw1"), or None."""
+    match = REGION_PATTERN.search(_without_riot_id(query))
+    if not match:
+        return None
+    region = (match.group(1) or match.group(2)).lower()
+    return REGION_ALIASES.get(region, region)
+
+
+def build_strategy(game_name, tag_line, intents, platform=None, planner="rules"):
+    """
+    The strategy dict generate_riot_api_strategy returns, built without a model call.
+
+    Args:
+        game_name (str): Riot ID game name
+        tag_line (str): Riot ID tag line
+        intents (list): Intents from classify_intents
+        platform (str): Platform routing value, or None for the agent's default
+        planner (str): "rules" or "llm", for reporting
+
+    Returns:
+        dict: player_name, tag_line, api_sequence, data_focus, intents, platform, planner
+    """
+    api_sequence = [ACCOUNT_ENDPOINT]
+    api_sequence.extend(INTENT_ENDPOINTS[intent] for intent in intents)
+    return {
+        "player_name": game_name,
+        "tag_line": tag_line,
+        "api_sequence": api_sequence,
+        "data_focus": ", ".join(INTENT_FOCUS[intent] for intent in intents),
+        "intents": list(intents),
+        "platform": platform,
+        "planner": planner,
+    }
+
+
+def strategy_intents(strategy):
+    """Intents a strategy asks for, read from its api_sequence (works for model-made plans too)."""
+    if strategy.get("intents"):
+        return strategy["intents"]
+    sequence = str(strategy.get("api_sequence", ""))
+    markers = {"mastery": "champion-mastery", "matches": "match", "ranked": "league/v4"}
+    return [intent for intent in INTENT_ORDER if markers[intent] in sequence]
+
+
+def plan_query(query):
+    """
+    Plan a query with rules only.
+
+    Args:
+        query (str): The user's query
+
+    Returns:
+        dict or None: Strategy dict, or None when the model has to plan (no Riot ID or no intent)
+    """
+    started = time.perf_counter()
+    riot_id = parse_riot_id(query)
+    intents = classify_intents(query) if riot_id else []
+    strategy = build_strategy(*riot_id, intents, platform=parse_platform(query)) if intents else None
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    with _stats_lock:
+        planner_stats["queries"] += 1
+        if strategy:
+            planner_stats["rules"] += 1
+            planner_stats["rules_ms"] += elapsed_ms
+    return strategy
+
+
+def record_llm_plan(elapsed_ms):
+    """Record a query the rules couldn't plan and how long the model took instead."""
+    with _stats_lock:
+        planner_stats["llm"] += 1
+        planner_stats["llm_ms"] += elapsed_ms
+
+
+def format_planner_stats():
+    """One-line LLM-avoidance rate and planner latency summary for the CLI."""
+    with _stats_lock:
+        stats = dict(planner_stats)
+    queries = stats["queries"]
+    if not queries:
+        return "🧭 Planner: no queries yet"
+    rules, llm = stats["rules"], stats["llm"]
+    line = f"🧭 Planner: {rules}/{queries} queries planned without AI ({rules / queries:.0%} LLM-avoidance)"
+    if rules:
+        line += f", rules avg {stats['rules_ms'] / rules * 1000:.0f} µs"
+    if llm:
+        line += f", AI avg {stats['llm_ms'] / llm:.0f} ms"
+    return line
@@ -0,0 +1,174 @@
+# National Weather Service client for the weather agent
+# Pooled keep-alive HTTP + an on-disk points -> forecast URL cache
+
+"""
+In-process HTTP for weather_agent_cli.py, replacing one curl process per request.
+
+1. A shared requests.Session keeps TLS connections to api.weather.gov open
+   between calls (no fork/exec, no new handshake), sends the User-Agent NWS
+   asks for, and retries the 5xx responses NWS returns under load.
+2. The Points API answer (lat,lon -> forecast office grid) almost never changes,
+   so the forecast URL is cached on disk per location, keyed by coordinates
+   rounded to POINTS_CACHE_PRECISION decimals (~1 km - smaller than an NWS
+   2.5 km grid cell). Repeat locations go straight to the forecast call.
+
+Environment variables:
+    NWS_POINTS_CACHE_FILE         (default ~/.cache/rift-rewind-agents/nws_points.json)
+    NWS_POINTS_CACHE_TTL_SECONDS  (default 30 days)
+"""
+
+import json
+import os
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from cassette import cassette_fetch, get_cassette, http_key
+from concurrency import ConcurrencyLimit
+
+NWS_USER_AGENT = "RiftRewindWeatherAgent/1.0 (https://github.com/BryanChasko/rift-rewind-aws-riot-games-hackathon)"
+REQUEST_TIMEOUT_SECONDS = 30
+POINTS_CACHE_FILE = os.path.expanduser(
+    os.getenv("NWS_POINTS_CACHE_FILE", "~/.cache/rift-rewind-agents/nws_points.json")
+)
+POINTS_CACHE_TTL_SECONDS = int(os.getenv("NWS_POINTS_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+POINTS_CACHE_PRECISION = 2
+POINTS_URL_PATTERN = re.compile(r"^https://api\.weather\.gov/points/(-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?)$")
+
+_session = None
+_session_lock = threading.Lock()
+_points_cache = None  # loaded from disk on first use
+_points_lock = threading.Lock()
+nws_limit = ConcurrencyLimit("nws")  # capped by batch_agent.py, unlimited otherwise
+
+
+def get_session():
+    """
+    Get the shared keep-alive session, creating it on first use.
+
+    Returns:
+        requests.Session: Pooled connections + retries on 5xx/429
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            retries = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                            allowed_methods=("GET",), raise_on_status=False)
+            session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retries))
+            session.headers.update({"User-Agent": NWS_USER_AGENT, "Accept": "application/geo+json"})
+            _session = session
+        return _session
+
+
+def fetch_text(url):
+    """
+    GET a URL over the pooled session (recorded/replayed when CASSETTE_MODE is set).
+
+    Args:
+        url (str): The URL to fetch
+
+    Returns:
+        tuple: (success: bool, response text or error message: str)
+    """
+
+    def get():
+        with nws_limit.slot():
+            response = get_session().get(url, timeout=REQUEST_TIMEOUT_SECONDS)
+        return {"status_code": response.status_code, "text": response.text}
+
+    try:
+        response = cassette_fetch(http_key("GET", url), get)
+    except requests.Timeout:
+        return False, f"Request timed out after {REQUEST_TIMEOUT_SECONDS} seconds"
+    except Exception as e:
+        return False, f"Error fetching {url}: {str(e)}"
+
+    if response["status_code"] != 200:
+        return False, f"HTTP {response['status_code']}: {response['text'][:200]}"
+    return True, response["text"]
+
+
+def parse_forecast_url(points_json):
+    """
+    Extract the forecast URL from the NWS Points API response.
+
+    Args:
+        points_json (str): JSON response from the Points API
+
+    Returns:
+        tuple: (success: bool, forecast_url: str) - success status and forecast URL or error message
+    """
+    try:
+        data = json.loads(points_json)
+        return True, data["properties"]["forecast"]
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        return False, f"Error parsing Points API response: {str(e)}"
+
+
+def points_cache_key(lat, lon):
+    """Rounded "lat,lon" so nearby guesses for the same place share an entry."""
+    return f"{round(float(lat), POINTS_CACHE_PRECISION)},{round(float(lon), POINTS_CACHE_PRECISION)}"
+
+
+def _load_points_cache():
+    global _points_cache
+    if _points_cache is None:
+        try:
+            with open(POINTS_CACHE_FILE, "r", encoding="utf-8") as cache_file:
+                _points_cache = json.load(cache_file)
+        except (OSError, ValueError):
+            _points_cache = {}
+    return _points_cache
+
+
+def _save_points_cache(cache):
+    try:
+        os.makedirs(os.path.dirname(POINTS_CACHE_FILE), exist_ok=True)
+        tmp_path = f"{POINTS_CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as cache_file:
+            json.dump(cache, cache_file)
+        os.replace(tmp_path, POINTS_CACHE_FILE)
+    except OSError as e:
+        print(f"⚠️ Could not save the points cache: {str(e)}")
+
+
+def resolve_forecast_url(points_url):
+    """
+    Turn a Points API URL into the forecast URL, from the on-disk cache when possible.
+
+    The cache is skipped while a cassette is active, so a record run always captures
+    the Points call and a replay never depends on this machine's cache.
+
+    Args:
+        points_url (str): https://api.weather.gov/points/LAT,LON
+
+    Returns:
+        tuple: (success: bool, forecast_url or error message: str, from_cache: bool)
+    """
+    match = POINTS_URL_PATTERN.match(points_url)
+    key = points_cache_key(*match.groups()) if match and get_cassette() is None else None
+
+    if key:
+        with _points_lock:
+            entry = _load_points_cache().get(key)
+        if entry and time.time() - entry["cached_at"] < POINTS_CACHE_TTL_SECONDS:
+            return True, entry["forecast_url"], True
+
+    success, points_response = fetch_text(points_url)
+    if not success:
+        return False, points_response, False
+    success, forecast_url = parse_forecast_url(points_response)
+    if not success:
+        return False, forecast_url, False
+
+    if key:
+        with _points_lock:
+            cache = _load_points_cache()
+            cache[key] = {"forecast_url": forecast_url, "cached_at": time.time()}
+            _save_points_cache(cache)
+    return True, forecast_url, False
@@ -0,0 +1,94 @@
+# Payload minimizer benchmark
+# How much smaller (and faster) do prompts get when API payloads are projected first?
+
+"""
+Compares raw vs minimized payloads for the sample NWS forecast and champion
+mastery responses in fixtures/.
+
+Offline (default): characters, estimated tokens and the cost of minimizing itself.
+--live: also sends a summary prompt with each payload to Bedrock and reports
+end-to-end latency and the inputTokens Bedrock bills for. Combine with the
+cassette (CASSETTE_MODE=record, then replay) to repeat the comparison offline.
+
+Usage:
+    python payload_benchmark.py
+    python payload_benchmark.py --live --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+import timeit
+
+from bedrock_calls import converse, inference_config
+from payload_minimizer import minimize_payload
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# data type -> (fixture file, what the agent sent before minimizing)
+SAMPLES = {
+    "nws_forecast": ("nws_forecast.json", lambda text: text),  # raw curl output
+    "champion_mastery": ("champion_mastery.json", lambda text: json.dumps(json.loads(text)[:5], indent=2)),
+}
+
+
+def load_sample(data_type):
+    filename, original = SAMPLES[data_type]
+    with open(os.path.join(FIXTURES_DIR, filename), "r", encoding="utf-8") as fixture:
+        text = fixture.read()
+    raw_text = original(text)
+    data = text if data_type == "nws_forecast" else json.loads(text)[:5]
+    return raw_text, data
+
+
+def time_summary_call(payload_text, runs):
+    """Send a fixed summary prompt with the payload; return latencies (ms) and Bedrock inputTokens."""
+    latencies = []
+    input_tokens = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        response = converse(
+            [{"role": "user", "content": [{"text": f"Summarize this data in 3 bullet points:\n{payload_text}"}]}],
+            config=inference_config(temperature=0, max_tokens=300),
+            use_cache=False,  # measure the model, not the response cache
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+        input_tokens = response.get("usage", {}).get("inputTokens", input_tokens)
+    return latencies, input_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raw vs minimized prompt payloads")
+    parser.add_argument("--live", action="store_true", help="Also time Bedrock calls with each payload")
+    parser.add_argument("--runs", type=int, default=3, help="Bedrock calls per payload with --live")
+    args = parser.parse_args()
+
+    print(f"\n{'payload':<20}{'raw chars':>11}{'min chars':>11}{'raw tok':>9}{'min tok':>9}{'saved':>8}{'minimize µs':>13}")
+    print("-" * 81)
+    compact_payloads = {}
+    for data_type in SAMPLES:
+        raw_text, data = load_sample(data_type)
+        compact_text, stats = minimize_payload(data, data_type, original_text=raw_text)
+        compact_payloads[data_type] = (raw_text, compact_text)
+        cost_us = min(timeit.repeat(lambda: minimize_payload(data, data_type, original_text=raw_text),
+                                    number=200, repeat=3)) / 200 * 1e6
+        print(f"{data_type:<20}{stats['before_chars']:>11,}{stats['after_chars']:>11,}{stats['before_tokens']:>9,}"
+              f"{stats['after_tokens']:>9,}{stats['reduction']:>8.0%}{cost_us:>13.1f}")
+
+    if not args.live:
+        print("\nRun with --live to measure Bedrock latency and billed input tokens for each payload.")
+        return
+
+    print(f"\n{'payload':<20}{'variant':>10}{'input tok':>11}{'p50 ms':>10}{'mean ms':>10}")
+    print("-" * 61)
+    for data_type, (raw_text, compact_text) in compact_payloads.items():
+        for variant, text in (("raw", raw_text), ("minimized", compact_text)):
+            latencies, input_tokens = time_summary_call(text, args.runs)
+            print(f"{data_type:<20}{variant:>10}{input_tokens or 'n/a':>11}"
+                  f"{statistics.median(latencies):>10.0f}{statistics.fmean(latencies):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# Payload minimizer for the workshop agents
+# Project raw Riot / NWS JSON down to the fields a summary uses before prompting
+
+"""
+Prompt payload projection and compaction.
+
+process_weather_response used to paste the whole NWS forecast (GeoJSON context,
+polygon, icons, ISO timestamps, 4-space indentation) into the prompt, and
+process_league_data sent json.dumps(raw_data, indent=2). Input tokens cost
+money and model latency, and most of those were whitespace and fields the
+summary never mentions.
+
+Each data type has a projection that keeps only what the summary needs; the
+result is serialized with compact separators. Token counts are estimated with
+the usual ~4 characters per token rule for English/JSON text - good enough to
+compare before and after, Bedrock's usage.inputTokens has the exact number.
+
+Usage:
+    compact_text, stats = minimize_payload(raw_forecast_json, "nws_forecast")
+    print(format_minimize_stats(stats))
+"""
+
+import json
+
+CHARS_PER_TOKEN = 4
+NWS_FORECAST_PERIODS = 7  # today/tonight + 3 days - what the summary prompt asks for
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of model tokens in a piece of text.
+
+    Args:
+        text (str): Prompt text
+
+    Returns:
+        int: Approximate token count (~4 characters per token)
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def compact_json(data):
+    """Serialize with no indentation or spaces after separators, keeping non-ASCII text readable."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def project_nws_forecast(data, periods=NWS_FORECAST_PERIODS):
+    """
+    Keep the forecast periods and the fields a weather summary uses.
+
+    Args:
+        data (dict): NWS gridpoint forecast response
+        periods (int): How many 12-hour periods to keep
+
+    Returns:
+        dict: {"updated", "periods": [{"name", "temp", "precip", "wind", "forecast"}]}
+    """
+    properties = data["properties"]
+    projected = []
+    for period in properties["periods"][:periods]:
+        precipitation = (period.get("probabilityOfPrecipitation") or {}).get("value")
+        projected.append({
+            "name": period["name"],
+            "temp": f"{period['temperature']}{period.get('temperatureUnit', '')}",
+            "precip": f"{precipitation}%" if precipitation is not None else "0%",
+            "wind": f"{period.get('windSpeed', '')} {period.get('windDirection', '')}".strip(),
+            "forecast": period.get("detailedForecast") or period.get("shortForecast", ""),
+        })
+    return {"updated": properties.get("updateTime"), "periods": projected}
+
+
+MASTERY_FIELDS = ("championName", "championId", "championLevel", "championPoints", "lastPlayTime")
+
+
+def project_champion_mastery(data):
+    """
+    Keep champion, level, points and last played - no puuid, milestone or reward config.
+
+    Args:
+        data (list): champion-mastery-v4 entries (optionally enriched with championName)
+
+    Returns:
+        list: Projected entries
+    """
+    return [{field: entry[field] for field in MASTERY_FIELDS if field in entry} for entry in data]
+
+
+RANKED_FIELDS = ("queueType", "tier", "rank", "leaguePoints", "wins", "losses", "hotStreak")
+MATCH_PLAYER_FIELDS = ("championName", "teamPosition", "win", "kills", "deaths", "assists", "totalMinionsKilled",
+                       "goldEarned", "totalDamageDealtToChampions", "visionScore")
+
+
+def project_ranked_entries(data):
+    """Keep queue, tier, division, LP and record from league-v4 entries."""
+    return [{field: entry[field] for field in RANKED_FIELDS if field in entry} for entry in data]
+
+
+def project_matches(matches, puuid):
+    """
+    Reduce match-v5 details (10 participants, hundreds of fields each) to the player's own line.
+
+    Args:
+        matches (list): match-v5 match details
+        puuid (str): The player whose stats to keep
+
+    Returns:
+        list: [{"mode", "minutes", <MATCH_PLAYER_FIELDS>}] per match the player appears in
+    """
+    projected = []
+    for match in matches:
+        info = match["info"]
+        player = next((p for p in info["participants"] if p.get("puuid") == puuid), None)
+        if player is None:
+            continue
+        entry = {"mode": info.get("gameMode"), "minutes": round(info.get("gameDuration", 0) / 60)}
+        entry.update({field: player[field] for field in MATCH_PLAYER_FIELDS if field in player})
+        projected.append(entry)
+    return projected
+
+
+def project_player_profile(data):
+    """
+    Project the combined data the League agent fetches for one player.
+
+    Args:
+        data (dict): {"puuid", and any of "champion_mastery", "ranked", "recent_matches"}
+
+    Returns:
+        dict: The same sections, each projected
+    """
+    projected = {}
+    if "champion_mastery" in data:
+        projected["champion_mastery"] = project_champion_mastery(data["champion_mastery"])
+    if "ranked" in data:
+        projected["ranked"] = project_ranked_entries(data["ranked"])
+    if "recent_matches" in data:
+        projected["recent_matches"] = project_matches(data["recent_matches"], data["puuid"])
+    return projected
+
+
+# data type -> projection; unknown types are only compacted
+PROJECTIONS = {
+    "nws_forecast": project_nws_forecast,
+    "champion_mastery": project_champion_mastery,
+    "ranked_entries": project_ranked_entries,
+    "player_profile": project_player_profile,
+}
+
+
+def minimize_payload(data, data_type, original_text=None):
+    """
+    Project and compact an API payload for a prompt.
+
+    Args:
+        data (str or dict or list): Raw JSON text or already-parsed data
+        data_type (str): Key into PROJECTIONS (e.g. "nws_forecast", "champion_mastery")
+        original_text (str): What would have been sent without minimizing, for the
+            "before" numbers (default: data itself if it's text, else indent=2 JSON)
+
+    Returns:
+        tuple: (compact_text: str, stats: dict with before/after chars and estimated tokens)
+    """
+    if isinstance(data, str):
+        original_text = original_text if original_text is not None else data
+        try:
+            data = json.loads(data)
+        except json.JSONDecodeError:
+            # Not JSON - nothing to project, send it as it is
+            return data, _minimize_stats(original_text, data, data_type, projected=False)
+    elif original_text is None:
+        original_text = json.dumps(data, indent=2)
+
+    projected = False
+    projection = PROJECTIONS.get(data_type)
+    if projection is not None:
+        try:
+            data = projection(data)
+            projected = True
+        except (KeyError, TypeError, AttributeError):
+            # Unexpected shape (error payload, API change) - fall back to compacting everything
+            pass
+
+    compact_text = compact_json(data)
+    return compact_text, _minimize_stats(original_text, compact_text, data_type, projected)
+
+
+def _minimize_stats(before_text, after_text, data_type, projected):
+    before_tokens = estimate_tokens(before_text)
+    after_tokens = estimate_tokens(after_text)
+    return {
+        "data_type": data_type,
+        "projected": projected,
+        "before_chars": len(before_text),
+        "after_chars": len(after_text),
+        "before_tokens": before_tokens,
+        "after_tokens": after_tokens,
+        "reduction": round(1 - after_tokens / before_tokens, 3) if before_tokens else 0.0,
+    }
+
+
+def format_minimize_stats(stats):
+    """One-line summary of minimize_payload stats for the CLIs."""
+    return (f"🗜️ {stats['data_type']} payload: ~{stats['before_tokens']:,} → ~{stats['after_tokens']:,} "
+            f"tokens ({stats['reduction']:.0%} smaller)")
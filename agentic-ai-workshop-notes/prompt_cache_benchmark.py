@@ -0,0 +1,152 @@
+# Prompt cache benchmark
+# Do the agents' cached system prefixes actually get read from Bedrock's prompt cache?
+
+"""
+Sends the agents' real prompts (the shared system prefix from
+agent_instructions.py, the role, and per-query content) several times and
+reports, per call, the input tokens Bedrock read from the prompt cache, wrote
+to it, and processed uncached - plus time to first token.
+
+Offline (default): runs against StubBedrockClient, installed with
+set_bedrock_client(). The stub checks every request has the system prefix and
+cachePoint in the right place and answers with the usage fields Bedrock uses
+(first call writes the prefix, repeats within the TTL read it, prefixes under
+the model minimum are never cached). No AWS credentials needed - it verifies
+the request shape and the metrics, not Bedrock's latency.
+
+--live: the same calls against Bedrock, with and without the cachePoint
+(BEDROCK_PROMPT_CACHE=0 behaviour), streamed so time to first token is real.
+The response cache is bypassed so every call reaches the model.
+
+Usage:
+    python prompt_cache_benchmark.py
+    python prompt_cache_benchmark.py --live --runs 4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import bedrock_calls
+from agent_instructions import AGENT_SYSTEM_PREFIX, agent_system
+from bedrock_calls import converse_stream_text, set_bedrock_client
+from payload_minimizer import estimate_tokens, minimize_payload
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+MIN_CACHEABLE_TOKENS = 1024  # Claude Sonnet 4 minimum tokens per cache checkpoint
+CACHE_TTL_SECONDS = 300
+
+
+class StubBedrockClient:
+    """
+    Offline stand-in for the bedrock-runtime client with Bedrock-style prompt caching.
+
+    Token counts use payload_minimizer.estimate_tokens. A prefix (everything up to a
+    cachePoint) is written on first use and read on repeats within CACHE_TTL_SECONDS,
+    if it is at least min_cacheable_tokens long.
+    """
+
+    def __init__(self, min_cacheable_tokens=MIN_CACHEABLE_TOKENS):
+        self.min_cacheable_tokens = min_cacheable_tokens
+        self.cached_prefixes = {}  # prefix hash -> expiry
+        self.requests = []
+
+    def _usage(self, messages, system):
+        prefix_text = ""
+        cached_tokens = 0
+        read = write = 0
+        for block in system or []:
+            if "text" in block:
+                prefix_text += block["text"]
+            elif "cachePoint" in block:
+                prefix_tokens = estimate_tokens(prefix_text)
+                if prefix_tokens >= self.min_cacheable_tokens:
+                    key = hashlib.sha256(prefix_text.encode("utf-8")).hexdigest()
+                    if self.cached_prefixes.get(key, 0) > time.time():
+                        read += prefix_tokens - cached_tokens
+                    else:
+                        write += prefix_tokens - cached_tokens
+                    self.cached_prefixes[key] = time.time() + CACHE_TTL_SECONDS
+                    cached_tokens = prefix_tokens
+        message_text = "".join(block.get("text", "") for message in messages for block in message["content"])
+        uncached = estimate_tokens(prefix_text) - cached_tokens + estimate_tokens(message_text)
+        return {"inputTokens": uncached, "outputTokens": 12, "totalTokens": uncached + read + write + 12,
+                "cacheReadInputTokens": read, "cacheWriteInputTokens": write}
+
+    def converse(self, modelId, messages, inferenceConfig, system=None, **kwargs):
+        self.requests.append({"modelId": modelId, "messages": messages, "system": system})
+        return {
+            "output": {"message": {"role": "assistant", "content": [{"text": "stub answer"}]}},
+            "usage": self._usage(messages, system),
+        }
+
+    def converse_stream(self, modelId, messages, inferenceConfig, system=None, **kwargs):
+        usage = self.converse(modelId, messages, inferenceConfig, system=system)["usage"]
+        events = [{"contentBlockDelta": {"delta": {"text": "stub "}}},
+                  {"contentBlockDelta": {"delta": {"text": "answer"}}},
+                  {"metadata": {"usage": usage}}]
+        return {"stream": iter(events)}
+
+
+def sample_calls():
+    """(name, agent_instructions role, user content) for each of the four agent prompts."""
+    with open(os.path.join(FIXTURES_DIR, "nws_forecast.json"), "r", encoding="utf-8") as fixture:
+        forecast_json, _ = minimize_payload(fixture.read(), "nws_forecast")
+    with open(os.path.join(FIXTURES_DIR, "champion_mastery.json"), "r", encoding="utf-8") as fixture:
+        mastery_json, _ = minimize_payload(json.load(fixture)[:5], "champion_mastery")
+    return [
+        ("weather planner", "weather_planner", 'Location: "Springfield"'),
+        ("weather summary", "weather_summary", f'Location: "Seattle"\n\nNWS Forecast Periods:\n{forecast_json}\n'),
+        ("league strategy", "league_strategy", 'User Query: "how is Faker doing lately"'),
+        ("league analysis", "league_analysis",
+         f'Original Query: "mastery for Faker#KR1"\nData Type: champion_mastery\nAPI Data: {mastery_json}\n'),
+    ]
+
+
+def run(runs, cache_point):
+    # All four prompts share one prefix, so only the very first call writes it
+    prefix_tokens = estimate_tokens(AGENT_SYSTEM_PREFIX)
+    print(f"\n{'prompt':<17}{'run':>4}{'prefix tok':>12}{'cache read':>12}{'cache write':>13}{'uncached':>10}{'first token':>13}")
+    print("-" * 81)
+    for name, role, content in sample_calls():
+        for run_number in range(1, runs + 1):
+            success, text, stats = converse_stream_text(
+                content, temperature=0, use_cache=False, on_text=lambda chunk: None,
+                system=agent_system(role, cache_point=cache_point),
+            )
+            if not success:
+                print(f"{name:<17}{run_number:>4}  ❌ {text}")
+                break
+            print(f"{name:<17}{run_number:>4}{prefix_tokens:>12,}{stats['cache_read_tokens']:>12,}"
+                  f"{stats['cache_write_tokens']:>13,}{stats['input_tokens']:>10,}"
+                  f"{stats['time_to_first_token_ms']:>10} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt cache reads/writes for the agents' prompts")
+    parser.add_argument("--live", action="store_true", help="Call Bedrock instead of the offline stub")
+    parser.add_argument("--runs", type=int, default=3, help="Calls per prompt")
+    parser.add_argument("--min-tokens", type=int, default=MIN_CACHEABLE_TOKENS,
+                        help="Stub only: smallest prefix the stub caches")
+    args = parser.parse_args()
+
+    if not args.live:
+        stub = StubBedrockClient(min_cacheable_tokens=args.min_tokens)
+        set_bedrock_client(stub, bedrock_calls.DEFAULT_REGION)
+        print(f"Offline stub (prefixes under {args.min_tokens:,} tokens are not cached, like Bedrock)")
+        run(args.runs, cache_point=True)
+        with_cache_point = sum(1 for request in stub.requests
+                               if any("cachePoint" in block for block in request["system"] or []))
+        print(f"\n{with_cache_point}/{len(stub.requests)} requests sent their system prefix with a cachePoint")
+    else:
+        for cache_point in (False, True):
+            print(f"\n=== {'with' if cache_point else 'without'} cachePoint ===")
+            run(args.runs, cache_point=cache_point)
+
+    print(bedrock_calls.format_prompt_cache_stats())
+
+
+if __name__ == "__main__":
+    main()
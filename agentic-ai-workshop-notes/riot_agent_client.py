@@ -0,0 +1,208 @@
+# Riot Games API client for the League agent
+# Pooled keep-alive HTTP, region routing and concurrent player data fetches
+
+"""
+In-process Riot API access for league_agent_example.py.
+
+The agent used to call requests.get once per URL (a new TLS connection each
+time), hardcode na1 / americas, and fetch only champion mastery, one call
+after another. This module keeps:
+
+1. A shared requests.Session with a connection pool sized for the fetch
+   workers, retrying 429 (honouring Retry-After) and 5xx responses.
+2. Host selection per platform: platform endpoints (mastery, league) go to
+   e.g. euw1.api.riotgames.com, regional ones to the routing cluster -
+   account-v1 to americas/asia/europe, match-v5 to americas/asia/europe/sea.
+3. fetch_player_data(): once the PUUID is known, mastery, ranked entries and
+   match ids all start at the same time, and the match details start as
+   soon as the ids arrive, so the wall time is the slowest chain instead of
+   the sum of every call.
+
+Environment variables:
+    RIOT_PLATFORM        default platform when the query names none (default na1)
+    RIOT_MATCH_COUNT     recent matches to fetch details for (default 5)
+    RIOT_FETCH_WORKERS   concurrent Riot requests per query (default 8)
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from cassette import cassette_fetch, http_key
+from concurrency import ConcurrencyLimit
+
+DEFAULT_PLATFORM = os.getenv("RIOT_PLATFORM", "na1").lower()
+MATCH_COUNT = int(os.getenv("RIOT_MATCH_COUNT", "5"))
+FETCH_WORKERS = int(os.getenv("RIOT_FETCH_WORKERS", "8"))
+REQUEST_TIMEOUT_SECONDS = 30
+
+# platform -> (account-v1 cluster, match-v5 cluster)
+ROUTING_MAP = {
+    "na1": ("americas", "americas"),
+    "br1": ("americas", "americas"),
+    "la1": ("americas", "americas"),
+    "la2": ("americas", "americas"),
+    "euw1": ("europe", "europe"),
+    "eun1": ("europe", "europe"),
+    "tr1": ("europe", "europe"),
+    "ru": ("europe", "europe"),
+    "me1": ("europe", "europe"),
+    "kr": ("asia", "asia"),
+    "jp1": ("asia", "asia"),
+    "oc1": ("asia", "sea"),
+    "sg2": ("asia", "sea"),
+    "tw2": ("asia", "sea"),
+    "vn2": ("asia", "sea"),
+}
+
+_session = None
+_session_lock = threading.Lock()
+riot_limit = ConcurrencyLimit("riot")  # capped by batch_agent.py, unlimited otherwise
+
+
+def get_session():
+    """
+    Get the shared keep-alive session, creating it on first use.
+
+    Returns:
+        requests.Session: Pooled connections + retries on 429/5xx
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            retries = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                            allowed_methods=("GET",), respect_retry_after_header=True, raise_on_status=False)
+            session.mount("https://", HTTPAdapter(pool_connections=6, pool_maxsize=max(FETCH_WORKERS, 10),
+                                                  max_retries=retries))
+            _session = session
+        return _session
+
+
+def platform_host(platform):
+    """https://<platform>.api.riotgames.com for platform-scoped endpoints (mastery, league, summoner)."""
+    return f"https://{platform}.api.riotgames.com"
+
+
+def account_host(platform):
+    """Regional host for account-v1 (americas / asia / europe)."""
+    return f"https://{ROUTING_MAP.get(platform, ROUTING_MAP[DEFAULT_PLATFORM])[0]}.api.riotgames.com"
+
+
+def match_host(platform):
+    """Regional host for match-v5 (americas / asia / europe / sea)."""
+    return f"https://{ROUTING_MAP.get(platform, ROUTING_MAP[DEFAULT_PLATFORM])[1]}.api.riotgames.com"
+
+
+def normalize_platform(platform):
+    """A known platform id, falling back to RIOT_PLATFORM."""
+    platform = (platform or DEFAULT_PLATFORM).lower()
+    return platform if platform in ROUTING_MAP else DEFAULT_PLATFORM
+
+
+def fetch_json(url, headers):
+    """
+    GET a Riot API URL over the pooled session (recorded/replayed when CASSETTE_MODE is set).
+
+    Args:
+        url (str): Full Riot API URL
+        headers (dict): Must include X-Riot-Token
+
+    Returns:
+        tuple: (success: bool, parsed JSON or error message)
+    """
+
+    def get():
+        with riot_limit.slot():
+            response = get_session().get(url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
+        return {"status_code": response.status_code, "text": response.text}
+
+    try:
+        response = cassette_fetch(http_key("GET", url), get)
+        if response["status_code"] == 200:
+            return True, json.loads(response["text"])
+        return False, f"API call failed: {response['status_code']} - {response['text']}"
+    except Exception as e:
+        return False, f"Error executing API call: {str(e)}"
+
+
+def account_url(game_name, tag_line, platform):
+    """account-v1 by-riot-id URL on the player's regional cluster (game names may contain spaces)."""
+    return (f"{account_host(platform)}/riot/account/v1/accounts/by-riot-id/"
+            f"{quote(game_name, safe='')}/{quote(tag_line, safe='')}")
+
+
+def player_data_urls(puuid, platform, match_count=MATCH_COUNT):
+    """The per-intent URLs fetch_player_data calls (match details are added once the ids are known)."""
+    return {
+        "mastery": f"{platform_host(platform)}/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}",
+        "ranked": f"{platform_host(platform)}/lol/league/v4/entries/by-puuid/{puuid}",
+        "matches": f"{match_host(platform)}/lol/match/v5/matches/by-puuid/{puuid}/ids?start=0&count={match_count}",
+    }
+
+
+def _timed_fetch(url, headers):
+    started = time.perf_counter()
+    success, data = fetch_json(url, headers)
+    return {"success": success, "data": data if success else None, "error": None if success else data,
+            "ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+def _fetch_matches(executor, ids_url, platform, headers):
+    """Fetch the match ids, then every match's details concurrently (runs on a pool worker)."""
+    started = time.perf_counter()
+    ids_result = _timed_fetch(ids_url, headers)
+    if not ids_result["success"]:
+        return ids_result
+    detail_futures = [executor.submit(_timed_fetch, f"{match_host(platform)}/lol/match/v5/matches/{match_id}", headers)
+                      for match_id in ids_result["data"]]
+    details = [future.result() for future in detail_futures]
+    matches = [detail["data"] for detail in details if detail["success"]]
+    errors = [detail["error"] for detail in details if not detail["success"]]
+    return {"success": bool(matches) or not errors, "data": matches,
+            "error": "; ".join(errors[:3]) if errors and not matches else None,
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+            "serial_ms": round(ids_result["ms"] + sum(detail["ms"] for detail in details), 1),
+            "failed_details": len(errors)}
+
+
+def fetch_player_data(puuid, intents, platform, headers, match_count=MATCH_COUNT):
+    """
+    Fetch every requested data set for a player concurrently.
+
+    Args:
+        puuid (str): Player PUUID from account-v1
+        intents (list): Any of "mastery", "matches", "ranked"
+        platform (str): Platform id (na1, euw1, kr, ...)
+        headers (dict): Must include X-Riot-Token
+        match_count (int): Recent matches to fetch details for
+
+    Returns:
+        dict: {intent: {"success", "data", "error", "ms"}, ..., "wall_ms": float}
+            - "matches" data is the list of match details; its ms covers ids + details
+            - wall_ms is the elapsed time for everything together, serial_ms the sum
+              of every call's time (what fetching them one after another would take)
+    """
+    platform = normalize_platform(platform)
+    urls = player_data_urls(puuid, platform, match_count)
+    started = time.perf_counter()
+    # The matches chain holds one worker while its detail calls run on the others, so keep at least 2
+    with ThreadPoolExecutor(max_workers=max(2, FETCH_WORKERS), thread_name_prefix="riot-fetch") as executor:
+        futures = {}
+        for intent in intents:
+            if intent == "matches":
+                futures[intent] = executor.submit(_fetch_matches, executor, urls[intent], platform, headers)
+            elif intent in urls:
+                futures[intent] = executor.submit(_timed_fetch, urls[intent], headers)
+        results = {intent: future.result() for intent, future in futures.items()}
+    serial_ms = sum(result.get("serial_ms", result["ms"]) for result in results.values())
+    results["wall_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    results["serial_ms"] = round(serial_ms, 1)
+    return results
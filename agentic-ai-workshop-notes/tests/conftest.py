@@ -0,0 +1,7 @@
+# Test setup for the workshop agent modules
+# They are plain scripts, so put their directory on sys.path
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
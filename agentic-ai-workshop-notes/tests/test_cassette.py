@@ -0,0 +1,44 @@
+# Cassette tests
+# Record/replay setup in cassette.py
+
+import threading
+
+import cassette
+
+
+def test_get_cassette_creates_one_instance_across_threads(monkeypatch, tmp_path):
+    monkeypatch.setenv("CASSETTE_MODE", "record")
+    monkeypatch.setenv("CASSETTE_PATH", str(tmp_path / "agents.json.gz"))
+    monkeypatch.setattr(cassette, "_cassette", None)
+    created = []
+    original_init = cassette.Cassette.__init__
+
+    def slow_init(self, *args, **kwargs):
+        created.append(self)
+        # Widen the window between the None check and the assignment
+        threading.Event().wait(0.05)
+        original_init(self, *args, **kwargs)
+
+    monkeypatch.setattr(cassette.Cassette, "__init__", slow_init)
+    monkeypatch.setattr(cassette.atexit, "register", lambda func: None)
+    start = threading.Barrier(8)
+    results = []
+
+    def worker(index):
+        start.wait()
+        recorder = cassette.get_cassette()
+        recorder.fetch(f"GET https://example.test/{index}", lambda: {"index": index})
+        results.append(recorder)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert len({id(recorder) for recorder in results}) == 1
+
+    results[0].save()
+    replay = cassette.Cassette(str(tmp_path / "agents.json.gz"), "replay", "zero")
+    assert len(replay.interactions) == 8
@@ -0,0 +1,38 @@
+# Rule-based planner tests
+# Riot ID parsing and keyword intents in league_query_planner.py
+
+import pytest
+
+from league_query_planner import classify_intents, parse_riot_id, plan_query
+
+
+@pytest.mark.parametrize("query", [
+    "ranked stats Faker#KR1",
+    "mastery points Faker#KR1",
+    "kda Faker#KR1 last games",
+    "summarize Faker#KR1 ranked",
+])
+def test_keyword_in_unquoted_name_falls_back_to_llm(query):
+    # Reading back from '#' would take "stats Faker" etc. as the game name
+    assert parse_riot_id(query) is None
+    assert plan_query(query) is None
+
+
+def test_multi_word_names_still_parse():
+    assert parse_riot_id("mastery for Hide on bush#KR1") == ("Hide on bush", "KR1")
+    assert parse_riot_id('ranked stats "Hide on bush#KR1"') == ("Hide on bush", "KR1")
+
+
+def test_quoted_name_with_keywords_is_planned():
+    strategy = plan_query('ranked stats for "Faker#KR1"')
+    assert (strategy["player_name"], strategy["tag_line"], strategy["intents"]) == ("Faker", "KR1", ["ranked"])
+
+
+@pytest.mark.parametrize("query", [
+    "show me top champions of Faker#KR1",
+    "best champion for Faker#KR1",
+    "top champs of Faker#KR1",
+])
+def test_champion_keywords_allow_plural_and_suffix(query):
+    assert classify_intents(query) == ["mastery"]
+    assert plan_query(query)["player_name"] == "Faker"
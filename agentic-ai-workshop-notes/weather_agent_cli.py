@@ -1,89 +1,38 @@
 # Import necessary libraries
-import boto3  # AWS SDK for Python - allows us to interact with AWS services
-import json  # For handling JSON data
-import subprocess  # For running system commands like curl
 import time  # For adding delays and timing operations
 from datetime import datetime  # For timestamps and date operations
-
-
-def call_claude_sonnet(prompt):
+import os  # For reading environment variables
+from bedrock_calls import (  # Shared Bedrock layer
+    converse_text, converse_stream_text, format_stream_stats, format_prompt_cache_stats,
+)
+from agent_instructions import agent_system  # Fixed instructions, one shared cached system prefix
+from gazetteer import lookup, points_url, record_llm_fallback, format_gazetteer_stats  # Offline locations
+from nws_client import fetch_text, resolve_forecast_url  # Pooled HTTP + cached Points lookups
+from payload_minimizer import minimize_payload, format_minimize_stats  # Smaller prompts
+
+# Print the forecast summary token by token as Claude writes it (AGENT_STREAM=0 to wait for the full text)
+STREAM_RESPONSES = os.getenv("AGENT_STREAM", "1") != "0"
+
+def call_claude_sonnet(prompt, temperature=0.7, use_cache=None, system=None):
     """
     This function sends a prompt to Claude 4.0 Sonnet and gets a response.
     This is the "brain" of our agent - where the AI thinking happens.
 
+    The Bedrock client is created once and shared (see bedrock_calls.py), and
+    temperature 0 calls are answered from an on-disk cache when the same prompt repeats.
+
     Args:
         prompt (str): The question or instruction we want to send to Claude
+        temperature (float): Creativity level (0=very focused and cacheable, 1=very creative)
+        use_cache (bool): Force the response cache on/off (default: only for temperature 0)
+        system (list): Fixed instructions as Converse system blocks (see agent_system()),
+            cached by Bedrock between calls
 
     Returns:
         tuple: (success: bool, response: str) - success status and Claude's response or error message
     """
-    # Create a connection to Amazon Bedrock service
-    # Bedrock is AWS's service for accessing AI models like Claude
-    bedrock = boto3.client(
-        service_name="bedrock-runtime",  # Specify we want the runtime version for making AI calls
-        region_name="us-west-2",  # AWS region - using us-west-2 as specified
-    )
-
-    try:
-        # Send our prompt to Claude and get a response
-        response = bedrock.converse(
-            # Specify which version of Claude we want to use
-            modelId="us.anthropic.claude-sonnet-4-20250514-v1:0",  # Claude 4.0 Sonnet
-            # Format our message - Claude expects messages in a specific structure
-            messages=[
-                {
-                    "role": "user",  # We are the user asking a question
-                    "content": [{"text": prompt}],  # Our actual question/prompt
-                }
-            ],
-            # Configure how Claude should respond
-            inferenceConfig={
-                "maxTokens": 2000,  # Maximum length of response (tokens ≈ words)
-                "temperature": 0.7,  # Creativity level (0=very focused, 1=very creative)
-                "topP": 0.9,  # Another creativity control parameter
-            },
-        )
-
-        # Extract the actual text response from Claude's response structure
-        # The response comes nested in a complex structure, so we dig down to get the text
-        return True, response["output"]["message"]["content"][0]["text"]
-
-    except Exception as e:
-        # If something goes wrong, return an error message
-        return False, f"Error calling Claude: {str(e)}"
-
-
-def execute_curl_command(url):
-    """
-    Execute a curl command to fetch data from an API.
-    This is how our agent "acts" in the real world - making HTTP requests.
-
-    Args:
-        url (str): The URL to fetch data from
-
-    Returns:
-        tuple: (success: bool, response: str) - success status and API response or error message
-    """
-    try:
-        # Use curl command to make HTTP request
-        # curl is a command-line tool for making HTTP requests
-        result = subprocess.run(
-            ["curl", "-s", url],  # -s flag makes curl silent (no progress info)
-            capture_output=True,  # Capture the output so we can process it
-            text=True,  # Return output as text (not bytes)
-            timeout=30,  # Give up after 30 seconds
-        )
-
-        # Check if the command was successful
-        if result.returncode == 0:
-            return True, result.stdout
-        else:
-            return False, f"Curl command failed: {result.stderr}"
-
-    except subprocess.TimeoutExpired:
-        return False, "Request timed out after 30 seconds"
-    except Exception as e:
-        return False, f"Error executing curl: {str(e)}"
+    extra = {"system": system} if system else {}
+    return converse_text(prompt, temperature=temperature, use_cache=use_cache, **extra)
 
 
 def generate_weather_api_calls(location):
@@ -91,42 +40,31 @@ def generate_weather_api_calls(location):
     Use Claude to intelligently generate National Weather Service API calls for a given location.
     This is where the "agentic" magic happens - AI planning the API calls.
 
+    Cities, ZIP codes, states and "lat,lon" found in the offline gazetteer
+    (gazetteer.py) skip the model entirely; Claude only plans for locations the
+    gazetteer doesn't know or can't tell apart ("Springfield").
+
     Args:
         location (str): The location provided by the user
 
     Returns:
         tuple: (success: bool, api_calls: list) - success status and list of API URLs or error message
     """
-    # Create a detailed prompt that teaches Claude how to generate NWS API calls
-    prompt = f"""
-You are an expert at working with the National Weather Service (NWS) API.
-
-Your task: Generate the proper sequence of NWS API calls to get weather forecast data for "{location}".
-
-Instructions:
-1. First, determine the approximate latitude and longitude coordinates for this location
-2. Use the NWS Points API: https://api.weather.gov/points/{{lat}},{{lon}}
-3. The Points API will return a forecast URL in the response
-4. You need to make TWO API calls in sequence:
-   - First: Points API to get forecast office and grid coordinates
-   - Second: The forecast URL returned from the Points API
-
-For the coordinates, use your knowledge to estimate:
-- Major cities: Use well-known coordinates
-- ZIP codes: Estimate based on the area
-- States: Use approximate center coordinates
-
-Example for Seattle:
-1. https://api.weather.gov/points/47.6062,-122.3321
-2. (This will return a forecast URL like: https://api.weather.gov/gridpoints/SEW/124,67/forecast)
-
-Now generate the FIRST API call (Points API) for "{location}". 
-Return ONLY the complete Points API URL, nothing else.
-Format: https://api.weather.gov/points/LAT,LON
-"""
+    place, method = lookup(location)
+    if place:
+        print(f"📍 Found '{place['label']}' in the offline gazetteer ({method} match) - AI planning skipped")
+        return True, [points_url(place)]
+    if method == "ambiguous":
+        print(f"📍 '{location}' matches several places - asking AI to pick one")
+
+    # The instructions are a fixed (prompt-cached) system prefix; only the location varies
+    prompt = f'Location: "{location}"'
 
     print(f"🧠 AI is analyzing '{location}' and generating weather API calls...")
-    success, response = call_claude_sonnet(prompt)
+    # Temperature 0: the same location should always give the same coordinates (and hit the cache)
+    started = time.perf_counter()
+    success, response = call_claude_sonnet(prompt, temperature=0, system=agent_system("weather_planner"))
+    record_llm_fallback((time.perf_counter() - started) * 1000)
 
     if success:
         # Clean up the response - sometimes Claude adds extra text
@@ -140,25 +78,7 @@ Format: https://api.weather.gov/points/LAT,LON
         return False, response
 
 
-def get_forecast_url_from_points_response(points_json):
-    """
-    Extract the forecast URL from the NWS Points API response.
-
-    Args:
-        points_json (str): JSON response from the Points API
-
-    Returns:
-        tuple: (success: bool, forecast_url: str) - success status and forecast URL or error message
-    """
-    try:
-        data = json.loads(points_json)
-        forecast_url = data["properties"]["forecast"]
-        return True, forecast_url
-    except (json.JSONDecodeError, KeyError) as e:
-        return False, f"Error parsing Points API response: {str(e)}"
-
-
-def process_weather_response(raw_json, location):
+def process_weather_response(raw_json, location, stream=False):
     """
     Use Claude to convert raw NWS API JSON into a human-readable weather summary.
     This is where AI processes complex data into useful information.
@@ -166,29 +86,34 @@ def process_weather_response(raw_json, location):
     Args:
         raw_json (str): Raw JSON response from NWS API
         location (str): Original location for context
+        stream (bool): Print the summary as it is generated (plus time-to-first-token
+            and tokens/sec) instead of returning it for the caller to print
 
     Returns:
         tuple: (success: bool, summary: str) - success status and processed summary or error message
     """
-    prompt = f"""
-You are a weather information specialist. I have raw National Weather Service forecast data for "{location}" that needs to be converted into a clear, helpful summary for a general audience.
-
-Raw NWS API Response:
-{raw_json}
+    # Keep only the forecast periods (name, temperature, rain chance, wind, forecast text)
+    # in compact JSON - the raw response is mostly GeoJSON, icons and indentation
+    forecast_json, payload_stats = minimize_payload(raw_json, "nws_forecast")
+    print(format_minimize_stats(payload_stats))
 
-Please create a weather summary that includes:
-1. A brief introduction with the location
-2. Current conditions and today's forecast
-3. The next 2-3 days outlook with key details (temperature, precipitation, wind)
-4. Any notable weather patterns or alerts
-5. Format the response to be easy to read and understand
+    prompt = f"""Location: "{location}"
 
-Make it informative and practical for someone planning their activities. Focus on being helpful and clear.
+NWS Forecast Periods:
+{forecast_json}
 """
 
     print(f"📊 AI is processing weather data and creating summary...")
-    success, response = call_claude_sonnet(prompt)
+    system = agent_system("weather_summary")
+    if not stream:
+        return call_claude_sonnet(prompt, system=system)
 
+    # Streaming: tokens are printed as they arrive, so the reader starts reading within a second
+    print("=" * 60)
+    success, response, stats = converse_stream_text(prompt, system=system)
+    print()
+    print("=" * 60)
+    print(format_stream_stats(stats))
     return success, response
 
 
@@ -206,6 +131,8 @@ def run_weather_agent():
         location = input("\n🔍 Enter a location (or 'quit' to exit): ").strip()
 
         if location.lower() in ["quit", "exit", "q"]:
+            print(format_gazetteer_stats())
+            print(format_prompt_cache_stats())
             print("👋 Thanks for using the Weather Agent!")
             break
 
@@ -227,31 +154,28 @@ def run_weather_agent():
         points_url = api_calls[0]
         print(f"✅ Generated Points API URL: {points_url}")
 
-        # Step 2: Execute the Points API call
+        # Step 2 + 3: Points API call and forecast URL extraction
+        # (skipped when this location's forecast URL is already in the on-disk points cache)
         print("\nStep 2: 🔗 Points API Execution")
         print("Fetching location data from National Weather Service...")
-        success, points_response = execute_curl_command(points_url)
+        success, forecast_url, from_cache = resolve_forecast_url(points_url)
 
         if not success:
-            print(f"❌ Failed to fetch points data: {points_response}")
+            print(f"❌ Failed to get the forecast URL: {forecast_url}")
             continue
 
-        print(f"✅ Received points data")
-
-        # Step 3: Extract forecast URL from Points response
-        print("\nStep 3: 📍 Extracting Forecast URL")
-        success, forecast_url = get_forecast_url_from_points_response(points_response)
-
-        if not success:
-            print(f"❌ Failed to extract forecast URL: {forecast_url}")
-            continue
+        if from_cache:
+            print("✅ Forecast URL found in the points cache - Points API call skipped")
+        else:
+            print("✅ Received points data")
 
+        print("\nStep 3: 📍 Forecast URL")
         print(f"✅ Forecast URL: {forecast_url[:60]}...")
 
         # Step 4: Execute the Forecast API call
         print("\nStep 4: 🌦️ Forecast API Execution")
         print("Fetching weather forecast data...")
-        success, forecast_response = execute_curl_command(forecast_url)
+        success, forecast_response = fetch_text(forecast_url)
 
         if not success:
             print(f"❌ Failed to fetch forecast data: {forecast_response}")
@@ -261,19 +185,21 @@ def run_weather_agent():
 
         # Step 5: AI processes the response
         print("\nStep 5: 📊 AI Analysis Phase")
-        success, summary = process_weather_response(forecast_response, location)
+        success, summary = process_weather_response(forecast_response, location, stream=STREAM_RESPONSES)
 
         if not success:
             print(f"❌ Failed to process data: {summary}")
             continue
 
-        # Step 6: Display results
-        print("\nStep 6: 💬 Weather Forecast")
-        print("=" * 60)
-        print(summary)
-        print("=" * 60)
+        # Step 6: Display results (already printed while streaming)
+        if not STREAM_RESPONSES:
+            print("\nStep 6: 💬 Weather Forecast")
+            print("=" * 60)
+            print(summary)
+            print("=" * 60)
 
         print(f"\n✅ Weather analysis complete for '{location}'!")
+        print(format_gazetteer_stats())
 
 
 # Run the agent when the script is executed
@@ -0,0 +1,114 @@
+"""
+JSON Codec Micro-Benchmarks
+
+Times JSON work on real Rift Rewind payload sizes:
+- decoding upstream Riot bodies (challenges config, leaderboards, challenger ladder)
+- building responses: the previous two-pass path (sort_keys dump for the ETag +
+  a second dump for the body) against json_codec's single serialization
+
+The contests and players response payloads are captured by running the real
+handlers once against the stub Riot server. Each case runs with the stdlib
+backend and, when installed, with orjson.
+
+Usage:
+    python json_codec_benchmark.py [--repeat 200]
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import timeit
+from typing import Dict, Any, Callable, List, Tuple
+
+from run_benchmarks import BenchmarkContext, add_lambda_sources_to_path, configure_environment
+from stub_riot_server import StubConfig, start_stub_server, load_fixture
+
+UPSTREAM_FIXTURES = ['challenges_config.json', 'leaderboard_master.json', 'challenger_league.json']
+RESPONSE_SCENARIOS = {
+    'contests': {'endpoint': 'contests', 'year': '2024'},
+    'contests_3_years': {'endpoint': 'contests', 'years': '2022-2024'},
+    'players': {'endpoint': 'players'},
+}
+
+
+def capture_payloads() -> Dict[str, Dict[str, Any]]:
+    """Run the handlers once against the stub server and return their decoded payloads."""
+    server = start_stub_server(StubConfig())
+    configure_environment(f'http://127.0.0.1:{server.server_port}')
+    add_lambda_sources_to_path()
+    import lambda_function
+
+    payloads = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, params in RESPONSE_SCENARIOS.items():
+            response = lambda_function.lambda_handler({'queryStringParameters': params, 'headers': {}}, BenchmarkContext())
+            payloads[name] = json.loads(response['body'])
+    server.shutdown()
+    return payloads
+
+
+def two_pass_response(payload: Dict[str, Any]) -> Tuple[str, str]:
+    """The response build this replaces: canonical sort_keys dump for the ETag, then the body dump."""
+    stable_payload = {k: v for k, v in payload.items() if k not in ('xray_trace_id', 'xray_console_url')}
+    canonical = json.dumps(stable_payload, sort_keys=True, separators=(',', ':'), default=str)
+    etag = f'W/"{hashlib.sha256(canonical.encode()).hexdigest()[:32]}"'
+    return json.dumps(payload), etag
+
+
+@contextlib.contextmanager
+def codec_backend(name: str):
+    """Temporarily force json_codec onto the stdlib backend."""
+    import json_codec
+    original = json_codec.orjson
+    if name == 'json':
+        json_codec.orjson = None
+    try:
+        yield
+    finally:
+        json_codec.orjson = original
+
+
+def time_us(func: Callable[[], Any], repeat: int) -> float:
+    return min(timeit.repeat(func, number=repeat, repeat=5)) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='JSON codec micro-benchmarks on Rift Rewind payloads')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    payloads = capture_payloads()
+    import http_responses
+    import json_codec
+    backends = ['json'] + (['orjson'] if json_codec.orjson is not None else [])
+    rows: List[Tuple[str, str, float, str, float]] = []
+
+    for fixture in UPSTREAM_FIXTURES:
+        body = load_fixture(fixture)
+        before = time_us(lambda: json.loads(body.decode()), args.repeat)
+        for backend in backends:
+            with codec_backend(backend):
+                after = time_us(lambda: json_codec.loads(body), args.repeat)
+            rows.append((f'decode {fixture}', f'{len(body) / 1024:.1f} KB', before, backend, after))
+
+    for name, payload in payloads.items():
+        size = len(json_codec.dumps_bytes(payload))
+        before = time_us(lambda: two_pass_response(payload), args.repeat)
+        for backend in backends:
+            with codec_backend(backend):
+                after = time_us(lambda: http_responses.serialize_with_etag(payload), args.repeat)
+            rows.append((f'respond {name}', f'{size / 1024:.1f} KB', before, backend, after))
+
+    print(f"\n{'case':<40}{'size':>10}{'before µs':>12}{'codec':>9}{'after µs':>11}{'speedup':>9}")
+    print('-' * 91)
+    for case, size, before, backend, after in rows:
+        print(f"{case:<40}{size:>10}{before:>12.1f}{backend:>9}{after:>11.1f}{before / after:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+"""
+Rift Rewind Lambda Benchmarks
+
+Runs lambda_function.lambda_handler (every endpoint) and
+summoner_lookup.lambda_handler against the local stub Riot API server and
+reports p50/p95/p99 latency and throughput, then compares against a stored
+baseline. Fully offline: Riot API, Data Dragon and SSM are never contacted.
+
+Usage:
+    python run_benchmarks.py                          # run and compare against baseline.json
+    python run_benchmarks.py --latency-ms 40 --jitter-ms 15 --error-rate-429 0.02
+    python run_benchmarks.py --cache-mode warm --concurrency 4
+    python run_benchmarks.py --update-baseline        # store this run as the new baseline
+    python run_benchmarks.py --cassette cassettes/riot.json.gz --cassette-mode record [--live]
+    python run_benchmarks.py --cassette cassettes/riot.json.gz --cassette-mode replay --cassette-timing zero
+
+Exit status is 1 when any scenario regresses beyond --tolerance.
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Callable, Optional
+
+from stub_riot_server import StubConfig, start_stub_server
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+LAMBDA_DIR = os.path.join(BENCHMARKS_DIR, '..', 'lambda')
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+
+
+class BenchmarkContext:
+    """Minimal stand-in for the Lambda context object (30s function timeout)."""
+
+    def __init__(self, timeout_ms: int = 30000):
+        self.aws_request_id = 'benchmark'
+        self._deadline = time.monotonic() + timeout_ms / 1000.0
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+def add_lambda_sources_to_path() -> None:
+    for source_dir in ('shared-layer/python', 'riot-api-source', 'summoner-lookup-source'):
+        sys.path.insert(0, os.path.abspath(os.path.join(LAMBDA_DIR, source_dir)))
+
+
+def configure_environment(stub_url: Optional[str]) -> None:
+    """
+    Point the Lambdas at the stub server, or at the live APIs when stub_url is None
+    (RIOT_API_KEY must then hold a real key). Must run before the Lambda modules are imported.
+    """
+    if stub_url:
+        os.environ['RIOT_API_ENDPOINT_OVERRIDE'] = stub_url
+        os.environ['DATA_DRAGON_BASE_URL'] = stub_url
+        os.environ['RIOT_API_KEY'] = 'RGAPI-benchmark-0000-0000-000000000000'
+    elif not os.environ.get('RIOT_API_KEY'):
+        raise SystemExit('RIOT_API_KEY must be set to benchmark or record against the live Riot API')
+    os.environ['DATA_DRAGON_CACHE_DIR'] = tempfile.mkdtemp(prefix='ddragon-bench-')
+    os.environ['AWS_XRAY_SDK_ENABLED'] = 'false'
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+
+def reset_riot_caches() -> None:
+    """Drop the in-memory Riot response caches so every invocation hits the (stub) upstream."""
+    import circuit_breaker
+    import leaderboards
+    import riot_client
+    leaderboards._leaderboard_cache.clear()
+    riot_client._last_good_responses.clear()
+    riot_client._account_cache.clear()
+    circuit_breaker._breakers.clear()
+
+
+def build_scenarios() -> Dict[str, Callable[[], Dict[str, Any]]]:
+    import lambda_function
+    import summoner_lookup
+
+    def main_lambda(params: Dict[str, str]) -> Callable[[], Dict[str, Any]]:
+        return lambda: lambda_function.lambda_handler({'queryStringParameters': params, 'headers': {}}, BenchmarkContext())
+
+    return {
+        'contests': main_lambda({'endpoint': 'contests', 'year': '2024'}),
+        'contests_multi_year': main_lambda({'endpoint': 'contests', 'years': '2022-2024'}),
+        'challenge_percentile': main_lambda({'endpoint': 'challenge-percentile', 'challengeId': '101100', 'score': '500'}),
+        'players': main_lambda({'endpoint': 'players'}),
+        'summoner_lookup_route': main_lambda({'endpoint': 'summoner-lookup', 'riotId': 'Faker#KR1', 'region': 'kr'}),
+        'default_endpoint': main_lambda({}),
+        'summoner_lookup_lambda': lambda: summoner_lookup.lambda_handler(
+            {'httpMethod': 'POST', 'body': json.dumps({'summonerName': 'Faker#KR1', 'region': 'kr'})}, BenchmarkContext()),
+    }
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    if len(sorted_samples) == 1:
+        return sorted_samples[0]
+    return statistics.quantiles(sorted_samples, n=100, method='inclusive')[int(pct) - 1]
+
+
+def run_scenario(invoke: Callable[[], Dict[str, Any]], iterations: int, warmup: int,
+                 concurrency: int, cold: bool) -> Dict[str, Any]:
+    """Time `iterations` invocations (after `warmup` untimed ones) and summarize them."""
+    latencies: List[float] = []
+    status_counts: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def one_call(timed: bool) -> None:
+        if cold:
+            reset_riot_caches()
+        started = time.perf_counter()
+        response = invoke()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if timed:
+            with lock:
+                latencies.append(elapsed_ms)
+                key = str(response.get('statusCode'))
+                status_counts[key] = status_counts.get(key, 0) + 1
+
+    for _ in range(warmup):
+        one_call(False)
+
+    wall_started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(lambda _: one_call(True), range(iterations)))
+    else:
+        for _ in range(iterations):
+            one_call(True)
+    wall_seconds = time.perf_counter() - wall_started
+
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'mean_ms': round(statistics.fmean(latencies), 2),
+        'throughput_rps': round(iterations / wall_seconds, 2),
+        'status_codes': status_counts
+    }
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """List regressions: p95 slower or throughput lower than baseline by more than `tolerance`."""
+    regressions = []
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']}ms vs baseline {previous['p95_ms']}ms")
+        if current['throughput_rps'] < previous['throughput_rps'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {current['throughput_rps']}/s vs baseline {previous['throughput_rps']}/s")
+    return regressions
+
+
+def print_table(results: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    print(f"\n{'scenario':<26}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'Δp95':>10}  status")
+    print('-' * 92)
+    for name, stats in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        delta = f"{(stats['p95_ms'] / previous['p95_ms'] - 1) * 100:+.0f}%" if previous and previous['p95_ms'] else 'n/a'
+        print(f"{name:<26}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['throughput_rps']:>10}{delta:>10}  {stats['status_codes']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Offline benchmarks for the Rift Rewind Lambdas')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--cache-mode', choices=['cold', 'warm'], default='cold',
+                        help='cold clears in-memory Riot caches before every call; warm keeps them')
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--jitter-ms', type=float, default=5.0)
+    parser.add_argument('--error-rate-429', type=float, default=0.0)
+    parser.add_argument('--error-rate-5xx', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--scenario', action='append', help='Run only these scenarios (repeatable)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--output', help='Write results JSON here')
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--live', action='store_true',
+                        help='Call the real Riot API and Data Dragon instead of the stub (needs RIOT_API_KEY)')
+    parser.add_argument('--cassette', help='Cassette file (.json.gz) to record to or replay from')
+    parser.add_argument('--cassette-mode', choices=['record', 'replay'], default='replay')
+    parser.add_argument('--cassette-timing', choices=['original', 'zero'], default='original',
+                        help='Replay with the recorded upstream latency or with none')
+    args = parser.parse_args()
+
+    add_lambda_sources_to_path()
+    from cassette import Cassette, install_cassette
+
+    server = None
+    stub_config = StubConfig(args.latency_ms, args.jitter_ms, args.error_rate_429, args.error_rate_5xx, args.seed)
+    cassette = Cassette(args.cassette, args.cassette_mode, args.cassette_timing) if args.cassette else None
+    if cassette and cassette.mode == 'replay':
+        # Fully offline: no stub server, just the same upstream URLs the cassette was recorded with
+        upstream = cassette.metadata.get('upstream', 'live')
+        os.environ.setdefault('RIOT_API_KEY', 'RGAPI-benchmark-0000-0000-000000000000')  # never sent anywhere
+        configure_environment(None if upstream == 'live' else upstream)
+    elif args.live:
+        configure_environment(None)
+    else:
+        server = start_stub_server(stub_config)
+        configure_environment(f'http://127.0.0.1:{server.server_port}')
+    if cassette:
+        if cassette.mode == 'record':
+            cassette.metadata['upstream'] = 'live' if args.live else os.environ['DATA_DRAGON_BASE_URL']
+        install_cassette(cassette)
+
+    # Lambda code logs every call; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        scenarios = build_scenarios()
+
+    selected = {name: invoke for name, invoke in scenarios.items() if not args.scenario or name in args.scenario}
+    results: Dict[str, Any] = {
+        'config': {
+            'iterations': args.iterations,
+            'concurrency': args.concurrency,
+            'cache_mode': args.cache_mode,
+            'latency_ms': args.latency_ms,
+            'jitter_ms': args.jitter_ms,
+            'error_rate_429': args.error_rate_429,
+            'error_rate_5xx': args.error_rate_5xx,
+            'upstream': f"cassette:{cassette.mode}:{cassette.timing}" if cassette else ('live' if args.live else 'stub'),
+            'python': platform.python_version()
+        },
+        'scenarios': {}
+    }
+
+    for name, invoke in selected.items():
+        print(f"Running {name}...", file=sys.stderr)
+        with contextlib.redirect_stdout(io.StringIO()):
+            results['scenarios'][name] = run_scenario(invoke, args.iterations, args.warmup,
+                                                      args.concurrency, args.cache_mode == 'cold')
+    if server:
+        results['config']['stub_requests'] = stub_config.request_count
+        server.shutdown()
+    if cassette:
+        cassette.save()
+
+    baseline: Dict[str, Any] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+            baseline_file.write('\n')
+        print(f"\nBaseline updated: {args.baseline}")
+        return 0
+
+    if baseline and baseline.get('config', {}).get('cache_mode') != args.cache_mode:
+        print(f"\nBaseline was recorded in {baseline['config'].get('cache_mode')} mode - comparison skipped")
+        return 0
+    if baseline and baseline.get('config', {}).get('upstream', 'stub') != results['config']['upstream']:
+        print(f"\nBaseline was recorded against {baseline['config'].get('upstream', 'stub')} - comparison skipped")
+        return 0
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print(f"\n✅ No regressions beyond {args.tolerance:.0%}" if baseline else "\nNo baseline found - run with --update-baseline to store one")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Stub Riot API Server
+
+Local HTTP server that replays recorded Riot API and Data Dragon responses from
+benchmarks/fixtures with configurable latency, jitter and 429/5xx injection.
+
+The Lambdas reach it through RIOT_API_ENDPOINT_OVERRIDE (the original
+*.api.riotgames.com host is kept in the Host header) and DATA_DRAGON_BASE_URL.
+
+Usage:
+    python stub_riot_server.py --port 8787 --latency-ms 40 --jitter-ms 15 --error-rate-429 0.02
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import re
+import socket
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Tuple
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# (path regex, fixture file) - first match wins
+ROUTES = [
+    (r'^/lol/challenges/v1/challenges/config$', 'challenges_config.json'),
+    (r'^/lol/challenges/v1/challenges/\d+/leaderboards/by-level/(?P<tier>MASTER|GRANDMASTER|CHALLENGER)$', 'leaderboard_{tier}.json'),
+    (r'^/lol/league/v4/challengerleagues/by-queue/RANKED_SOLO_5x5$', 'challenger_league.json'),
+    (r'^/riot/account/v1/accounts/by-riot-id/(?P<game_name>[^/]+)/(?P<tag_line>[^/]+)$', 'account.json'),
+    (r'^/lol/summoner/v4/summoners/by-puuid/[^/]+$', 'summoner.json'),
+    (r'^/lol/champion-mastery/v4/champion-masteries/by-puuid/[^/]+/top$', 'mastery_top.json'),
+    (r'^/api/versions\.json$', 'ddragon_versions.json'),
+    (r'^/cdn/[^/]+/data/en_US/champion\.json$', 'ddragon_champion.json'),
+]
+
+
+class StubConfig:
+    """Latency and fault injection settings, adjustable while the server runs."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate_429: float = 0.0, error_rate_5xx: float = 0.0, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate_429 = error_rate_429
+        self.error_rate_5xx = error_rate_5xx
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.request_count = 0
+
+    def next_delay_seconds(self) -> float:
+        with self.lock:
+            jitter = self.rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000.0
+
+    def next_fault(self) -> Optional[int]:
+        with self.lock:
+            self.request_count += 1
+            roll = self.rng.random()
+        if roll < self.error_rate_429:
+            return 429
+        if roll < self.error_rate_429 + self.error_rate_5xx:
+            return 503
+        return None
+
+
+_fixture_cache: Dict[str, bytes] = {}
+
+
+def load_fixture(filename: str) -> bytes:
+    if filename not in _fixture_cache:
+        with open(os.path.join(FIXTURES_DIR, filename), 'rb') as fixture_file:
+            # Re-encode compactly - fixtures are pretty-printed for review, Riot isn't
+            _fixture_cache[filename] = json.dumps(json.load(fixture_file), separators=(',', ':')).encode()
+    return _fixture_cache[filename]
+
+
+def resolve_fixture(path: str) -> Tuple[Optional[bytes], Dict[str, str]]:
+    """Find the recorded body for a request path, with substitutions for Riot ID lookups."""
+    for pattern, filename in ROUTES:
+        match = re.match(pattern, path)
+        if not match:
+            continue
+        groups = match.groupdict()
+        body = load_fixture(filename.format(tier=groups.get('tier', '').lower()))
+        if 'game_name' in groups:
+            account = json.loads(body)
+            account['gameName'] = urllib.parse.unquote(groups['game_name'])
+            account['tagLine'] = urllib.parse.unquote(groups['tag_line'])
+            body = json.dumps(account).encode()
+        return body, groups
+    return None, {}
+
+
+def make_handler(config: StubConfig):
+    class StubRiotHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+
+        def setup(self):
+            super().setup()
+            # Headers and body go out in separate writes; without this, Nagle + delayed ACK
+            # adds ~40ms per response that has nothing to do with the code under test
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            time.sleep(config.next_delay_seconds())
+            path = urllib.parse.urlsplit(self.path).path
+
+            fault = config.next_fault()
+            if fault == 429:
+                return self._send(429, b'{"status":{"message":"Rate limit exceeded","status_code":429}}', {'Retry-After': '1'})
+            if fault:
+                return self._send(fault, b'{"status":{"message":"Service unavailable","status_code":503}}')
+
+            body, _ = resolve_fixture(path)
+            if body is None:
+                return self._send(404, b'{"status":{"message":"Data not found","status_code":404}}')
+            self._send(200, body)
+
+        def _send(self, status: int, body: bytes, extra_headers: Optional[Dict[str, str]] = None):
+            headers = {'Content-Type': 'application/json;charset=utf-8', **(extra_headers or {})}
+            if 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+                body = gzip.compress(body, compresslevel=1)
+                headers['Content-Encoding'] = 'gzip'
+            self.send_response(status)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass  # quiet - benchmarks make thousands of requests
+
+    return StubRiotHandler
+
+
+def start_stub_server(config: StubConfig, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """Start the stub server on a daemon thread and return it (server.server_port has the port)."""
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stub Riot API server replaying recorded fixtures')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8787)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate-429', type=float, default=0.0)
+    parser.add_argument('--error-rate-5xx', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency_ms, args.jitter_ms, args.error_rate_429, args.error_rate_5xx, args.seed)
+    server = start_stub_server(config, args.host, args.port)
+    print(f"Stub Riot API listening on http://{args.host}:{server.server_port}")
+    print(f"  export RIOT_API_ENDPOINT_OVERRIDE=http://{args.host}:{server.server_port}")
+    print(f"  export DATA_DRAGON_BASE_URL=http://{args.host}:{server.server_port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
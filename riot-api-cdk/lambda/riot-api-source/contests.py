@@ -0,0 +1,301 @@
+"""
+Contests Routes
+
+Challenge leaderboards presented as competitive contests (endpoint=contests)
+and score/player percentiles against the apex-tier leaderboards
+(endpoint=challenge-percentile). Loaded on first use by the lambda_function
+route registry.
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import math
+import random
+from collections import Counter
+from typing import Dict, Any, List, Optional
+from aws_xray_sdk.core import xray_recorder
+from circuit_breaker import describe_circuit
+from http_responses import build_json_response
+import json_codec
+from request_budget import RequestDeadline
+from leaderboards import ChallengeLeaderboard, fetch_challenge_leaderboards, APEX_TIERS, LEADERBOARD_URL
+from riot_client import cached_request
+
+# Upper bound on years=... so one request can't fan out unboundedly
+MAX_CONTEST_YEARS = 10
+CHALLENGES_CONFIG_URL = 'https://na1.api.riotgames.com/lol/challenges/v1/challenges/config'
+# The config only changes with game patches
+CHALLENGES_CONFIG_TTL_SECONDS = 3600
+
+def parse_contest_years(query_params: Dict[str, str]) -> List[str]:
+    """
+    Parse the contest years from the query string.
+    
+    Accepts years=2022,2023,2024, a range such as years=2022-2024, or the
+    single-year year=2024 used by the dashboard. Duplicates are dropped and the
+    list is capped at MAX_CONTEST_YEARS.
+    
+    Raises:
+        ValueError: If a year is not a number or a range is reversed
+    """
+    raw_years = query_params.get('years') or query_params.get('year') or '2024'
+    years: List[str] = []
+    for part in raw_years.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = (int(bound) for bound in part.split('-', 1))
+            if end < start:
+                raise ValueError(f'Invalid year range: {part}')
+            expanded = [str(y) for y in range(start, min(end, start + MAX_CONTEST_YEARS - 1) + 1)]
+        else:
+            expanded = [str(int(part))]
+        for year in expanded:
+            if year not in years:
+                years.append(year)
+    return years[:MAX_CONTEST_YEARS] or ['2024']
+
+def select_contest_challenges(leaderboard_challenges: List[Dict[str, Any]], year: str) -> List[Dict[str, Any]]:
+    """
+    Pick the contests for a year. Seeding a local Random with the year keeps the
+    picks deterministic per year without touching the global random state.
+    """
+    rng = random.Random(int(year))
+    return rng.sample(leaderboard_challenges, min(5, len(leaderboard_challenges)))
+
+def build_contest_entry(challenge: Dict[str, Any], year: str, position: int, leaderboard: Optional[ChallengeLeaderboard]) -> Dict[str, Any]:
+    """Transform a challenge config entry and its apex-tier leaderboards into a contest."""
+    challenge_id = challenge.get('id')
+    localized_names = challenge.get('localizedNames', {}).get('en_US', {})
+    challenge_name = localized_names.get('name', f'Challenge {position+1}')
+    challenge_desc = localized_names.get('description', 'Elite competitive challenge')
+    
+    # Determine winner and stats from leaderboard
+    winner = 'TBD'
+    top_score = 0
+    participant_count = 0
+    tier_counts = {}
+    
+    if leaderboard and leaderboard.top_entry:
+        top_player = leaderboard.top_entry
+        # Get actual summoner name if available, otherwise use position
+        summoner_name = top_player.get('summonerName', f'Player #{top_player.get("position", 1)}')
+        winner = f'{summoner_name} ({top_player.get("value", 0):,.0f} points)'
+        top_score = int(top_player.get("value", 0))
+        # Real count of ranked players across the MASTER/GRANDMASTER/CHALLENGER leaderboards
+        participant_count = leaderboard.participant_count
+        tier_counts = leaderboard.tier_counts
+    
+    # Determine difficulty based on challenge thresholds
+    thresholds = challenge.get('thresholds', {})
+    difficulty = 'Expert'
+    if 'CHALLENGER' in thresholds:
+        challenger_threshold = thresholds.get('CHALLENGER', 0)
+        if challenger_threshold > 100:
+            difficulty = 'Legendary'
+        elif challenger_threshold > 50:
+            difficulty = 'Master'
+    
+    # Determine category from challenge name/description
+    category = 'General'
+    name_lower = challenge_name.lower()
+    if any(word in name_lower for word in ['kill', 'damage', 'combat', 'penta']):
+        category = 'Combat'
+    elif any(word in name_lower for word in ['ward', 'vision', 'support', 'heal']):
+        category = 'Support'
+    elif any(word in name_lower for word in ['farm', 'cs', 'gold', 'item']):
+        category = 'Economy'
+    elif any(word in name_lower for word in ['objective', 'baron', 'dragon', 'tower']):
+        category = 'Strategy'
+    
+    return {
+        'id': f'challenge_{year}_{challenge_id}',
+        'name': f'{challenge_name} Championship {year}',
+        'status': 'live',
+        'winner': winner,
+        'points': top_score,
+        'participants': participant_count,
+        'tier_counts': tier_counts,
+        'difficulty': difficulty,
+        'category': category,
+        'year': year,
+        'description': challenge_desc,
+        'challenge_id': challenge_id
+    }
+
+def handle_contests_endpoint(event: Dict[str, Any], api_attempts: List[Dict[str, Any]], headers: Dict[str, str], make_request, deadline: Optional[RequestDeadline] = None) -> Dict[str, Any]:
+    """
+    Handle contests endpoint - get real challenge leaderboards as competitive contests.
+    
+    All requested years are served from one challenges config download, and a
+    challenge picked for several years has its leaderboard fetched only once.
+    Stops fetching leaderboards once the request deadline is spent and returns the
+    contests built so far with partial: true.
+    """
+    deadline = deadline or RequestDeadline.from_context(None)
+    try:
+        years = parse_contest_years(event.get('queryStringParameters') or {})
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json_codec.dumps({'error': f'Invalid years parameter: {str(e)}'})
+        }
+    
+    # Get challenges config first to find interesting leaderboard challenges
+    # (shared across warm invocations, and primed by warmup.py when enabled)
+    challenges_url = CHALLENGES_CONFIG_URL
+    print(f"Making request to: {challenges_url} for years {', '.join(years)}")
+    challenges_data, status_code, error_details = cached_request(challenges_url, headers, make_request, CHALLENGES_CONFIG_TTL_SECONDS)
+    
+    contests_data = []
+    
+    if challenges_data and isinstance(challenges_data, list) and len(challenges_data) > 0:
+        # Find challenges with leaderboards and good names
+        leaderboard_challenges = [
+            c for c in challenges_data 
+            if c.get('leaderboard', False) and 
+               c.get('state') == 'ENABLED' and
+               c.get('localizedNames', {}).get('en_US', {}).get('name', '') and
+               len(c.get('localizedNames', {}).get('en_US', {}).get('name', '')) > 5
+        ]
+        
+        # Select specific interesting challenges based on year
+        selections = {year: select_contest_challenges(leaderboard_challenges, year)[:5] for year in years}
+        
+        # Fetch each picked challenge's apex-tier leaderboards once, concurrently, for every year
+        challenge_ids = [challenge.get('id') for selected in selections.values() for challenge in selected]
+        leaderboards, tier_attempts = fetch_challenge_leaderboards(challenge_ids, headers, make_request)
+        # Real upstream status codes of the leaderboard calls, e.g. {'200': 14, '429': 1}
+        leaderboard_status_codes = Counter(str(attempt['status_code']) for tiers in tier_attempts.values() for attempt in tiers.values())
+        leaderboard_url = LEADERBOARD_URL.format(challenge_id=challenge_ids[0], tier=APEX_TIERS[-1]) if challenge_ids else None
+        
+        for year, selected_challenges in selections.items():
+            for i, challenge in enumerate(selected_challenges):
+                contests_data.append(build_contest_entry(challenge, year, i, leaderboards.get(challenge.get('id'))))
+        
+        if deadline.partial:
+            print("Request budget spent before all leaderboards were fetched, returning partial results")
+        
+        api_attempts.append({
+            'endpoint': 'Challenges Config + Leaderboards API',
+            'status': 'Success',
+            'method': 'GET',
+            'url': f'{challenges_url} + leaderboard calls',
+            'auth': 'X-Riot-Token required',
+            'result': f'Retrieved {len(challenges_data)} challenges, found {len(leaderboard_challenges)} with leaderboards, selected {len(contests_data)} as contests across {len(years)} year(s) from {len(leaderboards)} challenge leaderboards ({", ".join(APEX_TIERS)})',
+            'status_code': status_code,
+            'data_count': len(contests_data),
+            'leaderboard_status_codes': dict(leaderboard_status_codes),
+            'circuit': describe_circuit(challenges_url),
+            'leaderboard_circuit': describe_circuit(leaderboard_url) if leaderboard_url else None
+        })
+    else:
+        # Fallback to sample data if API fails
+        for year in years:
+            contests_data.extend([
+                {'id': f'worlds_{year}', 'name': f'World Championship {year}', 'status': 'completed', 'winner': 'T1', 'points': 15000, 'participants': 2500000, 'difficulty': 'Legendary', 'category': 'Tournament', 'year': year, 'description': 'Annual world championship'},
+                {'id': f'msi_{year}', 'name': f'Mid-Season Invitational {year}', 'status': 'completed', 'winner': 'Gen.G', 'points': 12000, 'participants': 1800000, 'difficulty': 'Master', 'category': 'Tournament', 'year': year, 'description': 'Mid-season tournament'},
+                {'id': f'spring_{year}', 'name': f'Spring Split {year}', 'status': 'live', 'winner': 'TBD', 'points': 8000, 'participants': 1200000, 'difficulty': 'Expert', 'category': 'Regional', 'year': year, 'description': 'Regional spring competition'}
+            ])
+        
+        api_attempts.append({
+            'endpoint': 'Challenges Config + Leaderboards API',
+            'status': 'Failed',
+            'method': 'GET',
+            'url': challenges_url,
+            'auth': 'X-Riot-Token required',
+            'result': f'API call failed (HTTP {status_code}): {error_details}. Using fallback data.',
+            'status_code': status_code,
+            'data_count': len(contests_data),
+            'circuit': describe_circuit(challenges_url)
+        })
+    
+    trace_id = xray_recorder.get_trace_entity().trace_id if xray_recorder.get_trace_entity() else 'unknown'
+    
+    return build_json_response({
+        'data': contests_data,
+        'years': years,
+        'source': 'FEATURED_GAMES',
+        'partial': deadline.partial,
+        'api_attempts': api_attempts,
+        'xray_trace_id': trace_id
+    }, trace_id, 'contests' if api_attempts[-1]['status'] == 'Success' and not deadline.partial else 'fallback')
+
+def handle_challenge_percentile_endpoint(event: Dict[str, Any], api_attempts: List[Dict[str, Any]], headers: Dict[str, str], make_request, deadline: Optional[RequestDeadline] = None) -> Dict[str, Any]:
+    """
+    Handle challenge-percentile endpoint - rank a score or player against a challenge's
+    MASTER/GRANDMASTER/CHALLENGER leaderboards.
+    
+    Query parameters: challengeId plus either score or puuid.
+    """
+    deadline = deadline or RequestDeadline.from_context(None)
+    query_params = event.get('queryStringParameters') or {}
+    challenge_id = query_params.get('challengeId', '')
+    score = query_params.get('score')
+    puuid = query_params.get('puuid')
+    
+    if not challenge_id.isdigit() or (score is None and not puuid):
+        return {
+            'statusCode': 400,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json_codec.dumps({'error': 'challengeId and either score or puuid parameters required'})
+        }
+    try:
+        score_value = float(score) if score is not None else None
+        # 'nan' and 'inf' parse as floats but can't be ranked
+        if score_value is not None and not math.isfinite(score_value):
+            raise ValueError(score)
+    except ValueError:
+        return {
+            'statusCode': 400,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json_codec.dumps({'error': f'Invalid score: {score}'})
+        }
+    
+    challenge_id = int(challenge_id)
+    leaderboards, tier_attempts = fetch_challenge_leaderboards([challenge_id], headers, make_request)
+    leaderboard = leaderboards.get(challenge_id)
+    leaderboard_url = LEADERBOARD_URL.format(challenge_id=challenge_id, tier=APEX_TIERS[-1])
+    tier_attempts = tier_attempts.get(challenge_id, {})
+    failed_tiers = {tier: attempt for tier, attempt in tier_attempts.items() if attempt['status_code'] != 200}
+    
+    percentile_data = None
+    if leaderboard:
+        if puuid:
+            # Players below MASTER aren't on any leaderboard - report that rather than a guess
+            percentile_data = leaderboard.player_percentile(puuid) or {'puuid': puuid, 'percentile': None, 'rank': None, 'participants': leaderboard.participant_count, 'on_leaderboard': False}
+        else:
+            percentile_data = leaderboard.percentile(score_value)
+        percentile_data['tier_counts'] = leaderboard.tier_counts
+    
+    result = f'Ranked against {leaderboard.participant_count} apex-tier players' if leaderboard else 'No leaderboard data available for this challenge'
+    if failed_tiers:
+        result += '; ' + '; '.join(f"{tier} failed (HTTP {attempt['status_code']}): {attempt['result']}" for tier, attempt in failed_tiers.items())
+    
+    api_attempts.append({
+        'endpoint': 'Challenge Leaderboards API',
+        'status': 'Success' if leaderboard else 'Failed',
+        'method': 'GET',
+        'url': LEADERBOARD_URL.format(challenge_id=challenge_id, tier='{' + '|'.join(APEX_TIERS) + '}'),
+        'auth': 'X-Riot-Token required',
+        'result': result,
+        # First failing tier's status, else 200; every tier's real status is in tier_status_codes
+        'status_code': next((attempt['status_code'] for attempt in failed_tiers.values()), 200),
+        'tier_status_codes': {tier: attempt['status_code'] for tier, attempt in tier_attempts.items()},
+        'data_count': leaderboard.participant_count if leaderboard else 0,
+        'circuit': describe_circuit(leaderboard_url)
+    })
+    
+    trace_id = xray_recorder.get_trace_entity().trace_id if xray_recorder.get_trace_entity() else 'unknown'
+    
+    return build_json_response({
+        'data': percentile_data,
+        'challenge_id': challenge_id,
+        'source': 'CHALLENGE_LEADERBOARDS',
+        'partial': deadline.partial,
+        'api_attempts': api_attempts,
+        'xray_trace_id': trace_id
+    }, trace_id, 'contests' if leaderboard and not deadline.partial else 'fallback')
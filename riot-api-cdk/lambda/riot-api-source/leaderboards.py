@@ -0,0 +1,151 @@
+"""
+Challenge Leaderboards
+
+Fetches the MASTER, GRANDMASTER and CHALLENGER leaderboards for Riot
+challenges concurrently and keeps them as sorted score arrays in module state
+(shared across warm invocations). The sorted arrays give real participant
+counts and O(log n) percentile/rank queries via bisect.
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import bisect
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+from aws_xray_sdk.core import xray_recorder
+
+APEX_TIERS = ('MASTER', 'GRANDMASTER', 'CHALLENGER')
+LEADERBOARD_URL = 'https://na1.api.riotgames.com/lol/challenges/v1/challenges/{challenge_id}/leaderboards/by-level/{tier}'
+LEADERBOARD_CACHE_TTL_SECONDS = 600
+# Riot's per-key rate limit makes wide fan-out counterproductive
+MAX_LEADERBOARD_WORKERS = 6
+
+# challenge id -> tier -> {'status_code', 'result'} of the upstream call behind it
+TierAttempts = Dict[Any, Dict[str, Dict[str, Any]]]
+
+
+class ChallengeLeaderboard:
+    """All apex-tier leaderboard entries for one challenge, sorted by score."""
+
+    def __init__(self, challenge_id: Any, tier_entries: Dict[str, List[Dict[str, Any]]]):
+        self.challenge_id = challenge_id
+        self.fetched_at = time.time()
+        self.tier_counts = {tier: len(entries) for tier, entries in tier_entries.items()}
+
+        entries = [entry for tier_list in tier_entries.values() for entry in tier_list]
+        entries.sort(key=lambda entry: entry.get('value', 0))
+        # Ascending score array for bisect, plus puuid -> score for player lookups
+        self.scores: List[float] = [entry.get('value', 0) for entry in entries]
+        self.scores_by_puuid: Dict[str, float] = {
+            entry['puuid']: entry.get('value', 0) for entry in entries if entry.get('puuid')
+        }
+        self.top_entry: Optional[Dict[str, Any]] = entries[-1] if entries else None
+
+    @property
+    def participant_count(self) -> int:
+        return len(self.scores)
+
+    def percentile(self, score: float) -> Dict[str, Any]:
+        """
+        Rank a score against the leaderboard.
+
+        Returns:
+            Dict[str, Any]: percentile (share of players strictly below), rank
+            (1 = best, ties share a rank) and the participant count
+        """
+        total = len(self.scores)
+        if total == 0:
+            return {'score': score, 'percentile': None, 'rank': None, 'participants': 0}
+        below = bisect.bisect_left(self.scores, score)
+        at_or_below = bisect.bisect_right(self.scores, score)
+        return {
+            'score': score,
+            'percentile': round(below / total * 100, 2),
+            'rank': total - at_or_below + 1,
+            'participants': total
+        }
+
+    def player_percentile(self, puuid: str) -> Optional[Dict[str, Any]]:
+        """Percentile for a player on the leaderboard, None if they aren't on it."""
+        score = self.scores_by_puuid.get(puuid)
+        if score is None:
+            return None
+        return {**self.percentile(score), 'puuid': puuid}
+
+
+# Shared across warm invocations
+_leaderboard_cache: Dict[Any, ChallengeLeaderboard] = {}
+
+
+def get_cached_leaderboard(challenge_id: Any) -> Optional[ChallengeLeaderboard]:
+    board = _leaderboard_cache.get(challenge_id)
+    if board and time.time() - board.fetched_at < LEADERBOARD_CACHE_TTL_SECONDS:
+        return board
+    return None
+
+
+@xray_recorder.capture('fetch_challenge_leaderboards')
+def fetch_challenge_leaderboards(challenge_ids: Iterable[Any], headers: Dict[str, str],
+                                 make_request) -> Tuple[Dict[Any, Optional[ChallengeLeaderboard]], TierAttempts]:
+    """
+    Get apex-tier leaderboards for several challenges, fetching every
+    (challenge, tier) pair that isn't cached concurrently.
+
+    Args:
+        challenge_ids (Iterable[Any]): Challenge ids (duplicates are fetched once)
+        headers (Dict[str, str]): Riot auth headers
+        make_request: Request function returning (data, status_code, error_details)
+
+    Returns:
+        Tuple[Dict[Any, Optional[ChallengeLeaderboard]], TierAttempts]: Board per challenge id (None when
+        no tier returned data), and the status code and result of every tier call per challenge id
+        (cached boards report 200 with the age of the cached fetch, like riot_client.cached_request)
+    """
+    boards: Dict[Any, Optional[ChallengeLeaderboard]] = {}
+    tier_attempts: TierAttempts = {}
+    to_fetch = []
+    for challenge_id in dict.fromkeys(challenge_ids):
+        cached = get_cached_leaderboard(challenge_id)
+        if cached:
+            boards[challenge_id] = cached
+            result = f'Success (cached {int(time.time() - cached.fetched_at)}s ago)'
+            tier_attempts[challenge_id] = {tier: {'status_code': 200, 'result': result} for tier in APEX_TIERS}
+        else:
+            to_fetch.append(challenge_id)
+
+    if not to_fetch:
+        return boards, tier_attempts
+
+    # Worker threads don't inherit the X-Ray trace entity, so hand it over explicitly
+    trace_entity = xray_recorder.get_trace_entity()
+
+    def fetch_tier(challenge_id: Any, tier: str) -> Tuple[Optional[List[Dict[str, Any]]], int, str]:
+        if trace_entity is not None:
+            xray_recorder.set_trace_entity(trace_entity)
+        url = LEADERBOARD_URL.format(challenge_id=challenge_id, tier=tier)
+        data, status_code, error_details = make_request(url, headers)
+        return (data if isinstance(data, list) else None), status_code, error_details
+
+    jobs = [(challenge_id, tier) for challenge_id in to_fetch for tier in APEX_TIERS]
+    with ThreadPoolExecutor(max_workers=min(MAX_LEADERBOARD_WORKERS, len(jobs))) as pool:
+        results = list(pool.map(lambda job: fetch_tier(*job), jobs))
+
+    tier_results: Dict[Any, Dict[str, List[Dict[str, Any]]]] = {challenge_id: {} for challenge_id in to_fetch}
+    for (challenge_id, tier), (entries, status_code, error_details) in zip(jobs, results):
+        tier_attempts.setdefault(challenge_id, {})[tier] = {'status_code': status_code, 'result': error_details}
+        if entries is not None:
+            tier_results[challenge_id][tier] = entries
+
+    for challenge_id, tier_entries in tier_results.items():
+        if not tier_entries:
+            boards[challenge_id] = None
+            continue
+        board = ChallengeLeaderboard(challenge_id, tier_entries)
+        # Only complete boards are cached so a partial fetch is retried next time
+        if len(tier_entries) == len(APEX_TIERS):
+            _leaderboard_cache[challenge_id] = board
+        boards[challenge_id] = board
+
+    return boards, tier_attempts
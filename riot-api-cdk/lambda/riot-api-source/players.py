@@ -0,0 +1,90 @@
+"""
+Players Route
+
+Top challenger league players (endpoint=players, challenger-league, summoners).
+Loaded on first use by the lambda_function route registry.
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+from typing import Dict, Any, List, Optional
+from aws_xray_sdk.core import xray_recorder
+from circuit_breaker import describe_circuit, is_failure
+from http_responses import build_json_response
+from request_budget import RequestDeadline
+from riot_client import cached_request
+
+CHALLENGER_LADDER_URL = 'https://na1.api.riotgames.com/lol/league/v4/challengerleagues/by-queue/RANKED_SOLO_5x5'
+# Same freshness as the challenge leaderboards
+CHALLENGER_LADDER_TTL_SECONDS = 600
+
+def handle_players_endpoint(event: Dict[str, Any], api_attempts: List[Dict[str, Any]], headers: Dict[str, str], make_request, deadline: Optional[RequestDeadline] = None) -> Dict[str, Any]:
+    """
+    Handle players endpoint - get real challenger league data.
+    """
+    deadline = deadline or RequestDeadline.from_context(None)
+    challenger_url = CHALLENGER_LADDER_URL
+    print(f"Making request to: {challenger_url}")
+    print(f"With headers: {headers}")
+    challenger_data, status_code, error_details = cached_request(challenger_url, headers, make_request, CHALLENGER_LADDER_TTL_SECONDS)
+    print(f"Response: status={status_code}, data_type={type(challenger_data)}, error={error_details}")
+    
+    if challenger_data and 'entries' in challenger_data:
+        # Get top 10 players and transform to our format
+        top_players = challenger_data['entries'][:10]
+        players_data = []
+        
+        for i, player in enumerate(top_players):
+            win_rate = round((player.get('wins', 0) / max(1, player.get('wins', 0) + player.get('losses', 0))) * 100)
+            
+            # Assign signature champions based on ranking (top players get meta champions)
+            signature_champions = ['Azir', 'Aatrox', 'Jinx', 'Thresh', 'Graves', 'Orianna', 'Gnar', 'Kai\'Sa', 'Nautilus', 'Nidalee']
+            
+            players_data.append({
+                'puuid': player.get('puuid', f'challenger_{i}'),
+                'rank': i + 1,  # Challenger ranking
+                'leaguePoints': player.get('leaguePoints', 0),
+                'wins': player.get('wins', 0),
+                'losses': player.get('losses', 0),
+                'winRate': win_rate,
+                'veteran': player.get('veteran', False),
+                'hotStreak': player.get('hotStreak', False),
+                'freshBlood': player.get('freshBlood', False),
+                'signatureChampion': signature_champions[i]
+            })
+        
+        api_attempts.append({
+            'endpoint': 'Challenger League API',
+            'status': 'Success',
+            'method': 'GET',
+            'url': challenger_url,
+            'auth': 'X-Riot-Token required',
+            'result': f'Retrieved top {len(players_data)} challenger players from {challenger_data.get("name", "Challenger League")}',
+            'status_code': status_code,
+            'data_count': len(players_data),
+            'circuit': describe_circuit(challenger_url)
+        })
+    else:
+        players_data = []
+        api_attempts.append({
+            'endpoint': 'Challenger League API',
+            'status': 'Failed',
+            'method': 'GET',
+            'url': challenger_url,
+            'auth': 'X-Riot-Token required',
+            'result': f'Cloudflare blocked Lambda IP (HTTP {status_code}): {error_details}' if is_failure(status_code) and status_code != 503 else f'Upstream unavailable (HTTP {status_code}): {error_details}',
+            'status_code': status_code,
+            'data_count': 0,
+            'circuit': describe_circuit(challenger_url)
+        })
+    
+    trace_id = xray_recorder.get_trace_entity().trace_id if xray_recorder.get_trace_entity() else 'unknown'
+    
+    return build_json_response({
+        'data': players_data,
+        'source': 'PLAYERS',
+        'partial': deadline.partial,
+        'api_attempts': api_attempts,
+        'xray_trace_id': trace_id
+    }, trace_id, 'players' if players_data else 'fallback')
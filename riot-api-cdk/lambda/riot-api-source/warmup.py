@@ -0,0 +1,122 @@
+"""
+Cache Priming
+
+Fills the caches the first request on a new container would otherwise pay for:
+the Riot API key (SSM), the challenges config, the challenger ladder and the
+Data Dragon champion index. All four run concurrently within a time budget;
+failures and slow lookups are logged and left for the first request to retry.
+
+Two triggers, both opt-in:
+- PRIME_CACHES_ON_INIT=true primes once at module load, during the Lambda
+  init phase. With provisioned concurrency that happens before any request
+  arrives; on demand the first request still waits for it, but for the four
+  lookups overlapped instead of one after another across the first requests
+- A scheduled EventBridge warmup event ({"warmup": true} or a plain
+  "Scheduled Event") refreshes the caches of a warm container and returns
+  without doing any user-facing work
+
+During init there is no X-Ray segment yet, so subsegments created while
+priming are discarded by the SDK.
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Any, Optional
+from aws_xray_sdk.core import xray_recorder
+from data_dragon import get_latest_version, get_champion_index
+import json_codec
+from request_budget import RequestDeadline
+from riot_client import get_api_key, make_request, RIOT_API_HEADER
+
+PRIME_CACHES_ON_INIT = os.environ.get('PRIME_CACHES_ON_INIT', 'false').lower() in ('1', 'true', 'yes')
+# Lambda allows 10s for init; don't spend it all waiting on a slow upstream
+PRIME_BUDGET_MS = int(os.environ.get('PRIME_BUDGET_MS', '3000'))
+MAX_PRIME_WORKERS = 4
+
+
+def is_warmup_event(event: Dict[str, Any]) -> bool:
+    """True for the scheduled warmup event rather than a Function URL request."""
+    return event.get('warmup') is True or (
+        event.get('source') == 'aws.events' and event.get('detail-type') == 'Scheduled Event'
+    )
+
+
+def _prime_riot_url(url: str, key_future, deadline: RequestDeadline) -> Any:
+    api_key = key_future.result(timeout=deadline.remaining_seconds())
+    data, status_code, error_details = make_request(url, {RIOT_API_HEADER: api_key}, deadline)
+    if not data:
+        raise Exception(f'HTTP {status_code}: {error_details}')
+    return data
+
+
+def _prime_champion_index(deadline: RequestDeadline) -> Dict[int, Dict[str, Any]]:
+    index = get_champion_index(get_latest_version(deadline), deadline)
+    if not index:
+        raise Exception('Champion index is empty')
+    return index
+
+
+def prime_caches(budget_ms: float = PRIME_BUDGET_MS, refresh: bool = False) -> Dict[str, Any]:
+    """
+    Prime the API key, challenges config, challenger ladder and champion index concurrently.
+
+    Args:
+        budget_ms (float): Time to wait for the lookups; anything slower finishes in the background
+        refresh (bool): Re-read the API key from SSM even if cached (the Riot responses are always refetched)
+
+    Returns:
+        Dict[str, Any]: Per-cache outcome ('primed', 'failed: ...' or 'timed out') and elapsed_ms
+    """
+    # Imported here so a plain cold start keeps the route modules lazy
+    from contests import CHALLENGES_CONFIG_URL
+    from players import CHALLENGER_LADDER_URL
+
+    deadline = RequestDeadline(budget_ms, reserve_ms=0)
+    # Worker threads don't inherit the X-Ray trace entity, so hand it over explicitly
+    trace_entity = xray_recorder.get_trace_entity()
+
+    def traced(func, *args):
+        if trace_entity is not None:
+            xray_recorder.set_trace_entity(trace_entity)
+        return func(*args)
+
+    pool = ThreadPoolExecutor(max_workers=MAX_PRIME_WORKERS, thread_name_prefix='prime')
+    key_future = pool.submit(traced, get_api_key, refresh)
+    futures = {
+        'api_key': key_future,
+        'champion_index': pool.submit(traced, _prime_champion_index, deadline),
+        'challenges_config': pool.submit(traced, _prime_riot_url, CHALLENGES_CONFIG_URL, key_future, deadline),
+        'challenger_ladder': pool.submit(traced, _prime_riot_url, CHALLENGER_LADDER_URL, key_future, deadline),
+    }
+    wait(futures.values(), timeout=deadline.remaining_seconds())
+    # Don't block on stragglers - whatever they fetch still lands in the caches
+    pool.shutdown(wait=False)
+
+    primed: Dict[str, str] = {}
+    for name, future in futures.items():
+        if not future.done():
+            primed[name] = 'timed out'
+        elif future.exception() is not None:
+            primed[name] = f'failed: {str(future.exception())[:200]}'
+        else:
+            primed[name] = 'primed'
+    summary = {'primed': primed, 'elapsed_ms': deadline.elapsed_ms(), 'budget_ms': int(budget_ms)}
+    print(f"Cache priming {'(refresh) ' if refresh else ''}finished in {summary['elapsed_ms']}ms: {json_codec.dumps(primed)}")
+    return summary
+
+
+def handle_warmup_event(deadline: Optional[RequestDeadline] = None) -> Dict[str, Any]:
+    """Refresh the caches for a scheduled warmup event, within the invocation's remaining time."""
+    budget_ms = PRIME_BUDGET_MS
+    if deadline is not None:
+        budget_ms = min(budget_ms, deadline.remaining_seconds() * 1000)
+    summary = prime_caches(budget_ms, refresh=True)
+    xray_recorder.put_annotation('warmup', True)
+    return {
+        'statusCode': 200,
+        'headers': {'Content-Type': 'application/json', 'Cache-Control': 'no-store'},
+        'body': json_codec.dumps(summary)
+    }
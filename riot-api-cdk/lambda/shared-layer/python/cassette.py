@@ -0,0 +1,156 @@
+"""
+Record/Replay Cassettes
+
+Captures upstream HTTP responses (Riot API, Data Dragon) to a gzip-compressed
+cassette once, then replays them offline so performance regression runs are
+repeatable and never touch rate-limited endpoints.
+
+Enabled by environment variables (off by default, never set in deployed stacks):
+- CASSETTE_MODE:   'record' or 'replay'
+- CASSETTE_PATH:   cassette file, e.g. benchmarks/cassettes/riot.json.gz
+- CASSETTE_TIMING: 'original' replays with the recorded latency, 'zero' without any
+
+Identical requests replay in the order they were recorded; once a request's
+recordings run out, the last one keeps being served.
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import atexit
+import gzip
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+CASSETTE_MODES = ('record', 'replay')
+CASSETTE_TIMINGS = ('original', 'zero')
+CASSETTE_FORMAT_VERSION = 1
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+class Cassette:
+    """A set of recorded request -> response interactions backed by a .json.gz file."""
+
+    def __init__(self, path: str, mode: str = 'replay', timing: str = 'original'):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f'Unknown cassette mode "{mode}" - use one of {CASSETTE_MODES}')
+        if timing not in CASSETTE_TIMINGS:
+            raise ValueError(f'Unknown cassette timing "{timing}" - use one of {CASSETTE_TIMINGS}')
+        self.path = path
+        self.mode = mode
+        self.timing = timing
+        self.lock = threading.Lock()
+        self.interactions: Dict[str, List[Dict[str, Any]]] = {}
+        self.play_counts: Dict[str, int] = {}
+        self.metadata: Dict[str, Any] = {}  # free-form notes about how the cassette was recorded
+        self.dirty = False
+
+        if mode == 'replay':
+            self.load()
+        else:
+            atexit.register(self.save)
+
+    def load(self) -> None:
+        with gzip.open(self.path, 'rt', encoding='utf-8') as cassette_file:
+            recorded = json.load(cassette_file)
+        self.metadata = recorded.get('metadata', {})
+        for interaction in recorded.get('interactions', []):
+            self.interactions.setdefault(interaction['key'], []).append(interaction)
+        print(f"Cassette loaded: {sum(len(v) for v in self.interactions.values())} interactions from {self.path}")
+
+    def save(self) -> None:
+        """Write the cassette atomically (record mode only, and only if something changed)."""
+        with self.lock:
+            if self.mode != 'record' or not self.dirty:
+                return
+            interactions = [interaction for recordings in self.interactions.values() for interaction in recordings]
+            self.dirty = False
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as cassette_file:
+            json.dump({'version': CASSETTE_FORMAT_VERSION, 'metadata': self.metadata, 'interactions': interactions},
+                      cassette_file, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+        print(f"Cassette saved: {len(interactions)} interactions to {self.path}")
+
+    def fetch(self, key: str, perform: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Replay the recorded response for `key`, or perform the request and record it.
+
+        Args:
+            key (str): Request identity, e.g. 'GET https://...' (must not contain secrets)
+            perform (Callable[[], Dict[str, Any]]): Makes the real request and returns a JSON-serializable response
+
+        Returns:
+            Dict[str, Any]: The live or recorded response
+
+        Raises:
+            CassetteMiss: In replay mode, when `key` was never recorded
+        """
+        if self.mode == 'replay':
+            return self._play(key)
+
+        started = time.perf_counter()
+        response = perform()
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        with self.lock:
+            self.interactions.setdefault(key, []).append({
+                'key': key,
+                'response': response,
+                'elapsed_ms': elapsed_ms,
+                'recorded_at': int(time.time())
+            })
+            self.dirty = True
+        return response
+
+    def _play(self, key: str) -> Dict[str, Any]:
+        with self.lock:
+            recordings = self.interactions.get(key)
+            if not recordings:
+                raise CassetteMiss(f'No recorded interaction for {key} in {self.path}')
+            position = self.play_counts.get(key, 0)
+            self.play_counts[key] = position + 1
+        interaction = recordings[min(position, len(recordings) - 1)]
+        if self.timing == 'original':
+            time.sleep(interaction['elapsed_ms'] / 1000.0)
+        return interaction['response']
+
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """The cassette configured through CASSETTE_MODE/CASSETTE_PATH, or None when disabled."""
+    global _cassette
+    if _cassette is not None:
+        return _cassette
+    mode = os.environ.get('CASSETTE_MODE', '').lower()
+    if mode not in CASSETTE_MODES:
+        return None
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette(os.environ['CASSETTE_PATH'], mode, os.environ.get('CASSETTE_TIMING', 'original').lower())
+        return _cassette
+
+
+def install_cassette(cassette: Optional[Cassette]) -> None:
+    """Use this cassette instead of one configured through the CASSETTE_* environment variables."""
+    global _cassette
+    with _cassette_lock:
+        _cassette = cassette
+
+
+def encode_http_response(status: int, reason: str, body: bytes) -> Dict[str, Any]:
+    """Cassette form of a (status, reason, body) HTTP response - bodies are UTF-8 JSON."""
+    return {'status': status, 'reason': reason, 'body': body.decode('utf-8')}
+
+
+def decode_http_response(response: Dict[str, Any]) -> Tuple[int, str, bytes]:
+    return response['status'], response['reason'], response['body'].encode('utf-8')
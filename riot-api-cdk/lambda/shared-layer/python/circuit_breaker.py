@@ -0,0 +1,181 @@
+"""
+Circuit Breaker for Upstream Riot API Routes
+
+Cloudflare blocks Lambda IPs for some Riot routes, so without a breaker every
+request waits for the full urlopen timeout before falling back. Breakers are
+kept per host + route (id and Riot ID/name path segments collapsed) in module state, so
+they are shared across warm Lambda invocations.
+
+State machine:
+- closed:    calls flow; outcomes are tracked in a rolling window
+- open:      failure rate crossed the threshold; calls are skipped until the cooldown ends
+- half_open: cooldown ended; a single probe call decides between closed and open
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import os
+import re
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict, deque
+from typing import Dict, Any
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+FAILURE_RATE_THRESHOLD = float(os.environ.get('CIRCUIT_FAILURE_RATE', '0.5'))
+MINIMUM_CALLS = int(os.environ.get('CIRCUIT_MINIMUM_CALLS', '3'))
+WINDOW_SIZE = int(os.environ.get('CIRCUIT_WINDOW_SIZE', '10'))
+OPEN_SECONDS = float(os.environ.get('CIRCUIT_OPEN_SECONDS', '60'))
+MAX_OPEN_SECONDS = float(os.environ.get('CIRCUIT_MAX_OPEN_SECONDS', '600'))
+
+# 403 is what Cloudflare returns for blocked Lambda IPs; 0 means network error/timeout
+FAILURE_STATUS_CODES = {0, 403, 429}
+
+# Path segments that identify a resource rather than a route (ids, puuids, match ids like NA1_4912345678)
+_ID_SEGMENT = re.compile(r'^(\d+|[A-Za-z0-9_-]{30,}|[A-Z0-9]+_\d+)$')
+# Name-keyed lookups: how many segments after the marker are names, not route
+# (/by-riot-id/{gameName}/{tagLine}, /by-name/{summonerName})
+_NAME_KEYED_SEGMENTS = {'by-riot-id': 2, 'by-name': 1}
+# Upper bound on tracked routes; the least recently used breaker is dropped beyond it
+MAX_BREAKERS = int(os.environ.get('CIRCUIT_MAX_BREAKERS', '256'))
+
+
+def route_key(url: str) -> str:
+    """
+    Collapse a URL into a host + route key, e.g.
+    na1.api.riotgames.com/lol/challenges/v1/challenges/{id}/leaderboards/by-level/CHALLENGER
+    americas.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{id}/{id}
+    """
+    parsed = urllib.parse.urlsplit(url)
+    segments = []
+    names_left = 0
+    for segment in parsed.path.split('/'):
+        if names_left or _ID_SEGMENT.match(segment):
+            segments.append('{id}')
+            names_left = max(0, names_left - 1)
+        else:
+            segments.append(segment)
+            names_left = _NAME_KEYED_SEGMENTS.get(segment, 0)
+    return f"{parsed.netloc}{'/'.join(segments)}"
+
+
+def is_failure(status_code: int) -> bool:
+    """Whether an upstream status code should count against the circuit."""
+    return status_code in FAILURE_STATUS_CODES or status_code >= 500
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker for a single upstream route."""
+
+    def __init__(self, route: str):
+        self.route = route
+        self.state = CLOSED
+        self.outcomes = deque(maxlen=WINDOW_SIZE)  # True = success, False = failure
+        self.opened_at = 0.0
+        self.open_seconds = OPEN_SECONDS
+        self.probe_in_flight = False
+        self.last_status_code = None
+        self._lock = threading.Lock()
+
+    def failure_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def retry_in_seconds(self) -> float:
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.open_seconds - time.time())
+
+    def allow_request(self) -> bool:
+        """
+        Decide whether a call may go upstream. Moves open -> half_open once the
+        cooldown has passed and lets exactly one probe through.
+        """
+        with self._lock:
+            if self.state == OPEN and self.retry_in_seconds() <= 0:
+                self.state = HALF_OPEN
+                self.probe_in_flight = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            return False
+
+    def record(self, status_code: int) -> None:
+        """Record the outcome of an upstream call."""
+        failed = is_failure(status_code)
+        with self._lock:
+            self.last_status_code = status_code
+            if self.state == HALF_OPEN:
+                self.probe_in_flight = False
+                if failed:
+                    # Probe failed - reopen with a longer cooldown
+                    self._open(min(self.open_seconds * 2, MAX_OPEN_SECONDS))
+                else:
+                    self.state = CLOSED
+                    self.open_seconds = OPEN_SECONDS
+                    self.outcomes.clear()
+                    self.outcomes.append(True)
+                return
+
+            self.outcomes.append(not failed)
+            if (self.state == CLOSED and len(self.outcomes) >= MINIMUM_CALLS
+                    and self.failure_rate() >= FAILURE_RATE_THRESHOLD):
+                self._open(OPEN_SECONDS)
+
+    def release(self) -> None:
+        """Give back a half-open probe slot for a call that ended without a verdict."""
+        with self._lock:
+            self.probe_in_flight = False
+
+    def _open(self, open_seconds: float) -> None:
+        self.state = OPEN
+        self.opened_at = time.time()
+        self.open_seconds = open_seconds
+        print(f"Circuit OPEN for {self.route} for {open_seconds:.0f}s (failure rate {self.failure_rate():.0%}, last status {self.last_status_code})")
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Summary of the breaker for api_attempts transparency.
+
+        Only fields that stay put while the upstream data does: responses hash their
+        body into the ETag, so per-call counters (window size, failure rate) would give
+        identical data a new ETag on every request. The failure rate is logged on opening.
+        """
+        return {
+            'route': self.route,
+            'state': self.state,
+            # Absolute time rather than a countdown keeps response ETags stable while open
+            'open_until': int(self.opened_at + self.open_seconds) if self.state == OPEN else None
+        }
+
+
+# Shared across warm invocations of the same container
+_breakers: 'OrderedDict[str, CircuitBreaker]' = OrderedDict()
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    """Get (or create) the breaker for a URL's host + route, keeping at most MAX_BREAKERS."""
+    key = route_key(url)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(key)
+            while len(_breakers) > MAX_BREAKERS:
+                _breakers.popitem(last=False)
+        else:
+            _breakers.move_to_end(key)
+        return breaker
+
+
+def describe_circuit(url: str) -> Dict[str, Any]:
+    """Breaker summary for the route a URL belongs to."""
+    return get_circuit_breaker(url).describe()
@@ -0,0 +1,263 @@
+"""
+Data Dragon Static Data Cache
+
+Shared by the Rift Rewind Lambda functions (deployed as a Lambda layer) to
+resolve numeric championId values into champion names and metadata without
+every client downloading champion.json itself.
+
+Caching strategy:
+- Latest version lookup is cached in memory and in /tmp with a TTL
+- champion.json is cached per version in memory and in /tmp
+- The championId -> {name, tags, image} index is built once per version
+
+Downloads take an optional RequestDeadline: each one's timeout shrinks to the
+time left, and once the budget is spent it is skipped (the deadline is marked
+partial) and the pinned version / an empty index is used instead.
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import os
+import time
+import urllib.request
+from typing import Dict, Any, List, Optional, Tuple
+from aws_xray_sdk.core import xray_recorder
+from cassette import get_cassette, encode_http_response, decode_http_response
+import json_codec
+from request_budget import RequestDeadline
+
+DATA_DRAGON_BASE_URL = os.environ.get('DATA_DRAGON_BASE_URL', 'https://ddragon.leagueoflegends.com')
+# Pinned fallback used when version detection fails (or when pinned via env)
+DEFAULT_DATA_DRAGON_VERSION = os.environ.get('DATA_DRAGON_VERSION', '15.20.1')
+DATA_DRAGON_LOCALE = 'en_US'
+DATA_DRAGON_CACHE_DIR = os.environ.get('DATA_DRAGON_CACHE_DIR', '/tmp/ddragon')
+VERSION_CACHE_TTL_SECONDS = int(os.environ.get('DATA_DRAGON_VERSION_TTL', '21600'))  # 6 hours
+DATA_DRAGON_TIMEOUT_SECONDS = 5
+
+# Module-level caches survive across warm Lambda invocations
+_latest_version: Dict[str, Any] = {'value': None, 'fetched_at': 0.0}
+_champion_data_cache: Dict[str, Dict[str, Any]] = {}
+_champion_index_cache: Dict[str, Dict[int, Dict[str, Any]]] = {}
+
+
+def _cache_path(filename: str) -> str:
+    return os.path.join(DATA_DRAGON_CACHE_DIR, filename)
+
+
+def _read_cache_file(filename: str, max_age: Optional[float] = None) -> Optional[Any]:
+    """Read a JSON file from /tmp, ignoring it if missing, corrupt or older than max_age."""
+    path = _cache_path(filename)
+    try:
+        if max_age is not None and time.time() - os.path.getmtime(path) > max_age:
+            return None
+        with open(path, 'rb') as cache_file:
+            return json_codec.loads(cache_file.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache_file(filename: str, data: Any) -> None:
+    """Atomically write a JSON file to /tmp so concurrent readers never see partial data."""
+    try:
+        os.makedirs(DATA_DRAGON_CACHE_DIR, exist_ok=True)
+        path = _cache_path(filename)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as cache_file:
+            cache_file.write(json_codec.dumps_bytes(data))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Data Dragon cache write failed for {filename}: {str(e)}")
+
+
+def _call_timeout(deadline: Optional[RequestDeadline]) -> Optional[float]:
+    """Timeout for the next download, or None if the request budget is spent."""
+    if deadline is None:
+        return DATA_DRAGON_TIMEOUT_SECONDS
+    return deadline.call_timeout(DATA_DRAGON_TIMEOUT_SECONDS)
+
+
+def _fetch_json(url: str, timeout: float = DATA_DRAGON_TIMEOUT_SECONDS) -> Any:
+    cassette = get_cassette()
+    if cassette is not None:
+        return json_codec.loads(decode_http_response(cassette.fetch(
+            f'GET {url}', lambda: encode_http_response(*_urlopen_get(url, timeout))))[2])
+    return json_codec.loads(_urlopen_get(url, timeout)[2])
+
+
+def _urlopen_get(url: str, timeout: float = DATA_DRAGON_TIMEOUT_SECONDS) -> Tuple[int, str, bytes]:
+    req = urllib.request.Request(url)
+    req.add_header('Accept', 'application/json')
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return response.status, response.reason, response.read()
+
+
+@xray_recorder.capture('data_dragon_latest_version')
+def get_latest_version(deadline: Optional[RequestDeadline] = None) -> str:
+    """
+    Get the latest Data Dragon version, cached so it doesn't cost a request every time.
+
+    Args:
+        deadline (Optional[RequestDeadline]): Request deadline bounding the versions.json download
+
+    Returns:
+        str: Version string such as '15.20.1' (pinned fallback if detection fails)
+    """
+    now = time.time()
+    if _latest_version['value'] and now - _latest_version['fetched_at'] < VERSION_CACHE_TTL_SECONDS:
+        return _latest_version['value']
+
+    cached = _read_cache_file('versions.json', max_age=VERSION_CACHE_TTL_SECONDS)
+    if isinstance(cached, list) and cached:
+        _latest_version.update(value=cached[0], fetched_at=now)
+        return cached[0]
+
+    timeout = _call_timeout(deadline)
+    if timeout is None:
+        # Out of budget: answer with what we have, but leave the next request free to look it up
+        print("Data Dragon version lookup skipped: request budget spent")
+        return _latest_version['value'] or DEFAULT_DATA_DRAGON_VERSION
+
+    try:
+        versions = _fetch_json(f'{DATA_DRAGON_BASE_URL}/api/versions.json', timeout)
+        if isinstance(versions, list) and versions:
+            _write_cache_file('versions.json', versions[:10])
+            _latest_version.update(value=versions[0], fetched_at=now)
+            return versions[0]
+    except Exception as e:
+        print(f"Data Dragon version lookup failed: {type(e).__name__}: {str(e)}")
+
+    # Don't retry on every call when detection is failing - back off for the TTL
+    fallback = _latest_version['value'] or DEFAULT_DATA_DRAGON_VERSION
+    _latest_version.update(value=fallback, fetched_at=now)
+    return fallback
+
+
+def get_cached_version() -> Optional[str]:
+    """
+    The Data Dragon version already known to this container, without any network call.
+
+    For display-only uses that must not block on (or fail with) a version lookup.
+    A stale value is fine here, so the TTL is not applied.
+
+    Returns:
+        Optional[str]: Version from memory or /tmp, None if it has never been looked up
+    """
+    if _latest_version['value']:
+        return _latest_version['value']
+    cached = _read_cache_file('versions.json')
+    if isinstance(cached, list) and cached:
+        return cached[0]
+    return None
+
+
+@xray_recorder.capture('data_dragon_champion_data')
+def load_champion_data(version: Optional[str] = None, deadline: Optional[RequestDeadline] = None) -> Dict[str, Any]:
+    """
+    Load champion.json for a Data Dragon version (memory -> /tmp -> CDN).
+
+    Args:
+        version (Optional[str]): Data Dragon version, latest if omitted
+        deadline (Optional[RequestDeadline]): Request deadline bounding the download
+
+    Returns:
+        Dict[str, Any]: The 'data' section of champion.json keyed by champion id (empty on failure)
+    """
+    version = version or get_latest_version(deadline)
+    if version in _champion_data_cache:
+        return _champion_data_cache[version]
+
+    filename = f'champion-{version}-{DATA_DRAGON_LOCALE}.json'
+    champion_data = _read_cache_file(filename)
+
+    if not isinstance(champion_data, dict):
+        url = f'{DATA_DRAGON_BASE_URL}/cdn/{version}/data/{DATA_DRAGON_LOCALE}/champion.json'
+        timeout = _call_timeout(deadline)
+        if timeout is None:
+            print("Data Dragon champion download skipped: request budget spent")
+            return {}
+        try:
+            print(f"Downloading Data Dragon champion data: {url}")
+            champion_data = _fetch_json(url, timeout).get('data', {})
+            _write_cache_file(filename, champion_data)
+        except Exception as e:
+            print(f"Data Dragon champion download failed: {type(e).__name__}: {str(e)}")
+            # Not cached in memory so the next invocation retries the download
+            return {}
+
+    _champion_data_cache[version] = champion_data
+    return champion_data
+
+
+def get_champion_index(version: Optional[str] = None,
+                       deadline: Optional[RequestDeadline] = None) -> Dict[int, Dict[str, Any]]:
+    """
+    Build (once per version) the championId -> {name, tags, image} index.
+
+    Args:
+        version (Optional[str]): Data Dragon version, latest if omitted
+        deadline (Optional[RequestDeadline]): Request deadline bounding any download
+
+    Returns:
+        Dict[int, Dict[str, Any]]: Champion metadata keyed by numeric championId
+    """
+    version = version or get_latest_version(deadline)
+    if version in _champion_index_cache:
+        return _champion_index_cache[version]
+
+    champion_data = load_champion_data(version, deadline)
+    index: Dict[int, Dict[str, Any]] = {}
+    for champion in champion_data.values():
+        try:
+            champion_id = int(champion['key'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        image_file = champion.get('image', {}).get('full', f"{champion.get('id', '')}.png")
+        index[champion_id] = {
+            'id': champion.get('id'),
+            'name': champion.get('name'),
+            'title': champion.get('title'),
+            'tags': champion.get('tags', []),
+            'image': f'{DATA_DRAGON_BASE_URL}/cdn/{version}/img/champion/{image_file}'
+        }
+
+    if index:
+        _champion_index_cache[version] = index
+    return index
+
+
+def enrich_champion_entries(entries: List[Dict[str, Any]], version: Optional[str] = None,
+                            id_field: str = 'championId',
+                            deadline: Optional[RequestDeadline] = None) -> List[Dict[str, Any]]:
+    """
+    Add championName/championTags/championImage to entries that carry a numeric championId.
+
+    Works for champion mastery entries and match-v5 participants alike. Entries are
+    copied, and unknown ids are passed through unchanged.
+
+    Args:
+        entries (List[Dict[str, Any]]): Raw Riot API entries
+        version (Optional[str]): Data Dragon version, latest if omitted
+        id_field (str): Field holding the numeric champion id
+        deadline (Optional[RequestDeadline]): Request deadline bounding any download
+
+    Returns:
+        List[Dict[str, Any]]: Enriched copies of the entries
+    """
+    if not entries:
+        return []
+
+    index = get_champion_index(version, deadline)
+    enriched = []
+    for entry in entries:
+        champion = index.get(entry.get(id_field)) if isinstance(entry, dict) else None
+        if champion is None:
+            enriched.append(entry)
+            continue
+        enriched.append({
+            **entry,
+            'championName': champion['name'],
+            'championTags': champion['tags'],
+            'championImage': champion['image']
+        })
+    return enriched
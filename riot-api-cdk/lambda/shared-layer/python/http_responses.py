@@ -0,0 +1,117 @@
+"""
+HTTP Response Helpers
+
+JSON response building shared by the Rift Rewind Lambda routes: weak ETags from
+a stable content hash, per-endpoint Cache-Control policies and If-None-Match
+handling that returns 304 with no body. Each payload is serialized exactly
+once: the ETag is hashed from the same bytes that become the body.
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import hashlib
+from typing import Dict, Any, Tuple
+import json_codec
+
+# HTTP caching policy per endpoint so CloudFront and browsers can absorb repeat traffic.
+# Contest picks are deterministic per year and leaderboards move slowly; the ladder moves faster.
+CACHE_CONTROL_POLICIES = {
+    'contests': 'public, max-age=300, stale-while-revalidate=3600',
+    'players': 'public, max-age=60, stale-while-revalidate=300',
+    'summoner': 'public, max-age=120, stale-while-revalidate=600',
+    'fallback': 'public, max-age=30, stale-while-revalidate=60',
+    'default': 'no-cache'
+}
+# Per-request fields excluded from the ETag so identical data hashes identically
+VOLATILE_RESPONSE_FIELDS = ('xray_trace_id', 'xray_console_url')
+
+def _weak_etag(stable_body: bytes) -> str:
+    return f'W/"{hashlib.sha256(stable_body).hexdigest()[:32]}"'
+
+def serialize_with_etag(payload: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Serialize a payload once and derive its ETag from the same bytes.
+    
+    The stable part (everything but VOLATILE_RESPONSE_FIELDS) is encoded and hashed,
+    then the volatile fields are appended to it - so the ETag is weak, as the body
+    still carries the per-request trace id. Routes build their payloads in a fixed
+    key order, so no sort_keys pass is needed for a stable hash.
+    
+    Returns:
+        Tuple[str, str]: JSON body and weak ETag
+    """
+    stable_payload = {k: v for k, v in payload.items() if k not in VOLATILE_RESPONSE_FIELDS}
+    body = json_codec.dumps_bytes(stable_payload)
+    etag = _weak_etag(body)
+    
+    volatile_fields = {k: payload[k] for k in VOLATILE_RESPONSE_FIELDS if k in payload}
+    if volatile_fields:
+        tail = json_codec.dumps_bytes(volatile_fields)
+        # '{...}' + '{"xray_trace_id":...}' -> '{...,"xray_trace_id":...}'
+        body = body[:-1] + (b',' if stable_payload else b'') + tail[1:]
+    return body.decode('utf-8'), etag
+
+def compute_etag(payload: Dict[str, Any]) -> str:
+    """Compute the weak ETag of a response payload, ignoring volatile fields."""
+    stable_payload = {k: v for k, v in payload.items() if k not in VOLATILE_RESPONSE_FIELDS}
+    return _weak_etag(json_codec.dumps_bytes(stable_payload))
+
+def build_json_response(payload: Dict[str, Any], trace_id: str, cache_policy: str = 'default') -> Dict[str, Any]:
+    """
+    Build a 200 JSON response with ETag and Cache-Control headers.
+    
+    Args:
+        payload (Dict[str, Any]): Response body before serialization
+        trace_id (str): X-Ray trace id for the X-Trace-Id header
+        cache_policy (str): Key into CACHE_CONTROL_POLICIES
+        
+    Returns:
+        Dict[str, Any]: Lambda proxy response
+    """
+    body, etag = serialize_with_etag(payload)
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Cache-Control': CACHE_CONTROL_POLICIES.get(cache_policy, CACHE_CONTROL_POLICIES['default']),
+            'ETag': etag,
+            'X-Trace-Id': trace_id
+        },
+        'body': body
+    }
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header value against an ETag (RFC 9110)."""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque_tag = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque_tag:
+            return True
+    return False
+
+def apply_conditional_request(event: Dict[str, Any], response: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn a 200 response into a bodiless 304 when the client's If-None-Match matches its ETag.
+    """
+    response_headers = response.get('headers') or {}
+    etag = response_headers.get('ETag')
+    if response.get('statusCode') != 200 or not etag:
+        return response
+    
+    # Function URL / API Gateway v2 lowercase header names, v1 events keep the client's casing
+    request_headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+    if not etag_matches(request_headers.get('if-none-match', ''), etag):
+        return response
+    
+    return {
+        'statusCode': 304,
+        'headers': {k: v for k, v in response_headers.items() if k != 'Content-Type'},
+        'body': ''
+    }
@@ -0,0 +1,54 @@
+"""
+JSON Codec
+
+One place for JSON encoding/decoding in the Rift Rewind Lambda functions.
+Uses orjson when it is installed in the layer (pip install orjson -t
+shared-layer/python) and falls back to the stdlib json module otherwise, so
+the functions behave the same either way - just faster with orjson.
+
+- loads() decodes straight from the bytes read off the socket or /tmp
+- dumps_bytes() produces compact UTF-8 JSON, ready to hash and to send
+- dumps() is the same as a str, for Lambda proxy response bodies
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on how the layer was built
+    orjson = None
+
+CODEC_NAME = 'orjson' if orjson is not None else 'json'
+
+# orjson rejects non-str dict keys by default; the stdlib stringifies them
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """
+    Decode JSON from bytes (no intermediate str) or str.
+
+    Raises:
+        ValueError: On invalid JSON (orjson.JSONDecodeError and json.JSONDecodeError both subclass it)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Encode to compact UTF-8 JSON bytes. Unknown types are stringified."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=str).encode('utf-8')
+
+
+def dumps(obj: Any) -> str:
+    """Encode to a compact JSON str (Lambda proxy response bodies must be str)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=str)
@@ -0,0 +1,251 @@
+"""
+Request Profiling
+
+Opt-in wall-clock sampling profiler for the Rift Rewind Lambda handlers. X-Ray
+only shows coarse subsegments (make_request, ssm_get_parameter); a profile of a
+slow request shows where the rest of the time went - JSON decoding, route
+logic, response serialization, time blocked on the connection pool.
+
+A sampler thread reads every thread's stack (sys._current_frames) each
+PROFILE_INTERVAL_MS while the handler runs, so work the handler hands to
+thread pools (leaderboard fan-out) is profiled too - cProfile would only see
+the handler's own thread and slow every call it counts. Idle pool workers
+waiting for work are left out.
+
+Enabled by environment variables (off by default):
+- PROFILE_REQUESTS:       'true' profiles every request
+- PROFILE_SAMPLE_PERCENT: profile this percentage of requests, e.g. 1 or 0.5
+- PROFILE_INTERVAL_MS:    sampling interval (default 5)
+- PROFILE_DIR:            where profiles are written (default /tmp/profiles, newest PROFILE_KEEP kept)
+- PROFILE_S3_BUCKET:      also upload them to s3://bucket/PROFILE_S3_PREFIX (default profiles/)
+
+Each profile is written as <trace id>.collapsed (flamegraph.pl / speedscope
+collapsed stacks) and <trace id>.speedscope.json (https://www.speedscope.app).
+A profiled response carries an X-Profile-Location header, and the request's
+X-Ray subsegment gets a 'profiled' annotation and the location as metadata,
+so a slow trace leads straight to its profile.
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import functools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, List, Callable, Optional, Tuple
+import boto3
+from aws_xray_sdk.core import xray_recorder
+import json_codec
+
+PROFILE_REQUESTS = os.environ.get('PROFILE_REQUESTS', 'false').lower() in ('1', 'true', 'yes')
+PROFILE_SAMPLE_PERCENT = float(os.environ.get('PROFILE_SAMPLE_PERCENT', '0'))
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', '5'))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', '/tmp/profiles')
+PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', '20'))
+PROFILE_S3_BUCKET = os.environ.get('PROFILE_S3_BUCKET', '')
+PROFILE_S3_PREFIX = os.environ.get('PROFILE_S3_PREFIX', 'profiles/')
+PROFILE_HEADER = 'X-Profile-Location'
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+# (function name, file, first line) - one flame graph frame per function, not per line
+Frame = Tuple[str, str, int]
+
+_s3_client = None
+
+
+def should_profile() -> bool:
+    """Decide per request whether to profile, from PROFILE_REQUESTS / PROFILE_SAMPLE_PERCENT."""
+    return PROFILE_REQUESTS or (PROFILE_SAMPLE_PERCENT > 0 and random.random() * 100 < PROFILE_SAMPLE_PERCENT)
+
+
+def _is_idle_worker(stack: List[Frame]) -> bool:
+    """A thread pool worker blocked waiting for its next job contributes nothing to the request."""
+    for caller, callee in zip(stack, stack[1:]):
+        if caller[0] == '_worker' and caller[1].endswith(os.path.join('concurrent', 'futures', 'thread.py')):
+            return callee[0] == 'get' and callee[1].endswith('queue.py')
+    return False
+
+
+class SamplingProfiler:
+    """Samples every thread's stack on a background thread until stopped."""
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000.0
+        self.handler_thread = threading.get_ident()
+        # thread label -> [(stack root..leaf, weight ms)]
+        self.samples: Dict[str, List[Tuple[Tuple[Frame, ...], float]]] = {}
+        self.started_at = 0.0
+        self.elapsed_ms = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed_ms = (time.perf_counter() - self.started_at) * 1000
+
+    def _run(self) -> None:
+        sampler_thread = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self._sample(sampler_thread, (now - last) * 1000)
+            last = now
+        # Credit the final partial interval too
+        self._sample(sampler_thread, (time.perf_counter() - last) * 1000)
+
+    def _sample(self, sampler_thread: int, weight_ms: float) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == sampler_thread:
+                continue
+            stack: List[Frame] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            stack.reverse()
+            if _is_idle_worker(stack):
+                continue
+            label = 'handler' if thread_id == self.handler_thread else names.get(thread_id, str(thread_id))
+            self.samples.setdefault(label, []).append((tuple(stack), weight_ms))
+
+    def collapsed(self) -> str:
+        """Brendan Gregg collapsed stacks: 'thread;frame;frame count' per unique stack."""
+        counts: Counter = Counter()
+        for label, samples in self.samples.items():
+            for stack, _ in samples:
+                counts[';'.join([label] + [f'{name} ({os.path.basename(path)}:{line})' for name, path, line in stack])] += 1
+        return ''.join(f'{stack} {count}\n' for stack, count in sorted(counts.items()))
+
+    def speedscope(self, profile_name: str) -> Dict[str, Any]:
+        """Speedscope file with one sampled profile per thread, weighted in milliseconds."""
+        frame_index: Dict[Frame, int] = {}
+        profiles = []
+        for label, samples in self.samples.items():
+            indexed = [[frame_index.setdefault(frame, len(frame_index)) for frame in stack] for stack, _ in samples]
+            profiles.append({
+                'type': 'sampled',
+                'name': label,
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': round(self.elapsed_ms, 3),
+                'samples': indexed,
+                'weights': [round(weight_ms, 3) for _, weight_ms in samples]
+            })
+        frames = [{'name': name, 'file': path, 'line': line} for name, path, line in frame_index]
+        return {
+            '$schema': SPEEDSCOPE_SCHEMA,
+            'name': profile_name,
+            'exporter': 'rift-rewind profiling',
+            'activeProfileIndex': 0,
+            'shared': {'frames': frames},
+            'profiles': profiles
+        }
+
+
+def _prune_profiles() -> None:
+    """Keep /tmp bounded: only the newest PROFILE_KEEP profiles survive."""
+    try:
+        entries = sorted((entry for entry in os.scandir(PROFILE_DIR) if entry.name.endswith('.collapsed')),
+                         key=lambda entry: entry.stat().st_mtime)
+    except OSError:
+        return
+    for entry in entries[:-PROFILE_KEEP] if PROFILE_KEEP > 0 else entries:
+        for path in (entry.path, entry.path[:-len('.collapsed')] + '.speedscope.json'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def write_profile(profiler: SamplingProfiler, profile_id: str) -> Optional[str]:
+    """
+    Write a profile to PROFILE_DIR and, if configured, S3.
+
+    Returns:
+        Optional[str]: s3:// URI of the speedscope file when uploaded, else its /tmp path (None if writing failed)
+    """
+    global _s3_client
+    collapsed = profiler.collapsed().encode('utf-8')
+    speedscope = json_codec.dumps_bytes(profiler.speedscope(profile_id))
+    location = None
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, profile_id)
+        with open(f'{base}.collapsed', 'wb') as collapsed_file:
+            collapsed_file.write(collapsed)
+        with open(f'{base}.speedscope.json', 'wb') as speedscope_file:
+            speedscope_file.write(speedscope)
+        location = f'{base}.speedscope.json'
+        _prune_profiles()
+    except OSError as e:
+        print(f"Profile write failed for {profile_id}: {str(e)}")
+
+    if PROFILE_S3_BUCKET:
+        try:
+            if _s3_client is None:
+                _s3_client = boto3.client('s3')
+            key = f'{PROFILE_S3_PREFIX}{profile_id}'
+            _s3_client.put_object(Bucket=PROFILE_S3_BUCKET, Key=f'{key}.collapsed', Body=collapsed, ContentType='text/plain')
+            _s3_client.put_object(Bucket=PROFILE_S3_BUCKET, Key=f'{key}.speedscope.json', Body=speedscope, ContentType='application/json')
+            location = f's3://{PROFILE_S3_BUCKET}/{key}.speedscope.json'
+        except Exception as e:
+            print(f"Profile upload failed for {profile_id}: {type(e).__name__}: {str(e)}")
+    return location
+
+
+def _profile_id(context: Any) -> str:
+    """The X-Ray trace id (what the response's X-Trace-Id header carries), else the request id."""
+    trace_entity = xray_recorder.get_trace_entity()
+    trace_id = getattr(trace_entity, 'trace_id', None) if trace_entity else None
+    # Tracing disabled (local runs, benchmarks) gives every request the same all-zero dummy id
+    if trace_id and not trace_id.startswith('1-00000000-'):
+        return trace_id
+    return f"{getattr(context, 'aws_request_id', None) or 'local'}-{int(time.time() * 1000)}"
+
+
+def profiled_handler(handler: Callable[[Dict[str, Any], Any], Dict[str, Any]]) -> Callable[[Dict[str, Any], Any], Dict[str, Any]]:
+    """
+    Profile a Lambda handler on the requests should_profile() picks.
+
+    Apply it below @xray_recorder.capture so the profile location can be recorded
+    on the handler's subsegment. The profile is written after the handler returns,
+    outside the profiled window. With profiling off the handler is returned unwrapped.
+    """
+    if not PROFILE_REQUESTS and PROFILE_SAMPLE_PERCENT <= 0:
+        return handler
+
+    @functools.wraps(handler)
+    def wrapper(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+        if not should_profile():
+            return handler(event, context)
+
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            response = handler(event, context)
+        finally:
+            profiler.stop()
+
+        profile_id = _profile_id(context)
+        location = write_profile(profiler, profile_id)
+        samples = sum(len(samples) for samples in profiler.samples.values())
+        print(f"Profiled request {profile_id}: {profiler.elapsed_ms:.0f}ms, {samples} samples -> {location}")
+        xray_recorder.put_annotation('profiled', True)
+        xray_recorder.put_metadata('profile_location', location)
+        if location and isinstance(response, dict):
+            response.setdefault('headers', {})[PROFILE_HEADER] = location
+        return response
+
+    return wrapper
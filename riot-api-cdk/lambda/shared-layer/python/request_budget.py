@@ -0,0 +1,69 @@
+"""
+Deadline-Aware Request Budgeting
+
+A request-scoped deadline built from the Lambda context. Every upstream call
+asks the deadline for its timeout, so per-call timeouts shrink to fit the time
+left, and once the budget is spent handlers return partial results instead of
+letting the Lambda time out with nothing.
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import os
+import time
+from typing import Any, Optional
+
+# Time kept back for building and returning the response after the last upstream call
+RESPONSE_RESERVE_MS = int(os.environ.get('RESPONSE_RESERVE_MS', '1500'))
+# Budget used when there is no Lambda context (local runs, benchmarks)
+DEFAULT_BUDGET_MS = int(os.environ.get('DEFAULT_REQUEST_BUDGET_MS', '25000'))
+DEFAULT_CALL_TIMEOUT_SECONDS = 10.0
+# Not worth starting an upstream call with less time than this
+MIN_CALL_TIMEOUT_SECONDS = 0.5
+
+
+class RequestDeadline:
+    """Absolute deadline for one invocation, shared by every upstream call it makes."""
+
+    def __init__(self, budget_ms: float, reserve_ms: float = RESPONSE_RESERVE_MS):
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + max(0.0, budget_ms - reserve_ms) / 1000.0
+        # Set once any call was skipped or cut short because the budget ran out
+        self.partial = False
+
+    @classmethod
+    def from_context(cls, context: Any, reserve_ms: float = RESPONSE_RESERVE_MS) -> 'RequestDeadline':
+        """Build a deadline from context.get_remaining_time_in_millis(), if available."""
+        budget_ms = DEFAULT_BUDGET_MS
+        get_remaining = getattr(context, 'get_remaining_time_in_millis', None)
+        if callable(get_remaining):
+            try:
+                budget_ms = float(get_remaining())
+            except Exception:
+                pass
+        return cls(budget_ms, reserve_ms)
+
+    def remaining_seconds(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def elapsed_ms(self) -> int:
+        return int((time.monotonic() - self.started_at) * 1000)
+
+    def expired(self) -> bool:
+        """True (and marks the response partial) once there is no room for another call."""
+        if self.remaining_seconds() < MIN_CALL_TIMEOUT_SECONDS:
+            self.partial = True
+            return True
+        return False
+
+    def call_timeout(self, requested: float = DEFAULT_CALL_TIMEOUT_SECONDS) -> Optional[float]:
+        """
+        Timeout for the next upstream call, shrunk to fit the remaining budget.
+
+        Returns:
+            Optional[float]: Seconds to allow, or None if the budget is spent
+        """
+        if self.expired():
+            return None
+        return min(requested, self.remaining_seconds())
@@ -0,0 +1,346 @@
+"""
+Shared Riot API Client
+
+One client for every Riot API call made by the Rift Rewind Lambda functions:
+- API key fetched from SSM once and cached across warm invocations
+- Keep-alive connection pool per host (no TLS handshake per call)
+- Circuit breaker + last-good-response fallback per route
+- Request deadline aware timeouts
+- Riot ID -> account (PUUID) cache
+- Optional record/replay cassette (see cassette.py) for offline runs
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import gzip
+import http.client
+import os
+import queue
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+import boto3
+from aws_xray_sdk.core import xray_recorder
+from cassette import CassetteMiss, get_cassette, encode_http_response, decode_http_response
+from circuit_breaker import get_circuit_breaker
+import json_codec
+from request_budget import RequestDeadline, DEFAULT_CALL_TIMEOUT_SECONDS
+
+SSM_PARAMETER_NAME = os.environ.get('PARAMETER_NAME', '/rift-rewind/riot-api-key')
+RIOT_API_HEADER = 'X-Riot-Token'
+# Riot development keys rotate every 24h, so a stale key must not live forever
+API_KEY_CACHE_TTL_SECONDS = 900
+# Local runs/benchmarks only: point *.api.riotgames.com at a stub server and skip SSM
+RIOT_API_ENDPOINT_OVERRIDE = os.environ.get('RIOT_API_ENDPOINT_OVERRIDE', '')
+LOCAL_RIOT_API_KEY = os.environ.get('RIOT_API_KEY', '')
+USER_AGENT = 'RiftRewind/1.0 (AWS Lambda; +https://github.com/BryanChasko/rift-rewind-aws-riot-games-hackathon)'
+
+MAX_IDLE_CONNECTIONS_PER_HOST = 8
+STALE_RESPONSE_MAX_AGE_SECONDS = 900
+STALE_RESPONSE_CACHE_SIZE = 256
+PUUID_CACHE_TTL_SECONDS = 3600
+PUUID_CACHE_SIZE = 1024
+
+RequestResult = Tuple[Optional[Any], int, str]
+
+
+# ---------------------------------------------------------------------------
+# API key cache
+# ---------------------------------------------------------------------------
+
+_api_key_cache: Dict[str, Any] = {'value': None, 'fetched_at': 0.0}
+_ssm_client = None
+
+
+def get_api_key(force_refresh: bool = False) -> str:
+    """
+    Get the Riot API key from SSM Parameter Store, cached across warm invocations.
+
+    Raises:
+        Exception: If the parameter can't be read
+    """
+    global _ssm_client
+    if LOCAL_RIOT_API_KEY:
+        return LOCAL_RIOT_API_KEY
+    now = time.time()
+    if not force_refresh and _api_key_cache['value'] and now - _api_key_cache['fetched_at'] < API_KEY_CACHE_TTL_SECONDS:
+        return _api_key_cache['value']
+
+    with xray_recorder.capture('ssm_get_parameter'):
+        try:
+            if _ssm_client is None:
+                _ssm_client = boto3.client('ssm')
+            api_key = _ssm_client.get_parameter(
+                Name=SSM_PARAMETER_NAME,
+                WithDecryption=True
+            )['Parameter']['Value']
+        except Exception as ssm_error:
+            raise Exception(f'Failed to retrieve API key from SSM: {str(ssm_error)}')
+
+    _api_key_cache.update(value=api_key, fetched_at=now)
+    return api_key
+
+
+def get_auth_headers() -> Dict[str, str]:
+    return {RIOT_API_HEADER: get_api_key()}
+
+
+# ---------------------------------------------------------------------------
+# Connection pool
+# ---------------------------------------------------------------------------
+
+_pools: Dict[Tuple[str, str], queue.LifoQueue] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(scheme: str, netloc: str) -> queue.LifoQueue:
+    with _pools_lock:
+        pool = _pools.get((scheme, netloc))
+        if pool is None:
+            pool = _pools[(scheme, netloc)] = queue.LifoQueue(maxsize=MAX_IDLE_CONNECTIONS_PER_HOST)
+        return pool
+
+
+def _checkout(scheme: str, netloc: str, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+    """Reuse an idle keep-alive connection for the host, or open a new one."""
+    try:
+        conn = _get_pool(scheme, netloc).get_nowait()
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        conn.timeout = timeout
+        return conn, True
+    except queue.Empty:
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return connection_class(netloc, timeout=timeout), False
+
+
+def _checkin(scheme: str, netloc: str, conn: http.client.HTTPConnection) -> None:
+    try:
+        _get_pool(scheme, netloc).put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+
+def http_get(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = DEFAULT_CALL_TIMEOUT_SECONDS) -> Tuple[int, str, bytes]:
+    """
+    GET a URL over a pooled keep-alive connection.
+
+    Returns:
+        Tuple[int, str, bytes]: status code, reason phrase and (decompressed) body
+
+    Raises:
+        OSError/http.client.HTTPException: On network failures and timeouts
+        CassetteMiss: When replaying a cassette that never recorded this URL
+    """
+    cassette = get_cassette()
+    if cassette is not None:
+        # Keyed on the URL only - the X-Riot-Token header never ends up in a cassette
+        return decode_http_response(cassette.fetch(
+            f'GET {url}', lambda: encode_http_response(*_pooled_get(url, headers, timeout))))
+    return _pooled_get(url, headers, timeout)
+
+
+def _pooled_get(url: str, headers: Optional[Dict[str, str]], timeout: float) -> Tuple[int, str, bytes]:
+    parsed = urllib.parse.urlsplit(url)
+    path = parsed.path + (f'?{parsed.query}' if parsed.query else '')
+    request_headers = {
+        'User-Agent': USER_AGENT,
+        'Accept': 'application/json',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Accept-Encoding': 'gzip',
+        **(headers or {})
+    }
+    if RIOT_API_ENDPOINT_OVERRIDE and parsed.netloc.endswith('.api.riotgames.com'):
+        # Keep the original Host header so the stub can tell platform/regional hosts apart
+        request_headers['Host'] = parsed.netloc
+        parsed = urllib.parse.urlsplit(RIOT_API_ENDPOINT_OVERRIDE)._replace(path=parsed.path, query=parsed.query)
+
+    for attempt in range(2):
+        conn, reused = _checkout(parsed.scheme, parsed.netloc, timeout)
+        try:
+            conn.request('GET', path, headers=request_headers)
+            response = conn.getresponse()
+            body = response.read()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            # The server closed an idle pooled connection - retry once on a fresh one
+            if reused and attempt == 0:
+                continue
+            raise
+        except Exception:
+            conn.close()
+            raise
+
+        if response.getheader('Content-Encoding', '').lower() == 'gzip':
+            body = gzip.decompress(body)
+        if response.will_close:
+            conn.close()
+        else:
+            _checkin(parsed.scheme, parsed.netloc, conn)
+        return response.status, response.reason, body
+
+    raise http.client.HTTPException(f'Unable to complete request to {parsed.netloc}')
+
+
+# ---------------------------------------------------------------------------
+# Riot requests with circuit breaker, stale fallback and deadline
+# ---------------------------------------------------------------------------
+
+# Last successful upstream response per URL, served while a route's circuit is open
+_last_good_responses: 'OrderedDict[str, Tuple[Any, float]]' = OrderedDict()
+_last_good_lock = threading.Lock()
+
+
+def _remember_response(url: str, data: Any) -> None:
+    with _last_good_lock:
+        _last_good_responses[url] = (data, time.time())
+        _last_good_responses.move_to_end(url)
+        while len(_last_good_responses) > STALE_RESPONSE_CACHE_SIZE:
+            _last_good_responses.popitem(last=False)
+
+
+def _stale_response(url: str) -> Optional[Tuple[Any, float]]:
+    with _last_good_lock:
+        stale = _last_good_responses.get(url)
+    if stale and time.time() - stale[1] < STALE_RESPONSE_MAX_AGE_SECONDS:
+        return stale
+    return None
+
+
+@xray_recorder.capture('make_request')
+def make_request(url: str, headers: Optional[Dict[str, str]] = None, deadline: Optional[RequestDeadline] = None) -> RequestResult:
+    """
+    GET a Riot API URL and decode the JSON body.
+
+    Args:
+        url (str): Full Riot API URL
+        headers (Optional[Dict[str, str]]): Extra headers, normally the X-Riot-Token header
+        deadline (Optional[RequestDeadline]): Request deadline the call timeout must fit in
+
+    Returns:
+        RequestResult: (data or None, status code, details) - status 0 means a network error,
+        503 an open circuit and 504 a spent request budget
+    """
+    # Shrink the timeout to the remaining budget; skip the call entirely once it's spent
+    timeout = DEFAULT_CALL_TIMEOUT_SECONDS
+    if deadline is not None:
+        timeout = deadline.call_timeout(DEFAULT_CALL_TIMEOUT_SECONDS)
+        if timeout is None:
+            print(f"Request budget spent ({deadline.elapsed_ms()}ms elapsed), skipping {url}")
+            return None, 504, f'Skipped - request budget spent after {deadline.elapsed_ms()}ms'
+
+    # Skip routes whose circuit is open instead of waiting for the timeout again
+    breaker = get_circuit_breaker(url)
+    if not breaker.allow_request():
+        stale = _stale_response(url)
+        if stale:
+            print(f"Circuit open for {breaker.route}, serving cached response from {int(time.time() - stale[1])}s ago")
+            return stale[0], 200, f'Served from cache (circuit {breaker.state})'
+        print(f"Circuit open for {breaker.route}, skipping upstream call")
+        return None, 503, f'Circuit {breaker.state} for {breaker.route} - skipped upstream call, retry in {breaker.retry_in_seconds():.0f}s'
+
+    try:
+        print(f"Opening URL: {url}")
+        status, reason, body = http_get(url, headers, timeout)
+    except CassetteMiss:
+        raise  # an incomplete cassette is a setup error, not an upstream failure
+    except Exception as e:
+        print(f"Exception: {type(e).__name__}: {str(e)}")
+        if deadline is not None and deadline.expired():
+            # Our shrunken timeout ran out - not the upstream's fault, don't count it
+            breaker.release()
+            return None, 504, f'Timed out at request deadline after {deadline.elapsed_ms()}ms: {str(e)}'
+        breaker.record(0)
+        return None, 0, f'Unexpected error: {str(e)}'
+
+    breaker.record(status)
+    if status >= 400:
+        error_body = body.decode(errors='replace') if body else 'No response body'
+        print(f"HTTP Error: {status} {reason}, body: {error_body[:100]}")
+        return None, status, f'HTTP {status}: {reason}. Response: {error_body[:200]}'
+
+    try:
+        data = json_codec.loads(body)  # straight from bytes - no decode() copy
+    except ValueError as e:
+        return None, status, f'Invalid JSON response: {str(e)}'
+    print(f"Success: {status}, data keys: {list(data.keys()) if isinstance(data, dict) else 'not dict'}")
+    _remember_response(url, data)
+    return data, status, 'Success'
+
+
+def cached_request(url: str, headers: Optional[Dict[str, str]], make_request, max_age: float) -> RequestResult:
+    """
+    Serve a shared (not player-specific) Riot response such as the challenges config from
+    the last good response if it is younger than max_age, otherwise fetch it.
+
+    Args:
+        url (str): Full Riot API URL
+        headers (Optional[Dict[str, str]]): Riot auth headers
+        make_request: Request function returning (data, status_code, error_details)
+        max_age (float): Seconds a remembered response stays fresh
+
+    Returns:
+        RequestResult: Same shape as make_request
+    """
+    with _last_good_lock:
+        remembered = _last_good_responses.get(url)
+    if remembered and time.time() - remembered[1] < max_age:
+        return remembered[0], 200, f'Success (cached {int(time.time() - remembered[1])}s ago)'
+    return make_request(url, headers)
+
+
+# ---------------------------------------------------------------------------
+# Riot ID -> account cache
+# ---------------------------------------------------------------------------
+
+ROUTING_MAP = {
+    'na1': 'americas',
+    'br1': 'americas',
+    'la1': 'americas',
+    'la2': 'americas',
+    'euw1': 'europe',
+    'eun1': 'europe',
+    'tr1': 'europe',
+    'ru': 'europe',
+    'kr': 'asia',
+    'jp1': 'asia',
+    'oc1': 'sea'
+}
+
+
+def get_routing_value(region: str) -> str:
+    """Map platform region to routing value for Riot ID API"""
+    return ROUTING_MAP.get(region, 'americas')
+
+
+_account_cache: 'OrderedDict[Tuple[str, str, str], Tuple[Dict[str, Any], float]]' = OrderedDict()
+_account_lock = threading.Lock()
+
+
+def get_account_by_riot_id(game_name: str, tag_line: str, region: str, headers: Dict[str, str],
+                           deadline: Optional[RequestDeadline] = None) -> RequestResult:
+    """
+    Resolve a Riot ID to its account (puuid, gameName, tagLine), cached for an hour.
+
+    Riot IDs are case-insensitive, so the cache key is lowercased.
+    """
+    routing_value = get_routing_value(region)
+    cache_key = (routing_value, game_name.lower(), tag_line.lower())
+    with _account_lock:
+        cached = _account_cache.get(cache_key)
+    if cached and time.time() - cached[1] < PUUID_CACHE_TTL_SECONDS:
+        return cached[0], 200, 'Success (cached)'
+
+    account_url = (f'https://{routing_value}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/'
+                   f'{urllib.parse.quote(game_name, safe="")}/{urllib.parse.quote(tag_line, safe="")}')
+    account_data, status_code, error_details = make_request(account_url, headers, deadline)
+    if account_data and account_data.get('puuid'):
+        with _account_lock:
+            _account_cache[cache_key] = (account_data, time.time())
+            _account_cache.move_to_end(cache_key)
+            while len(_account_cache) > PUUID_CACHE_SIZE:
+                _account_cache.popitem(last=False)
+    return account_data, status_code, error_details
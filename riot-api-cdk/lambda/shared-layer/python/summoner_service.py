@@ -0,0 +1,194 @@
+"""
+Summoner Lookup Service
+
+Riot ID -> summoner level + top champion mastery, shared by the main Lambda's
+summoner-lookup route and the standalone Summoner Lookup Lambda. Uses the
+shared Riot client, so both get the pooled connections, cached API key and
+cached Riot ID -> PUUID lookups.
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import base64
+from typing import Dict, Any, List, Optional, Tuple
+from aws_xray_sdk.core import xray_recorder
+from data_dragon import get_latest_version, enrich_champion_entries
+from http_responses import build_json_response
+import json_codec
+from request_budget import RequestDeadline
+from riot_client import ROUTING_MAP, get_account_by_riot_id, make_request as riot_make_request
+
+
+def parse_lookup_request(event: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Read the Riot ID and region from a POST body ({"summonerName", "region"}) or
+    from query parameters (summonerName or riotId, region).
+
+    Raises:
+        ValueError: If the body is not valid JSON or not a JSON object
+    """
+    body = event.get('body') or ''
+    if body and event.get('isBase64Encoded'):
+        body = base64.b64decode(body).decode()
+    params = json_codec.loads(body) if body else {}
+    if not isinstance(params, dict):
+        raise ValueError('Request body must be a JSON object')
+    params = {**(event.get('queryStringParameters') or {}), **params}
+    summoner_name = (params.get('summonerName') or params.get('riotId') or '').strip()
+    region = (params.get('region') or 'na1').strip().lower()
+    return summoner_name, region
+
+
+def error_response(status_code: int, message: str, **extra: Any) -> Dict[str, Any]:
+    return {
+        'statusCode': status_code,
+        'headers': {'Content-Type': 'application/json'},
+        'body': json_codec.dumps({'error': message, **extra})
+    }
+
+
+def validate_lookup_request(event: Dict[str, Any]) -> Tuple[str, str, Optional[Dict[str, Any]]]:
+    """
+    Parse and validate a lookup request before any upstream call is made.
+
+    Returns:
+        Tuple[str, str, Optional[Dict[str, Any]]]: (summoner_name, region, 400 response or None if valid)
+    """
+    try:
+        summoner_name, region = parse_lookup_request(event)
+    except ValueError:
+        return '', '', error_response(400, 'Request body must be a JSON object')
+    except (TypeError, AttributeError):
+        return '', '', error_response(400, 'summonerName and region must be strings')
+
+    # Region ends up in the request hostname, so only known platforms are allowed
+    if not summoner_name or '#' not in summoner_name:
+        return summoner_name, region, error_response(400, 'Please use Riot ID format: GameName#TAG (e.g., Doublelift#NA1)')
+    if region not in ROUTING_MAP:
+        return summoner_name, region, error_response(400, f'Unknown region "{region}". Use one of: {", ".join(ROUTING_MAP)}')
+    return summoner_name, region, None
+
+
+def lookup_summoner(summoner_name: str, region: str, headers: Dict[str, str], make_request,
+                    deadline: RequestDeadline, api_attempts: List[Dict[str, Any]]) -> Tuple[int, Dict[str, Any]]:
+    """
+    Look up a summoner and their top 3 champions by Riot ID.
+
+    Args:
+        summoner_name (str): Riot ID in GameName#TAG format
+        region (str): Platform region such as na1
+        headers (Dict[str, str]): Riot auth headers
+        make_request: Request function returning (data, status_code, error_details)
+        deadline (RequestDeadline): Request deadline shared by every call
+        api_attempts (List[Dict[str, Any]]): Tracking list for educational transparency
+
+    Returns:
+        Tuple[int, Dict[str, Any]]: HTTP status code and response payload
+    """
+    game_name, tag_line = summoner_name.split('#', 1)
+
+    # Step 1: Get account by Riot ID (cached Riot ID -> PUUID)
+    with xray_recorder.capture('riot_account_api'):
+        account_data, status_code, error_details = get_account_by_riot_id(game_name, tag_line, region, headers, deadline)
+    api_attempts.append({
+        'endpoint': 'Account by Riot ID API',
+        'status': 'Success' if account_data else 'Failed',
+        'method': 'GET',
+        'url': '/riot/account/v1/accounts/by-riot-id/{gameName}/{tagLine}',
+        'auth': 'X-Riot-Token required',
+        'result': error_details,
+        'status_code': status_code,
+        'data_count': 1 if account_data else 0
+    })
+    if not account_data:
+        if status_code == 404:
+            return 404, {'error': f'Summoner "{summoner_name}" not found'}
+        if status_code == 504:
+            return 504, {'error': f'Riot API lookups did not finish within the request budget ({deadline.elapsed_ms()}ms)', 'partial': True}
+        return status_code or 502, {'error': f'API error {status_code}: {error_details}'}
+    puuid = account_data['puuid']
+
+    # Step 2: Get summoner data by puuid
+    summoner_url = f'https://{region}.api.riotgames.com/lol/summoner/v4/summoners/by-puuid/{puuid}'
+    with xray_recorder.capture('riot_summoner_api'):
+        summoner_data, status_code, error_details = make_request(summoner_url, headers)
+    api_attempts.append({
+        'endpoint': 'Summoner by PUUID API',
+        'status': 'Success' if summoner_data else 'Failed',
+        'method': 'GET',
+        'url': summoner_url.replace(puuid, '{puuid}'),
+        'auth': 'X-Riot-Token required',
+        'result': error_details,
+        'status_code': status_code,
+        'data_count': 1 if summoner_data else 0
+    })
+    if not summoner_data:
+        if status_code == 504:
+            return 504, {'error': f'Riot API lookups did not finish within the request budget ({deadline.elapsed_ms()}ms)', 'partial': True}
+        return status_code or 502, {'error': f'API error {status_code}: {error_details}'}
+
+    # Step 3: Get champion mastery data - optional, continue with an empty array if it fails
+    mastery_url = f'https://{region}.api.riotgames.com/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}/top?count=3'
+    with xray_recorder.capture('riot_mastery_api'):
+        mastery_data, status_code, error_details = make_request(mastery_url, headers)
+    mastery_data = mastery_data if isinstance(mastery_data, list) else []
+    api_attempts.append({
+        'endpoint': 'Champion Mastery API',
+        'status': 'Success' if mastery_data else 'Failed',
+        'method': 'GET',
+        'url': mastery_url.replace(puuid, '{puuid}'),
+        'auth': 'X-Riot-Token required',
+        'result': error_details,
+        'status_code': status_code,
+        'data_count': len(mastery_data)
+    })
+
+    # Step 4: Resolve championId values to names/images server-side via cached Data Dragon index.
+    # Cache hits cost nothing; downloads share the deadline and are skipped (partial) once it is spent
+    ddragon_version = get_latest_version(deadline)
+    top_champions = mastery_data[:3]
+    if not deadline.expired():
+        with xray_recorder.capture('data_dragon_enrich'):
+            top_champions = enrich_champion_entries(top_champions, ddragon_version, deadline=deadline)
+
+    return 200, {
+        'summoner': {
+            'name': f"{account_data['gameName']}#{account_data['tagLine']}",
+            'level': summoner_data['summonerLevel'],
+            'puuid': puuid
+        },
+        'topChampions': top_champions,
+        'ddragon_version': ddragon_version,
+        'partial': deadline.partial
+    }
+
+
+def handle_summoner_lookup_endpoint(event: Dict[str, Any], api_attempts: List[Dict[str, Any]], headers: Dict[str, str],
+                                    make_request=None, deadline: Optional[RequestDeadline] = None) -> Dict[str, Any]:
+    """
+    Handle summoner-lookup route - Riot ID to summoner data and top champions.
+    Expected input: {"summonerName": "GameName#TAG", "region": "na1"} as a POST body,
+    or the same fields as query parameters.
+    """
+    deadline = deadline or RequestDeadline.from_context(None)
+    if make_request is None:
+        make_request = lambda url, request_headers=None: riot_make_request(url, request_headers, deadline)
+
+    summoner_name, region, invalid = validate_lookup_request(event)
+    if invalid is not None:
+        return invalid
+
+    status_code, payload = lookup_summoner(summoner_name, region, headers, make_request, deadline, api_attempts)
+    trace_id = xray_recorder.get_trace_entity().trace_id if xray_recorder.get_trace_entity() else 'unknown'
+
+    if status_code != 200:
+        response = error_response(status_code, payload.pop('error'), **payload)
+        response['headers']['X-Trace-Id'] = trace_id
+        return response
+
+    return build_json_response({
+        **payload,
+        'api_attempts': api_attempts,
+        'xray_trace_id': trace_id
+    }, trace_id, 'fallback' if payload['partial'] else 'summoner')
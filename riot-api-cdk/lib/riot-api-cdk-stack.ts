@@ -3,6 +3,9 @@ import { Construct } from 'constructs';
 import * as lambda from 'aws-cdk-lib/aws-lambda';
 import * as iam from 'aws-cdk-lib/aws-iam';
 import * as ssm from 'aws-cdk-lib/aws-ssm';
+import * as events from 'aws-cdk-lib/aws-events';
+import * as targets from 'aws-cdk-lib/aws-events-targets';
+import * as s3 from 'aws-cdk-lib/aws-s3';
 import * as path from 'path';
 
 export class RiotApiCdkStack extends cdk.Stack {
@@ -42,29 +45,65 @@ export class RiotApiCdkStack extends cdk.Stack {
     // Grant Lambda permission to read the SSM parameter
     apiKeyParameter.grantRead(lambdaRole);
 
+    // Shared Python modules (Data Dragon cache, etc.) used by both Lambda functions
+    const sharedLayer = new lambda.LayerVersion(this, 'RiftRewindSharedLayer', {
+      code: lambda.Code.fromAsset(path.join(__dirname, '../lambda/shared-layer')),
+      compatibleRuntimes: [lambda.Runtime.PYTHON_3_11],
+      description: 'Shared Rift Rewind modules: Riot client, summoner lookup, Data Dragon cache, circuit breaker, request deadline'
+    });
+
+    // Opt-in cache priming (`cdk deploy -c primeCaches=true`): prime at init and keep warm containers' caches fresh
+    const primeCaches = ['true', true].includes(this.node.tryGetContext('primeCaches'));
+
+    // Opt-in request profiling (`-c profileSamplePercent=1`, optionally `-c profileBucket=<bucket>`), see profiling.py
+    const profilingEnvironment: { [key: string]: string } = {
+      PROFILE_SAMPLE_PERCENT: String(this.node.tryGetContext('profileSamplePercent') ?? '0')
+    };
+    const profileBucketName = this.node.tryGetContext('profileBucket');
+    if (profileBucketName) {
+      profilingEnvironment.PROFILE_S3_BUCKET = profileBucketName;
+      s3.Bucket.fromBucketName(this, 'ProfileBucket', profileBucketName).grantPut(lambdaRole, 'profiles/*');
+    }
+
     // Create main Riot API Lambda Function
     const riotApiFunction = new lambda.Function(this, 'RiotApiFunction', {
       runtime: lambda.Runtime.PYTHON_3_11,
       handler: 'lambda_function.lambda_handler',
       code: lambda.Code.fromAsset(path.join(__dirname, '../lambda/riot-api-source')),
       role: lambdaRole,
+      layers: [sharedLayer],
       timeout: cdk.Duration.seconds(30),
       tracing: lambda.Tracing.ACTIVE,
       environment: {
-        PARAMETER_NAME: apiKeyParameter.parameterName
+        PARAMETER_NAME: apiKeyParameter.parameterName,
+        PRIME_CACHES_ON_INIT: primeCaches ? 'true' : 'false',
+        ...profilingEnvironment
       }
     });
 
+    if (primeCaches) {
+      // Within the 10 minute challenger ladder cache TTL, so warm containers rarely fetch it on a request
+      new events.Rule(this, 'RiotApiWarmupSchedule', {
+        schedule: events.Schedule.rate(cdk.Duration.minutes(5)),
+        description: 'Refresh the Riot API Lambda caches without user-facing work',
+        targets: [new targets.LambdaFunction(riotApiFunction, {
+          event: events.RuleTargetInput.fromObject({ warmup: true })
+        })]
+      });
+    }
+
     // Create summoner lookup Lambda Function
     const summonerLookupFunction = new lambda.Function(this, 'SummonerLookupFunction', {
       runtime: lambda.Runtime.PYTHON_3_11,
       handler: 'summoner_lookup.lambda_handler',
       code: lambda.Code.fromAsset(path.join(__dirname, '../lambda/summoner-lookup-source')),
       role: lambdaRole,
+      layers: [sharedLayer],
       timeout: cdk.Duration.seconds(30),
       tracing: lambda.Tracing.ACTIVE,
       environment: {
-        PARAMETER_NAME: apiKeyParameter.parameterName
+        PARAMETER_NAME: apiKeyParameter.parameterName,
+        ...profilingEnvironment
       }
     });
 
@@ -73,8 +112,9 @@ export class RiotApiCdkStack extends cdk.Stack {
       authType: lambda.FunctionUrlAuthType.NONE,
       cors: {
         allowedOrigins: ['*'],
-        allowedMethods: [lambda.HttpMethod.GET],
-        allowedHeaders: ['Content-Type'],
+        allowedMethods: [lambda.HttpMethod.GET, lambda.HttpMethod.POST],
+        allowedHeaders: ['Content-Type', 'If-None-Match'],
+        exposedHeaders: ['ETag', 'Cache-Control', 'X-Trace-Id', 'X-Profile-Location'],
         maxAge: cdk.Duration.seconds(300)
       }
     });
@@ -0,0 +1,19 @@
+"""
+Test setup for the Lambda sources: the layer and function directories go on
+sys.path the way Lambda provides them, and X-Ray is disabled for local runs.
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import os
+import sys
+import tempfile
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lambda')
+
+os.environ['AWS_XRAY_SDK_ENABLED'] = 'false'
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('DATA_DRAGON_CACHE_DIR', tempfile.mkdtemp(prefix='ddragon-test-'))
+for source_dir in ('shared-layer/python', 'riot-api-source', 'summoner-lookup-source'):
+    sys.path.insert(0, os.path.join(LAMBDA_DIR, source_dir))
@@ -0,0 +1,33 @@
+"""
+Challenge percentile endpoint tests: score validation.
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import json
+
+import pytest
+
+import contests
+
+
+def unreachable_upstream(url, headers=None):
+    raise AssertionError(f'No upstream call expected for an invalid score: {url}')
+
+
+@pytest.mark.parametrize('score', ['nan', 'NaN', 'inf', '-inf', 'Infinity', 'abc'])
+def test_percentile_rejects_non_finite_score(score):
+    event = {'queryStringParameters': {'challengeId': '101100', 'score': score}}
+    response = contests.handle_challenge_percentile_endpoint(event, [], {}, unreachable_upstream)
+    assert response['statusCode'] == 400
+    assert json.loads(response['body']) == {'error': f'Invalid score: {score}'}
+
+
+def test_percentile_accepts_finite_score():
+    # The same 10 entries come back for each of the three apex tiers
+    ladder = [{'puuid': f'p{i}', 'value': i * 10} for i in range(10)]
+    event = {'queryStringParameters': {'challengeId': '101101', 'score': '45'}}
+    response = contests.handle_challenge_percentile_endpoint(event, [], {}, lambda url, headers=None: (ladder, 200, 'Success'))
+    assert response['statusCode'] == 200
+    assert json.loads(response['body'])['data']['participants'] == 30
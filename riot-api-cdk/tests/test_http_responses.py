@@ -0,0 +1,38 @@
+"""
+Response ETag tests: identical upstream data must keep the same ETag so the
+304 path fires, even though the route's circuit breaker counts every call.
+
+Author: Bryan Chasko (@bryanChasko)
+Project: AWS Rift Rewind Hackathon
+"""
+
+import json
+
+import circuit_breaker
+import players
+import riot_client
+from http_responses import apply_conditional_request
+
+LADDER = {'name': 'Test Ladder', 'entries': [
+    {'puuid': f'p{i}', 'leaguePoints': 1000 - i, 'wins': 50, 'losses': 40} for i in range(3)
+]}
+
+
+def fetch_players():
+    # Forget the remembered ladder so every call reaches the (stubbed) upstream and the breaker
+    riot_client._last_good_responses.clear()
+    return players.handle_players_endpoint({}, [], {}, lambda url, headers=None: riot_client.make_request(url, headers))
+
+
+def test_etag_stable_across_upstream_calls(monkeypatch):
+    body = json.dumps(LADDER).encode('utf-8')
+    monkeypatch.setattr(riot_client, 'http_get', lambda url, headers=None, timeout=None: (200, 'OK', body))
+    circuit_breaker._breakers.clear()
+
+    first = fetch_players()
+    second = fetch_players()
+
+    assert len(circuit_breaker.get_circuit_breaker(players.CHALLENGER_LADDER_URL).outcomes) == 2
+    assert first['headers']['ETag'] == second['headers']['ETag']
+    event = {'headers': {'If-None-Match': first['headers']['ETag']}}
+    assert apply_conditional_request(event, fetch_players())['statusCode'] == 304